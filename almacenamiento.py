@@ -0,0 +1,144 @@
+""" 
+    almacenamiento.py
+    Descripción:
+        Este módulo centraliza la lectura y escritura de los archivos intermedios que se 
+        intercambian entre las etapas del flujo (processing_*, feature_*). Por defecto se usa 
+        Parquet: formato columnar, comprimido, con tipos reales (inbound booleano, TextPreproc 
+        como lista de strings) y que permite leer solo las columnas que necesita cada etapa.
+        Con FORMATO_INTERMEDIO = "csv" se conserva el comportamiento anterior.
+
+    Funciones:
+        nombre_archivo(base):
+            Retorna el nombre del archivo con la extensión del formato intermedio configurado.
+        guardar_datos(df, file_path):
+            Guarda un DataFrame en el formato que corresponde a la extensión del archivo.
+        leer_datos(file_path, columnas, listas_arrow):
+            Lee un archivo intermedio cargando únicamente las columnas solicitadas. Con listas_arrow las
+            columnas de listas (TextPreproc) quedan respaldadas por Arrow, sin un objeto de Python por token.
+        leer_datos_por_bloques(file_path, columnas, chunksize):
+            Lee un archivo intermedio por bloques de filas.
+
+    Clases:
+        EscritorIncremental:
+            Escribe un archivo intermedio bloque a bloque, sin mantener en memoria los bloques anteriores.
+            Los bloques van a un archivo temporal junto al destino que solo se publica (os.replace) al
+            cerrar sin errores; usado como context manager, una excepción (por ejemplo un CRC inválido
+            al final del ZIP de entrada) descarta el temporal y deja intacta la salida anterior.
+    Autor: Ivan Camilo Rosales
+    Fecha: 2025-05-21
+"""
+
+from librerias import os, pd, pa, pq, Optional, List, Iterator
+from config import FORMATO_INTERMEDIO, COMPRESION_INTERMEDIA
+
+
+#-----  Tipos de las columnas conocidas del flujo, para que todos los bloques compartan esquema
+TIPOS_COLUMNAS = {
+    "inbound": pa.bool_(),
+    "text": pa.string(),
+    "TextPreproc": pa.list_(pa.string()),
+    "textCls": pa.string(),
+    "sentimiento": pa.string(),
+    "id_grupo": pa.int64(),
+}
+
+
+def nombre_archivo(base: str) -> str:
+    return f"{base}.{FORMATO_INTERMEDIO}"
+
+
+def _es_parquet(file_path: str) -> bool:
+    return file_path.endswith(".parquet")
+
+
+def _esquema(df: pd.DataFrame) -> pa.Schema:
+    inferido = pa.Schema.from_pandas(df, preserve_index=False)
+    return pa.schema([
+        pa.field(campo.name, TIPOS_COLUMNAS.get(campo.name, campo.type)) for campo in inferido
+    ])
+
+
+def _tabla(df: pd.DataFrame, esquema: Optional[pa.Schema] = None) -> pa.Table:
+    return pa.Table.from_pandas(df, schema=esquema or _esquema(df), preserve_index=False)
+
+
+def guardar_datos(df: pd.DataFrame, file_path: str) -> None:
+    if _es_parquet(file_path):
+        pq.write_table(_tabla(df), file_path, compression=COMPRESION_INTERMEDIA)
+    else:
+        df.to_csv(file_path, index=False)
+
+
+def _tipo_lista_arrow(tipo: pa.DataType) -> Optional[pd.ArrowDtype]:
+    return pd.ArrowDtype(tipo) if pa.types.is_list(tipo) else None
+
+
+def leer_datos(file_path: str, columnas: Optional[List[str]] = None, listas_arrow: bool = False) -> pd.DataFrame:
+    if _es_parquet(file_path):
+        return pq.read_table(file_path, columns=columnas).to_pandas(
+            types_mapper=_tipo_lista_arrow if listas_arrow else None
+        )
+    return pd.read_csv(file_path, usecols=columnas)
+
+
+def leer_datos_por_bloques(
+    file_path: str, columnas: Optional[List[str]] = None, chunksize: int = 100_000
+) -> Iterator[pd.DataFrame]:
+    if _es_parquet(file_path):
+        archivo = pq.ParquetFile(file_path)
+        for lote in archivo.iter_batches(batch_size=chunksize, columns=columnas):
+            yield lote.to_pandas()
+    else:
+        yield from pd.read_csv(file_path, usecols=columnas, chunksize=chunksize)
+
+
+class EscritorIncremental:
+    
+    def __init__(self, file_path: str):
+        self.file_path = file_path
+        #-----  Mismo directorio (os.replace es atómico dentro del sistema de archivos) y misma extensión
+        directorio, nombre = os.path.split(file_path)
+        self.temporal = os.path.join(directorio, f".tmp_{os.getpid()}_{id(self):x}_{nombre}")
+        self._escritor = None
+        self._esquema = None
+        self.filas = 0
+    
+    def __enter__(self) -> "EscritorIncremental":
+        return self
+    
+    def __exit__(self, tipo, *excepcion) -> None:
+        if tipo is not None:
+            self.descartar()
+    
+    def escribir(self, df: pd.DataFrame) -> None:
+        if _es_parquet(self.temporal):
+            if self._escritor is None:
+                self._esquema = _esquema(df)
+                self._escritor = pq.ParquetWriter(
+                    self.temporal, self._esquema, compression=COMPRESION_INTERMEDIA
+                )
+            self._escritor.write_table(_tabla(df, self._esquema))
+        else:
+            #-----  El primer bloque crea el archivo (con encabezado), los siguientes se agregan al final
+            df.to_csv(
+                self.temporal, index=False,
+                mode='w' if self.filas == 0 else 'a',
+                header=self.filas == 0,
+            )
+        self.filas += len(df)
+    
+    def cerrar(self, columnas: Optional[List[str]] = None) -> None:
+        if self.filas == 0 and self._escritor is None:
+            #-----  Si no se escribió ningún bloque dejamos un archivo vacío con las columnas esperadas
+            guardar_datos(pd.DataFrame(columns=columnas or []), self.temporal)
+        if self._escritor is not None:
+            self._escritor.close()
+            self._escritor = None
+        os.replace(self.temporal, self.file_path)
+    
+    def descartar(self) -> None:
+        if self._escritor is not None:
+            self._escritor.close()
+            self._escritor = None
+        if os.path.exists(self.temporal):
+            os.remove(self.temporal)
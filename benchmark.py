@@ -0,0 +1,319 @@
+""" 
+    benchmark.py
+    Descripción:
+        Suite de benchmarks por etapa del flujo. Genera tuits sintéticos con el mismo esquema de 
+        twcs.csv (tweet_id, author_id, inbound, created_at, text, response_tweet_id, 
+        in_response_to_tweet_id), con URLs, emojis, menciones, dígitos y saltos de línea en el texto,
+        y mide por separado cada etapa costosa:
+            - TextProcessing.procesador_texto
+            - FeatureExtraction.etiquetar_sentimiento
+            - ModelTrain.fit_transform y ModelTrain.transform_tfidf
+            - Entrenamiento del modelo (fit)
+        Para cada etapa y tamaño se reportan filas por segundo y el pico de memoria (tracemalloc).
+        Los resultados se guardan en JSON y se pueden comparar contra una línea base guardada; 
+        el proceso termina con código 1 si alguna etapa empeora más que la tolerancia.
+
+        Con --servicio se ejecuta en su lugar una prueba de carga contra el servicio de inferencia en
+        ejecución: varias conexiones persistentes envían POST /predict con tuits sintéticos y se reportan
+        la latencia p50/p90/p99 vista por el cliente, solicitudes y tuits por segundo y los errores.
+
+    Funciones:
+        generar_tuits_sinteticos(n, semilla):
+            Genera un DataFrame con n tuits sintéticos con el esquema de twcs.
+        medir(nombre, filas, funcion, repeticiones):
+            Ejecuta una etapa varias veces y retorna su mejor tiempo, filas por segundo y pico de memoria.
+        ejecutar_benchmarks(tamanos):
+            Ejecuta todas las etapas para cada tamaño de datos.
+        comparar_con_baseline(resultados, baseline, tolerancia):
+            Retorna la lista de regresiones frente a la línea base.
+        prueba_carga_servicio(url, conexiones, solicitudes, textos_por_solicitud):
+            Prueba de carga de POST /predict y resumen de latencia y throughput.
+
+    Ejemplo:
+        python benchmark.py --tamanos 1000 10000 --guardar-baseline
+        python benchmark.py --tamanos 1000 10000 --tolerancia 0.2
+        python benchmark.py --servicio http://localhost:8000 --conexiones 32 --solicitudes 5000
+    Autor: Ivan Camilo Rosales
+    Fecha: 2025-05-21
+"""
+
+from librerias import (
+    os, sys, json, time, random, asyncio, logging, argparse, tracemalloc, tempfile,
+    datetime, np, pd, Dict, List, Any, Callable, setup_logging, setup_warnings
+)
+from config import *
+from textProcessing import TextProcessing
+from featureExtraction import FeatureExtraction
+from modelo import ModelTrain
+from cacheTokens import CacheTokens
+
+
+PALABRAS = {
+    "positivo": ["thanks", "great", "love", "awesome", "happy", "excellent", "helpful", "best"],
+    "negativo": ["broken", "terrible", "hate", "worst", "angry", "slow", "never", "disappointed"],
+    "neutral": ["phone", "order", "package", "account", "update", "store", "flight", "delivery",
+                "app", "battery", "screen", "password", "refund", "tracking", "support", "today"],
+}
+MENCIONES = ["@AppleSupport", "@AmazonHelp", "@Uber_Support", "@SpotifyCares", "@comcastcares"]
+EMOJIS = ["😡", "👍", "😂", "🙏", "💔", "🔥"]
+
+
+def generar_tuits_sinteticos(n: int, semilla: int = 42) -> pd.DataFrame:
+    rng = random.Random(semilla)
+    filas = []
+    for i in range(n):
+        tono = rng.choice(list(PALABRAS))
+        palabras = rng.sample(PALABRAS["neutral"], 4) + rng.sample(PALABRAS[tono], 2)
+        rng.shuffle(palabras)
+        partes = [rng.choice(MENCIONES)] + palabras
+        if rng.random() < 0.3:
+            partes.append(f"https://t.co/{rng.getrandbits(40):x}")
+        if rng.random() < 0.3:
+            partes.append(rng.choice(EMOJIS))
+        if rng.random() < 0.3:
+            partes.append(f"#{rng.randint(1, 9999)}")
+        texto = " ".join(partes) + (rng.choice(["!!", "?", "...", "\nplease help"]) if rng.random() < 0.5 else "")
+        filas.append({
+            "tweet_id": i + 1,
+            "author_id": f"{rng.randint(100000, 999999)}",
+            "inbound": rng.random() < 0.6,
+            "created_at": "Tue Oct 31 22:10:47 +0000 2017",
+            "text": texto,
+            "response_tweet_id": "",
+            "in_response_to_tweet_id": "",
+        })
+    return pd.DataFrame(filas)
+
+
+def medir(
+    nombre: str, filas: int, funcion: Callable[[], Any], 
+    medir_memoria: bool = True, repeticiones: int = 3
+) -> Dict[str, Any]:
+    #-----  El tiempo se mide sin tracemalloc activo, porque el rastreo de memoria enlentece la ejecución.
+    #-----  Se conserva el mejor tiempo de varias repeticiones para reducir el ruido entre ejecuciones.
+    tiempos = []
+    for _ in range(max(1, repeticiones)):
+        inicio = time.perf_counter()
+        resultado = funcion()
+        tiempos.append(time.perf_counter() - inicio)
+    segundos = min(tiempos)
+    
+    pico_mb = None
+    if medir_memoria:
+        tracemalloc.start()
+        funcion()
+        _, pico = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        pico_mb = round(pico / 1024 ** 2, 2)
+    
+    return {
+        "etapa": nombre,
+        "filas": filas,
+        "segundos": round(segundos, 4),
+        "filas_por_segundo": round(filas / segundos, 1) if segundos > 0 else None,
+        "pico_memoria_mb": pico_mb,
+        "_resultado": resultado,
+    }
+
+
+def ejecutar_benchmarks(
+    tamanos: List[int], medir_memoria: bool = True, repeticiones: int = 3
+) -> List[Dict[str, Any]]:
+    resultados = []
+    directorio_modelos = tempfile.mkdtemp(prefix="benchmark_modelos_")
+    for n in tamanos:
+        datos = generar_tuits_sinteticos(n)
+        
+        text_processing = TextProcessing(idioma=IDIOMA)
+        #-----  Caché de tokens vacía para que el resultado no dependa de ejecuciones anteriores
+        def procesar():
+            text_processing.cache_tokens = CacheTokens(max_size=TAMANO_CACHE_TOKENS)
+            return text_processing.procesador_texto(datos["text"].astype(str))
+        medicion = medir("procesador_texto", n, procesar, medir_memoria, repeticiones)
+        textos = medicion.pop("_resultado").apply(text_processing.clsTexto)
+        resultados.append(medicion)
+        
+        feature_extraction = FeatureExtraction()
+        medicion = medir(
+            "etiquetar_sentimiento", n,
+            lambda: textos.apply(feature_extraction.etiquetar_sentimiento), medir_memoria, repeticiones
+        )
+        etiquetas = medicion.pop("_resultado")
+        resultados.append(medicion)
+        
+        model_trainer = ModelTrain(data_processed_path=directorio_modelos)
+        medicion = medir(
+            "fit_transform", n,
+            lambda: model_trainer.fit_transform(textos.values), medir_memoria, repeticiones
+        )
+        X_vectorized = medicion.pop("_resultado")
+        resultados.append(medicion)
+        
+        medicion = medir(
+            "transform_tfidf", n,
+            lambda: model_trainer.transform_tfidf(X_vectorized), medir_memoria, repeticiones
+        )
+        X_tfidf = medicion.pop("_resultado")
+        resultados.append(medicion)
+        
+        y = model_trainer.decode_labels_into_idx(etiquetas).values
+        parametros = {k: v for k, v in PARAMETERS_MODEL.items() if k in ("C", "max_iter", "random_state", "solver")}
+        medicion = medir(
+            "fit_modelo", n,
+            lambda: model_trainer.train_model(model_type="logistic_regression", **parametros).fit(X_tfidf, y),
+            medir_memoria, repeticiones,
+        )
+        medicion.pop("_resultado")
+        resultados.append(medicion)
+    return resultados
+
+
+def comparar_con_baseline(
+    resultados: List[Dict[str, Any]], baseline: List[Dict[str, Any]], tolerancia: float
+) -> List[str]:
+    referencia = {(r["etapa"], r["filas"]): r for r in baseline}
+    regresiones = []
+    for actual in resultados:
+        base = referencia.get((actual["etapa"], actual["filas"]))
+        if base is None:
+            continue
+        if base["filas_por_segundo"] and actual["filas_por_segundo"] < base["filas_por_segundo"] * (1 - tolerancia):
+            regresiones.append(
+                f"{actual['etapa']} ({actual['filas']} filas): {actual['filas_por_segundo']} filas/s "
+                f"vs {base['filas_por_segundo']} en la línea base"
+            )
+        if base.get("pico_memoria_mb") and actual.get("pico_memoria_mb") \
+                and actual["pico_memoria_mb"] > base["pico_memoria_mb"] * (1 + tolerancia):
+            regresiones.append(
+                f"{actual['etapa']} ({actual['filas']} filas): pico de memoria {actual['pico_memoria_mb']} MB "
+                f"vs {base['pico_memoria_mb']} MB en la línea base"
+            )
+    return regresiones
+
+
+async def _cliente_http(host: str, puerto: int, cuerpos: List[bytes], resultados: List[tuple]) -> None:
+    #-----  Una conexión persistente que envía sus solicitudes una tras otra (como un cliente con keep-alive)
+    reader, writer = await asyncio.open_connection(host, puerto)
+    try:
+        for cuerpo in cuerpos:
+            inicio = time.perf_counter()
+            writer.write(
+                f"POST /predict HTTP/1.1\r\nHost: {host}\r\nContent-Type: application/json\r\n"
+                f"Content-Length: {len(cuerpo)}\r\n\r\n".encode("latin-1") + cuerpo
+            )
+            await writer.drain()
+            estado = (await reader.readline()).split()[1]
+            largo = 0
+            while True:
+                linea = await reader.readline()
+                if linea in (b"\r\n", b"\n", b""):
+                    break
+                nombre, valor = linea.decode("latin-1").split(":", 1)
+                if nombre.strip().lower() == "content-length":
+                    largo = int(valor)
+            await reader.readexactly(largo)
+            resultados.append(((time.perf_counter() - inicio) * 1000, estado == b"200"))
+    finally:
+        writer.close()
+
+
+def prueba_carga_servicio(
+    url: str, conexiones: int = 32, solicitudes: int = 2_000, textos_por_solicitud: int = 1, semilla: int = 42
+) -> Dict[str, Any]:
+    direccion = url.split("://", 1)[-1].rstrip("/")
+    host, _, puerto = direccion.partition(":")
+    textos = generar_tuits_sinteticos(max(solicitudes * textos_por_solicitud, 1), semilla)["text"].tolist()
+    cuerpos = [
+        json.dumps({"textos": textos[i * textos_por_solicitud:(i + 1) * textos_por_solicitud]}).encode("utf-8")
+        for i in range(solicitudes)
+    ]
+    resultados = []
+    
+    async def ejecutar():
+        await asyncio.gather(*(
+            _cliente_http(host, int(puerto or 80), cuerpos[i::conexiones], resultados) for i in range(conexiones)
+        ))
+    
+    inicio = time.perf_counter()
+    asyncio.run(ejecutar())
+    segundos = time.perf_counter() - inicio
+    
+    latencias = np.array([latencia for latencia, _ in resultados])
+    correctas = sum(correcta for _, correcta in resultados)
+    return {
+        "conexiones": conexiones,
+        "solicitudes": len(resultados),
+        "textos_por_solicitud": textos_por_solicitud,
+        "errores": len(resultados) - correctas,
+        "segundos": round(segundos, 3),
+        "solicitudes_por_segundo": round(len(resultados) / segundos, 1),
+        "tuits_por_segundo": round(correctas * textos_por_solicitud / segundos, 1),
+        "latencia_p50_ms": round(float(np.percentile(latencias, 50)), 3),
+        "latencia_p90_ms": round(float(np.percentile(latencias, 90)), 3),
+        "latencia_p99_ms": round(float(np.percentile(latencias, 99)), 3),
+        "latencia_max_ms": round(float(latencias.max()), 3),
+    }
+
+
+if __name__ == "__main__":
+    logger = setup_logging(logging.WARNING)
+    setup_warnings()
+    
+    parser = argparse.ArgumentParser(description="Benchmarks por etapa del flujo de clasificación de tuits")
+    parser.add_argument("--tamanos", type=int, nargs="+", default=[1_000, 10_000])
+    parser.add_argument("--salida", default=os.path.join(BENCHMARK_PATH, "benchmark_resultados.json"))
+    parser.add_argument("--baseline", default=os.path.join(BENCHMARK_PATH, "benchmark_baseline.json"))
+    parser.add_argument("--tolerancia", type=float, default=0.2)
+    parser.add_argument("--guardar-baseline", action="store_true")
+    parser.add_argument("--repeticiones", type=int, default=3)
+    parser.add_argument("--sin-memoria", action="store_true", help="No mide el pico de memoria")
+    parser.add_argument("--servicio", help="URL del servicio de inferencia: ejecuta la prueba de carga de /predict")
+    parser.add_argument("--conexiones", type=int, default=32)
+    parser.add_argument("--solicitudes", type=int, default=2_000)
+    parser.add_argument("--textos-por-solicitud", type=int, default=1)
+    args = parser.parse_args()
+    
+    if args.servicio:
+        carga = prueba_carga_servicio(
+            args.servicio, conexiones=args.conexiones, solicitudes=args.solicitudes,
+            textos_por_solicitud=args.textos_por_solicitud
+        )
+        print(json.dumps(carga, indent=2))
+        salida = os.path.join(os.path.dirname(args.salida) or ".", "benchmark_servicio.json")
+        os.makedirs(os.path.dirname(salida) or ".", exist_ok=True)
+        with open(salida, "w", encoding="utf-8") as archivo:
+            json.dump({"fecha": datetime.datetime.now().isoformat(timespec="seconds"), "servicio": carga}, archivo, indent=2)
+        print(f"Resultados guardados en {salida}")
+        sys.exit(1 if carga["errores"] else 0)
+    
+    resultados = ejecutar_benchmarks(
+        args.tamanos, medir_memoria=not args.sin_memoria, repeticiones=args.repeticiones
+    )
+    for r in resultados:
+        print(f"{r['etapa']:<24}{r['filas']:>10} filas {r['filas_por_segundo']:>14} filas/s "
+              f"{r['pico_memoria_mb']} MB")
+    
+    reporte = {
+        "fecha": datetime.datetime.now().isoformat(timespec="seconds"),
+        "python": sys.version.split()[0],
+        "resultados": resultados,
+    }
+    os.makedirs(os.path.dirname(args.salida) or ".", exist_ok=True)
+    with open(args.salida, "w", encoding="utf-8") as archivo:
+        json.dump(reporte, archivo, indent=2)
+    print(f"Resultados guardados en {args.salida}")
+    
+    if args.guardar_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as archivo:
+            json.dump(reporte, archivo, indent=2)
+        print(f"Línea base actualizada en {args.baseline}")
+    elif os.path.exists(args.baseline):
+        with open(args.baseline, "r", encoding="utf-8") as archivo:
+            baseline = json.load(archivo)["resultados"]
+        regresiones = comparar_con_baseline(resultados, baseline, args.tolerancia)
+        if regresiones:
+            print("Regresiones de rendimiento detectadas:")
+            for regresion in regresiones:
+                print(f"  - {regresion}")
+            sys.exit(1)
+        print(f"Sin regresiones frente a la línea base (tolerancia {args.tolerancia:.0%})")
@@ -0,0 +1,245 @@
+"""
+    busquedaHiperparametros.py
+    Descripción:
+        Búsqueda de hiperparámetros de LogisticRegression sobre una matriz TF-IDF que se calcula una
+        sola vez. Las features y la partición se preparan con ModelTrain.preparar_features y el conjunto
+        de entrenamiento se divide en ajuste y validación; ambos se guardan como arreglos .npy que los
+        procesos del pool abren con memory-mapping, de modo que todos leen las mismas páginas sin copiar
+        la matriz.
+
+        Los candidatos que solo difieren en C forman una ruta de regularización: se entrenan en el mismo
+        proceso de menor a mayor C y cada uno inicia desde los coeficientes del anterior (warm start).
+        La búsqueda avanza por rondas (successive halving): en cada ronda los candidatos vivos reciben
+        más iteraciones, continúan desde sus propios coeficientes y solo el mejor 1/FACTOR_DESCARTE
+        pasa a la siguiente. El ganador se reentrena sobre todo el conjunto de entrenamiento partiendo
+        de sus coeficientes y cada candidato se registra como una ejecución anidada de MLflow.
+
+    Clases:
+        BusquedaHiperparametros:
+            generar_candidatos():
+                Genera la grilla completa o una muestra aleatoria de ella.
+            preparar_datos(X_train, y_train):
+                Separa la validación y guarda los arreglos compartidos por los procesos.
+            run(df, developer):
+                Ejecuta la búsqueda completa y retorna el modelo ganador.
+    Autor: Ivan Camilo Rosales
+    Fecha: 2025-05-21
+"""
+
+from librerias import (
+    os, time, random, logging, product, np, pd, csr_matrix,
+    ProcessPoolExecutor, Dict, List, Any, Optional,
+    LogisticRegression, train_test_split
+)
+from config import *
+from modelo import ModelTrain
+
+
+#-----  Datos de cada proceso del pool: se abren una sola vez en el inicializador
+_datos_worker = None
+
+
+def _inicializar_worker(data_processed_path: str):
+    global _datos_worker
+    trainer = ModelTrain(data_processed_path=data_processed_path)
+    path = os.path.join(data_processed_path, "busqueda")
+    _datos_worker = {
+        "trainer": trainer,
+        "X_fit": trainer.load_sparse_arrays(os.path.join("busqueda", "X_fit")),
+        "X_val": trainer.load_sparse_arrays(os.path.join("busqueda", "X_val")),
+        "y_fit": np.load(os.path.join(path, "y_fit.npy"), mmap_mode="r"),
+        "y_val": np.load(os.path.join(path, "y_val.npy"), mmap_mode="r"),
+    }
+
+
+def _entrenar_ruta(params: Dict[str, Any], candidatos: List[Dict[str, Any]], iteraciones: int) -> List[Dict[str, Any]]:
+    #-----  candidatos llega ordenado de menor a mayor C
+    trainer = _datos_worker["trainer"]
+    resultados = []
+    anterior = None
+    for candidato in candidatos:
+        modelo = LogisticRegression(C=candidato["C"], max_iter=iteraciones, warm_start=True, **params)
+        #-----  Un candidato que ya entrenó continúa desde sus coeficientes; uno nuevo parte del anterior en la ruta
+        inicio = candidato if candidato["coef"] is not None else anterior
+        if inicio is not None:
+            modelo.coef_ = inicio["coef"].copy()
+            modelo.intercept_ = inicio["intercept"].copy()
+
+        inicio_time = time.perf_counter()
+        modelo.fit(_datos_worker["X_fit"], _datos_worker["y_fit"])
+        segundos = time.perf_counter() - inicio_time
+
+        proba = modelo.predict_proba(_datos_worker["X_val"])
+        metricas = trainer.compute_metrics(_datos_worker["y_val"], proba, modelo.classes_)
+        anterior = {
+            "id": candidato["id"],
+            "coef": modelo.coef_,
+            "intercept": modelo.intercept_,
+            "n_iter": int(np.max(modelo.n_iter_)),
+            "segundos": round(segundos, 4),
+            "metricas": metricas,
+        }
+        resultados.append(anterior)
+    return resultados
+
+
+class BusquedaHiperparametros:
+
+    def __init__(
+        self, model_trainer: ModelTrain, grilla: Dict[str, list] = GRILLA_BUSQUEDA,
+        max_candidatos: Optional[int] = MAX_CANDIDATOS_BUSQUEDA, n_workers: Optional[int] = NUM_WORKERS_BUSQUEDA,
+        factor_descarte: int = FACTOR_DESCARTE, iteraciones_minimas: int = ITERACIONES_MINIMAS,
+        iteraciones_maximas: int = ITERACIONES_MAXIMAS, fraccion_validacion: float = FRACCION_VALIDACION,
+        random_state: int = 40
+    ):
+        self.model_trainer = model_trainer
+        self.grilla = grilla
+        self.max_candidatos = max_candidatos
+        self.n_workers = n_workers or os.cpu_count() or 1
+        self.factor_descarte = factor_descarte
+        self.iteraciones_minimas = iteraciones_minimas
+        self.iteraciones_maximas = iteraciones_maximas
+        self.fraccion_validacion = fraccion_validacion
+        self.random_state = random_state
+        self.logger = logging.getLogger(__name__)
+
+    def generar_candidatos(self) -> List[Dict[str, Any]]:
+        combinaciones = list(product(
+            self.grilla["penalty_solver"], self.grilla["class_weight"], self.grilla["C"]
+        ))
+        if self.max_candidatos is not None and self.max_candidatos < len(combinaciones):
+            combinaciones = random.Random(self.random_state).sample(combinaciones, self.max_candidatos)
+
+        return [
+            {
+                "id": i,
+                "params": {
+                    "penalty": penalty, "solver": solver,
+                    "class_weight": class_weight, "random_state": self.random_state,
+                },
+                "C": float(C),
+                "coef": None,
+                "intercept": None,
+                "historial": [],
+            }
+            for i, ((penalty, solver), class_weight, C) in enumerate(combinaciones)
+        ]
+
+    def preparar_datos(self, X_train: csr_matrix, y_train: pd.Series) -> None:
+        fit_idx, val_idx = train_test_split(
+            np.arange(X_train.shape[0]), test_size=self.fraccion_validacion, random_state=self.random_state
+        )
+        y_train = np.asarray(y_train)
+        path = os.path.join(self.model_trainer.data_processed_path, "busqueda")
+        self.model_trainer.save_sparse_arrays(X_train[fit_idx], os.path.join("busqueda", "X_fit"))
+        self.model_trainer.save_sparse_arrays(X_train[val_idx], os.path.join("busqueda", "X_val"))
+        np.save(os.path.join(path, "y_fit.npy"), y_train[fit_idx])
+        np.save(os.path.join(path, "y_val.npy"), y_train[val_idx])
+
+    def _agrupar_rutas(self, candidatos: List[Dict[str, Any]]) -> List[List[Dict[str, Any]]]:
+        rutas = {}
+        for candidato in candidatos:
+            clave = tuple(sorted((k, str(v)) for k, v in candidato["params"].items()))
+            rutas.setdefault(clave, []).append(candidato)
+        rutas = [sorted(ruta, key=lambda c: c["C"]) for ruta in rutas.values()]
+
+        #-----  Si hay menos rutas que procesos, se parten las más largas para ocupar todo el pool
+        while len(rutas) < self.n_workers:
+            larga = max(rutas, key=len)
+            if len(larga) < 2:
+                break
+            rutas.remove(larga)
+            mitad = len(larga) // 2
+            rutas.extend([larga[:mitad], larga[mitad:]])
+        return rutas
+
+    def _registrar_candidatos(self, candidatos: List[Dict[str, Any]], ganador: Dict[str, Any]) -> None:
+        from librerias import mlflow
+
+        for candidato in candidatos:
+            with mlflow.start_run(run_name=f"candidato_{candidato['id']}", nested=True):
+                mlflow.log_params({**candidato["params"], "C": candidato["C"]})
+                for registro in candidato["historial"]:
+                    for nombre, valor in registro["metricas"].items():
+                        mlflow.log_metric(f"{nombre}_validacion", valor, step=registro["iteraciones"])
+                    mlflow.log_metric("segundos_fit", registro["segundos"], step=registro["iteraciones"])
+                mlflow.log_metric("rondas", len(candidato["historial"]))
+                mlflow.set_tag("ganador", candidato["id"] == ganador["id"])
+
+    def run(self, df: pd.DataFrame, developer: str = "Ivan Camilo") -> LogisticRegression:
+        trainer = self.model_trainer
+        trainer.instrumentacion.iniciar_perfil()
+        X_train, X_test, y_train, y_test = trainer.preparar_features(df)
+        self.preparar_datos(X_train, y_train)
+
+        candidatos = self.generar_candidatos()
+        vivos = list(candidatos)
+        self.logger.info(f"Búsqueda de hiperparámetros: {len(candidatos)} candidatos con {self.n_workers} procesos")
+
+        ronda, gastadas = 0, 0
+        with trainer.instrumentacion.medir("busqueda", X_train.shape[0]):
+            with ProcessPoolExecutor(
+                max_workers=self.n_workers,
+                initializer=_inicializar_worker,
+                initargs=(trainer.data_processed_path,),
+            ) as pool:
+                while True:
+                    presupuesto = min(self.iteraciones_minimas * self.factor_descarte ** ronda, self.iteraciones_maximas)
+                    futuros = [
+                        pool.submit(_entrenar_ruta, ruta[0]["params"], ruta, presupuesto - gastadas)
+                        for ruta in self._agrupar_rutas(vivos)
+                    ]
+                    por_id = {candidato["id"]: candidato for candidato in vivos}
+                    for futuro in futuros:
+                        for resultado in futuro.result():
+                            candidato = por_id[resultado["id"]]
+                            candidato["coef"] = resultado["coef"]
+                            candidato["intercept"] = resultado["intercept"]
+                            candidato["historial"].append({
+                                "ronda": ronda, "iteraciones": presupuesto,
+                                "segundos": resultado["segundos"], "metricas": resultado["metricas"],
+                            })
+
+                    vivos.sort(key=lambda c: c["historial"][-1]["metricas"]["fscore"], reverse=True)
+                    mejor = vivos[0]
+                    self.logger.info(
+                        f"Ronda {ronda}: {len(vivos)} candidatos con {presupuesto} iteraciones - "
+                        f"mejor fscore de validación {mejor['historial'][-1]['metricas']['fscore']:.4f} "
+                        f"({mejor['params']['penalty']}, {mejor['params']['solver']}, C={mejor['C']})"
+                    )
+                    if presupuesto >= self.iteraciones_maximas or len(vivos) <= 1:
+                        break
+                    #-----  Los candidatos descartados liberan sus coeficientes
+                    for candidato in vivos[max(1, len(vivos) // self.factor_descarte):]:
+                        candidato["coef"] = candidato["intercept"] = None
+                    vivos = vivos[:max(1, len(vivos) // self.factor_descarte)]
+                    gastadas = presupuesto
+                    ronda += 1
+
+        ganador = vivos[0]
+        self._registrar_candidatos(candidatos, ganador)
+        trainer.seguimiento_activo().log_params(
+            {f"best_{k}": v for k, v in {**ganador["params"], "C": ganador["C"]}.items()}
+        )
+
+        #-----  El ganador se reentrena con todo el conjunto de entrenamiento partiendo de sus coeficientes
+        model = LogisticRegression(
+            C=ganador["C"], max_iter=self.iteraciones_maximas, warm_start=True, **ganador["params"]
+        )
+        model.coef_, model.intercept_ = ganador["coef"].copy(), ganador["intercept"].copy()
+        with trainer.instrumentacion.medir("fit", X_train.shape[0]):
+            model.fit(X_train, y_train)
+        trainer.guardar_modelo(model, "logistic_regression")
+
+        with trainer.instrumentacion.medir("evaluate", X_train.shape[0] + X_test.shape[0]):
+            trainer.display_classification_report(
+                model=model,
+                name_model="Logistic_regression",
+                developer=developer,
+                X_train=X_train,
+                X_test=X_test,
+                y_train=y_train,
+                y_test=y_test
+            )
+        trainer.instrumentacion.guardar(trainer.data_processed_path)
+        return model
@@ -0,0 +1,118 @@
+""" 
+    cacheEtapas.py
+    Descripción:
+        Esta clase permite que una etapa del flujo reutilice su salida cuando nada de lo que la 
+        determina ha cambiado. La huella de una etapa combina el hash del contenido del archivo de 
+        entrada, los parámetros de config.py que afectan a la etapa y el código fuente de los módulos
+        que la implementan. Junto a cada archivo de salida se guarda un manifiesto con su huella.
+
+    Métodos:
+        hash_archivo(ruta):
+            Calcula el hash SHA-256 del contenido de un archivo, reutilizando el hash del manifiesto 
+            anterior, o el que guardó la etapa que generó el archivo, si el tamaño y la fecha de
+            modificación del archivo no cambiaron.
+        huella(archivo_entrada, configuracion, modulos):
+            Calcula la huella de la etapa.
+        es_valida(archivo_salida, huella):
+            Indica si la salida existe y fue generada con la misma huella.
+        registrar(archivo_salida, huella, hash_salida, datos):
+            Guarda el manifiesto de la salida recién generada. Con hash_salida=True guarda también el
+            hash de la salida, para que la etapa que la consume no tenga que volver a leerla; datos
+            agrega información de la ejecución (por ejemplo el run de MLflow).
+        manifiesto(archivo_salida):
+            Retorna el manifiesto guardado junto a la salida (None si no existe).
+    Autor: Ivan Camilo Rosales
+    Fecha: 2025-05-21
+"""
+
+from librerias import os, sys, json, hashlib, logging, Dict, List, Any, Optional
+
+
+class CacheEtapas:
+    
+    TAMANO_BLOQUE = 1024 * 1024
+    
+    def __init__(self, etapa: str):
+        self.etapa = etapa
+        self.logger = logging.getLogger(__name__)
+        self._entrada = None
+    
+    def _ruta_manifiesto(self, archivo_salida: str) -> str:
+        return f"{archivo_salida}.huella.json"
+    
+    def _leer_manifiesto(self, archivo_salida: str) -> Optional[Dict[str, Any]]:
+        ruta = self._ruta_manifiesto(archivo_salida)
+        if not os.path.exists(ruta):
+            return None
+        with open(ruta, "r", encoding="utf-8") as archivo:
+            return json.load(archivo)
+    
+    def manifiesto(self, archivo_salida: str) -> Optional[Dict[str, Any]]:
+        return self._leer_manifiesto(archivo_salida)
+    
+    def _estado_archivo(self, ruta: str) -> Dict[str, Any]:
+        estado = os.stat(ruta)
+        return {"ruta": ruta, "tamano": estado.st_size, "mtime_ns": estado.st_mtime_ns}
+    
+    def _sha256(self, ruta: str) -> str:
+        sha = hashlib.sha256()
+        with open(ruta, "rb") as archivo:
+            for bloque in iter(lambda: archivo.read(self.TAMANO_BLOQUE), b""):
+                sha.update(bloque)
+        return sha.hexdigest()
+    
+    def hash_archivo(self, ruta: str, archivo_salida: Optional[str] = None) -> str:
+        entrada = self._estado_archivo(ruta)
+        
+        #-----  Si el archivo no cambió desde la ejecución anterior no es necesario volver a leerlo; tampoco
+        #-----  si no cambió desde que la etapa que lo generó guardó su hash en el manifiesto
+        manifiesto = self._leer_manifiesto(archivo_salida) if archivo_salida else None
+        productor = self._leer_manifiesto(ruta)
+        for previa in ((manifiesto or {}).get("entrada") or {}, (productor or {}).get("salida") or {}):
+            if all(previa.get(k) == v for k, v in entrada.items()) and "sha256" in previa:
+                entrada["sha256"] = previa["sha256"]
+                break
+        else:
+            entrada["sha256"] = self._sha256(ruta)
+        
+        self._entrada = entrada
+        return entrada["sha256"]
+    
+    def huella(
+        self, archivo_entrada: str, configuracion: Dict[str, Any], 
+        modulos: List[str], archivo_salida: Optional[str] = None
+    ) -> str:
+        codigo = hashlib.sha256()
+        for nombre in sorted(modulos):
+            with open(sys.modules[nombre].__file__, "rb") as archivo:
+                codigo.update(archivo.read())
+        
+        contenido = json.dumps({
+            "etapa": self.etapa,
+            "entrada": self.hash_archivo(archivo_entrada, archivo_salida),
+            "configuracion": configuracion,
+            "codigo": codigo.hexdigest(),
+        }, sort_keys=True, default=str)
+        return hashlib.sha256(contenido.encode("utf-8")).hexdigest()
+    
+    def es_valida(self, archivo_salida: str, huella: str) -> bool:
+        if not os.path.exists(archivo_salida):
+            return False
+        manifiesto = self._leer_manifiesto(archivo_salida)
+        valida = manifiesto is not None and manifiesto.get("huella") == huella
+        if valida:
+            self.logger.info(f"Etapa '{self.etapa}': salida reutilizada (cache hit) \n\t {archivo_salida}")
+        else:
+            self.logger.info(f"Etapa '{self.etapa}': sin salida válida en caché, se ejecuta la etapa")
+        return valida
+    
+    def registrar(
+        self, archivo_salida: str, huella: str, hash_salida: bool = False, datos: Optional[Dict[str, Any]] = None
+    ) -> None:
+        manifiesto = {"etapa": self.etapa, "huella": huella, "entrada": self._entrada}
+        if hash_salida:
+            manifiesto["salida"] = {**self._estado_archivo(archivo_salida), "sha256": self._sha256(archivo_salida)}
+        if datos:
+            manifiesto["datos"] = datos
+        with open(self._ruta_manifiesto(archivo_salida), "w", encoding="utf-8") as archivo:
+            json.dump(manifiesto, archivo, indent=2)
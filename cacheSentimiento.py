@@ -0,0 +1,94 @@
+""" 
+    cacheSentimiento.py
+    Descripción:
+        Esta clase guarda en disco (SQLite) las etiquetas de sentimiento ya calculadas, de modo que
+        VADER solo se ejecute sobre los textos que no se han visto en ejecuciones anteriores.
+        La clave de cada entrada es un hash del texto normalizado junto con una firma que identifica
+        el léxico de VADER y los umbrales usados; si cualquiera de ellos cambia, las entradas 
+        anteriores dejan de coincidir.
+
+    Métodos:
+        clave(texto):
+            Calcula la clave de la caché para un texto ya normalizado.
+        obtener_muchos(claves):
+            Retorna un diccionario clave -> etiqueta con las claves encontradas en la caché y 
+            actualiza su fecha de último uso.
+        guardar_muchos(pares):
+            Guarda una lista de pares (clave, etiqueta).
+        podar():
+            Elimina las entradas usadas hace más tiempo cuando se supera el número máximo de entradas.
+        cerrar():
+            Cierra la conexión con la base de datos.
+    Autor: Ivan Camilo Rosales
+    Fecha: 2025-05-21
+"""
+
+from librerias import os, time, hashlib, sqlite3, logging, Dict, List, Tuple
+
+
+class CacheSentimiento:
+    
+    #-----  Límite de variables por consulta en SQLite
+    TAMANO_LOTE = 900
+    
+    def __init__(self, ruta: str, firma: str, max_entradas: int):
+        self.ruta = ruta
+        self.firma = firma
+        self.max_entradas = max_entradas
+        self.logger = logging.getLogger(__name__)
+        
+        os.makedirs(os.path.dirname(ruta) or ".", exist_ok=True)
+        #-----  Varias particiones pueden etiquetar a la vez: WAL permite leer mientras otra conexión escribe
+        #-----  y el timeout espera el bloqueo de escritura en lugar de fallar
+        self.conexion = sqlite3.connect(ruta, timeout=30)
+        self.conexion.execute("PRAGMA journal_mode=WAL")
+        self.conexion.execute(
+            "CREATE TABLE IF NOT EXISTS etiquetas ("
+            "clave TEXT PRIMARY KEY, etiqueta TEXT NOT NULL, ultimo_uso INTEGER NOT NULL)"
+        )
+        self.conexion.execute(
+            "CREATE INDEX IF NOT EXISTS idx_ultimo_uso ON etiquetas (ultimo_uso)"
+        )
+        self.conexion.commit()
+    
+    def clave(self, texto: str) -> str:
+        return hashlib.sha1(f"{self.firma}\x00{texto}".encode("utf-8")).hexdigest()
+    
+    def obtener_muchos(self, claves: List[str]) -> Dict[str, str]:
+        encontrados = {}
+        ahora = int(time.time())
+        for inicio in range(0, len(claves), self.TAMANO_LOTE):
+            lote = claves[inicio:inicio + self.TAMANO_LOTE]
+            marcadores = ",".join("?" * len(lote))
+            filas = self.conexion.execute(
+                f"SELECT clave, etiqueta FROM etiquetas WHERE clave IN ({marcadores})", lote
+            ).fetchall()
+            encontrados.update(filas)
+            self.conexion.execute(
+                f"UPDATE etiquetas SET ultimo_uso = ? WHERE clave IN ({marcadores})", [ahora, *lote]
+            )
+        self.conexion.commit()
+        return encontrados
+    
+    def guardar_muchos(self, pares: List[Tuple[str, str]]):
+        ahora = int(time.time())
+        self.conexion.executemany(
+            "INSERT OR REPLACE INTO etiquetas (clave, etiqueta, ultimo_uso) VALUES (?, ?, ?)",
+            [(clave, etiqueta, ahora) for clave, etiqueta in pares],
+        )
+        self.conexion.commit()
+        self.podar()
+    
+    def podar(self):
+        total = self.conexion.execute("SELECT COUNT(*) FROM etiquetas").fetchone()[0]
+        exceso = total - self.max_entradas
+        if exceso > 0:
+            self.conexion.execute(
+                "DELETE FROM etiquetas WHERE clave IN "
+                "(SELECT clave FROM etiquetas ORDER BY ultimo_uso ASC LIMIT ?)", (exceso,)
+            )
+            self.conexion.commit()
+            self.logger.info(f"Caché de sentimiento: {exceso} entradas expulsadas")
+    
+    def cerrar(self):
+        self.conexion.close()
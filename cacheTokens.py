@@ -0,0 +1,162 @@
+""" 
+    cacheTokens.py
+    Descripción:
+        Esta clase implementa una caché acotada (LRU) a nivel de token. El vocabulario de los tuits
+        es muy desigual: unos pocos miles de tokens concentran la mayoría de las apariciones, por lo 
+        que guardar el resultado de la normalización de cada token evita repetir el mismo cálculo.
+
+    Métodos:
+        obtener(token, calcular):
+            Retorna el valor guardado para el token o lo calcula con la función recibida y lo guarda,
+            expulsando la entrada usada hace más tiempo cuando se supera el tamaño máximo.
+        actualizar(valores):
+            Incorpora a la caché valores calculados en otro proceso, sin contarlos como aciertos o fallos.
+        extraer_nuevos():
+            Retorna las entradas calculadas desde la última extracción. Solo se registran con
+            registrar_nuevos=True (procesos del pool, que las extraen después de cada fragmento); en el
+            proceso principal no se acumulan.
+        estadisticas():
+            Retorna los contadores de aciertos, fallos y expulsiones, junto con la tasa de aciertos.
+        extraer_contadores():
+            Retorna los contadores acumulados desde la última extracción y los reinicia (procesos del pool).
+        sumar_contadores(contadores):
+            Suma los contadores de otro proceso, para reportar en el principal los de todo el pool.
+        guardar(ruta):
+            Guarda el contenido de la caché en un archivo JSON. Las particiones del flujo guardan la misma
+            caché a la vez: bajo un bloqueo del archivo se lee lo ya guardado, se une con las entradas
+            propias (que tienen prioridad) y se reemplaza, así ninguna partición pierde los lemas de otra.
+        cargar(ruta):
+            Carga el contenido de la caché desde un archivo JSON, si existe.
+    Autor: Ivan Camilo Rosales
+    Fecha: 2025-05-21
+"""
+
+from librerias import os, json, logging, threading, contextmanager, OrderedDict, Dict, Any, Callable
+
+
+#-----  fcntl solo existe en POSIX; en Windows el bloqueo entre procesos se hace con msvcrt
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+    import msvcrt
+
+
+#-----  Marcador para diferenciar un token ausente de un token guardado con valor None
+_AUSENTE = object()
+
+
+@contextmanager
+def _bloqueo_archivo(ruta: str):
+    #-----  Bloqueo exclusivo entre procesos (y entre hilos, cada uno con su propio descriptor)
+    with open(ruta, "a") as candado:
+        if fcntl is None:
+            #-----  msvcrt bloquea el primer byte del archivo; LK_LOCK reintenta unos segundos y luego falla
+            candado.seek(0)
+            while True:
+                try:
+                    msvcrt.locking(candado.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:
+                    continue
+            try:
+                yield
+            finally:
+                candado.seek(0)
+                msvcrt.locking(candado.fileno(), msvcrt.LK_UNLCK, 1)
+            return
+        fcntl.flock(candado, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(candado, fcntl.LOCK_UN)
+
+
+class CacheTokens:
+    
+    def __init__(self, max_size: int, registrar_nuevos: bool = False):
+        self.max_size = max_size
+        self.registrar_nuevos = registrar_nuevos
+        self._datos = OrderedDict()
+        self._nuevos = {}
+        self.aciertos = 0
+        self.fallos = 0
+        self.expulsiones = 0
+        self.logger = logging.getLogger(__name__)
+    
+    def __len__(self):
+        return len(self._datos)
+    
+    def _insertar(self, token: str, valor: Any):
+        self._datos[token] = valor
+        if len(self._datos) > self.max_size:
+            self._datos.popitem(last=False)
+            self.expulsiones += 1
+    
+    def obtener(self, token: str, calcular: Callable[[str], Any]) -> Any:
+        valor = self._datos.get(token, _AUSENTE)
+        if valor is not _AUSENTE:
+            self.aciertos += 1
+            self._datos.move_to_end(token)
+            return valor
+        
+        self.fallos += 1
+        valor = calcular(token)
+        self._insertar(token, valor)
+        if self.registrar_nuevos:
+            self._nuevos[token] = valor
+        return valor
+    
+    def actualizar(self, valores: Dict[str, Any]):
+        for token, valor in valores.items():
+            self._insertar(token, valor)
+    
+    def extraer_nuevos(self) -> Dict[str, Any]:
+        nuevos, self._nuevos = self._nuevos, {}
+        return nuevos
+    
+    def extraer_contadores(self) -> Dict[str, int]:
+        contadores = {"aciertos": self.aciertos, "fallos": self.fallos, "expulsiones": self.expulsiones}
+        self.aciertos = self.fallos = self.expulsiones = 0
+        return contadores
+    
+    def sumar_contadores(self, contadores: Dict[str, int]):
+        self.aciertos += contadores["aciertos"]
+        self.fallos += contadores["fallos"]
+        self.expulsiones += contadores["expulsiones"]
+    
+    def estadisticas(self) -> Dict[str, Any]:
+        consultas = self.aciertos + self.fallos
+        return {
+            "aciertos": self.aciertos,
+            "fallos": self.fallos,
+            "expulsiones": self.expulsiones,
+            "tamano": len(self._datos),
+            "tasa_aciertos": round(self.aciertos / consultas, 4) if consultas else 0.0,
+        }
+    
+    def guardar(self, ruta: str):
+        os.makedirs(os.path.dirname(ruta) or ".", exist_ok=True)
+        with _bloqueo_archivo(f"{ruta}.lock"):
+            #-----  Primero las entradas de otras particiones y al final las propias (las más recientes);
+            #-----  si la unión supera max_size se conservan las últimas, como en el LRU
+            contenido = {}
+            if os.path.exists(ruta):
+                with open(ruta, "r", encoding="utf-8") as archivo:
+                    contenido = {token: valor for token, valor in json.load(archivo).items() if token not in self._datos}
+            contenido.update(self._datos)
+            if len(contenido) > self.max_size:
+                contenido = dict(list(contenido.items())[-self.max_size:])
+            #-----  Se escribe en un archivo temporal y se reemplaza: quien lea sin bloqueo nunca ve un JSON a medias
+            temporal = f"{ruta}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(temporal, "w", encoding="utf-8") as archivo:
+                json.dump(contenido, archivo, ensure_ascii=False)
+            os.replace(temporal, ruta)
+        self.logger.info(f"Caché de tokens guardada ({len(contenido)} entradas) \n\t {ruta}")
+    
+    def cargar(self, ruta: str):
+        if not os.path.exists(ruta):
+            return
+        with open(ruta, "r", encoding="utf-8") as archivo:
+            self.actualizar(json.load(archivo))
+        self.logger.info(f"Caché de tokens cargada ({len(self._datos)} entradas) \n\t {ruta}")
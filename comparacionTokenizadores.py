@@ -0,0 +1,118 @@
+"""
+    comparacionTokenizadores.py
+    Descripción:
+        Arnés de equivalencia entre los dos tokenizadores de TextProcessing (TOKENIZADOR en config.py):
+        word_tokenize de NLTK y tokenizar_regex. Toma una muestra aleatoria de los tuits entrantes del
+        archivo de entrada (el CSV o el ZIP dividido, leído por bloques), aplica la misma limpieza del
+        flujo (limpiar_columna) y tokeniza cada texto con ambos. Reporta las filas cuyos tokens difieren,
+        con los tokens que solo produce cada tokenizador, y el tiempo y los tuits por segundo de cada uno.
+        Termina con código 1 si encuentra diferencias: es la evidencia para cambiar TOKENIZADOR a "regex".
+
+    Funciones:
+        leer_muestra(ruta, tamano, semilla, chunksize):
+            Muestra aleatoria uniforme de los textos entrantes sin cargar el archivo completo.
+        comparar_tokenizadores(textos, idioma):
+            Tokeniza los textos limpios con ambos tokenizadores y retorna las diferencias y el resumen.
+
+    Ejemplo:
+        python comparacionTokenizadores.py
+        python comparacionTokenizadores.py data/input/twcs.csv --muestra 200000
+    Autor: Ivan Camilo Rosales
+    Fecha: 2025-05-21
+"""
+
+from librerias import (
+    os, sys, json, time, logging, argparse, Counter, np, pd,
+    Dict, Tuple, Any, setup_logging, setup_warnings
+)
+from config import *
+from textProcessing import TextProcessing, tokenizar_regex
+from lectorZip import abrir_csv
+
+
+logger = logging.getLogger(__name__)
+
+
+def leer_muestra(ruta: str, tamano: int = 50_000, semilla: int = 42, chunksize: int = CHUNK_SIZE) -> pd.Series:
+    #-----  Cada fila recibe una clave aleatoria y se conservan las `tamano` claves menores: es una muestra
+    #-----  uniforme del archivo completo con memoria acotada. El índice es la posición de la fila en el archivo
+    rng = np.random.default_rng(semilla)
+    muestra = None
+    with abrir_csv(ruta) as fuente:
+        for chunk in pd.read_csv(fuente, usecols=["inbound", "text"], chunksize=chunksize):
+            chunk = chunk[chunk["inbound"].astype(bool)]
+            bloque = pd.DataFrame({"text": chunk["text"], "clave": rng.random(len(chunk))})
+            muestra = bloque if muestra is None else pd.concat([muestra, bloque])
+            muestra = muestra.nsmallest(tamano, "clave")
+    return muestra.sort_index()["text"].fillna("").astype(str)
+
+
+def comparar_tokenizadores(textos: pd.Series, idioma: str = IDIOMA) -> Tuple[pd.DataFrame, Dict[str, Any]]:
+    text_processing = TextProcessing(idioma=idioma, n_workers=1)
+    limpio = text_processing.limpiar_columna(textos)
+
+    tokens, segundos = {}, {}
+    for nombre, tokenizador in (("nltk", text_processing.tokenizar_nltk), ("regex", tokenizar_regex)):
+        inicio = time.perf_counter()
+        tokens[nombre] = limpio.apply(tokenizador)
+        segundos[nombre] = time.perf_counter() - inicio
+
+    distintos = np.fromiter(
+        (a != b for a, b in zip(tokens["nltk"], tokens["regex"])), dtype=bool, count=len(limpio)
+    )
+    diferencias = pd.DataFrame({
+        "text": textos[distintos],
+        "limpio": limpio[distintos],
+        "nltk": tokens["nltk"][distintos],
+        "regex": tokens["regex"][distintos],
+    })
+    #-----  Tokens de más en cada lado (con repeticiones); si ambas listas quedan vacías solo cambia el orden
+    diferencias["solo_nltk"] = [
+        sorted((Counter(a) - Counter(b)).elements()) for a, b in zip(diferencias["nltk"], diferencias["regex"])
+    ]
+    diferencias["solo_regex"] = [
+        sorted((Counter(b) - Counter(a)).elements()) for a, b in zip(diferencias["nltk"], diferencias["regex"])
+    ]
+
+    resumen = {
+        "filas": len(limpio),
+        "filas_distintas": int(distintos.sum()),
+        "tokens_nltk": int(tokens["nltk"].str.len().sum()),
+        "tokens_regex": int(tokens["regex"].str.len().sum()),
+        "segundos_nltk": round(segundos["nltk"], 3),
+        "segundos_regex": round(segundos["regex"], 3),
+        "tuits_por_segundo_nltk": round(len(limpio) / segundos["nltk"], 1) if segundos["nltk"] > 0 else None,
+        "tuits_por_segundo_regex": round(len(limpio) / segundos["regex"], 1) if segundos["regex"] > 0 else None,
+        "aceleracion": round(segundos["nltk"] / segundos["regex"], 2) if segundos["regex"] > 0 else None,
+    }
+    logger.info(f"Comparación de tokenizadores: {resumen}")
+    return diferencias, resumen
+
+
+if __name__ == "__main__":
+    logger = setup_logging()
+    setup_warnings()
+
+    parser = argparse.ArgumentParser(description="Equivalencia entre word_tokenize y el tokenizador regex")
+    parser.add_argument("entrada", nargs="?", default=os.path.join(DATA_PATH_INPUT, f"{FILE_NAME_DATA_INPUT}.csv"),
+                        help="CSV de tuits (si no existe se lee el ZIP del mismo nombre)")
+    parser.add_argument("--muestra", type=int, default=50_000, help="Número de tuits entrantes de la muestra")
+    parser.add_argument("--semilla", type=int, default=42)
+    parser.add_argument("--idioma", default=IDIOMA)
+    parser.add_argument("--salida", default=os.path.join(DATA_PATH_PROCESSED, "diferencias_tokenizadores.csv"),
+                        help="CSV con las filas en que los tokenizadores difieren")
+    args = parser.parse_args()
+
+    textos = leer_muestra(args.entrada, tamano=args.muestra, semilla=args.semilla)
+    diferencias, resumen = comparar_tokenizadores(textos, idioma=args.idioma)
+    print(json.dumps(resumen, indent=2))
+
+    if len(diferencias):
+        os.makedirs(os.path.dirname(args.salida) or ".", exist_ok=True)
+        diferencias.to_csv(args.salida, index_label="fila")
+        print(f"{len(diferencias)} filas con tokens distintos (ejemplos):")
+        for fila, diferencia in diferencias.head(10).iterrows():
+            print(f"  fila {fila}: solo nltk {diferencia['solo_nltk']} - solo regex {diferencia['solo_regex']}")
+        print(f"Diferencias guardadas en {args.salida}")
+        sys.exit(1)
+    print(f"Sin diferencias en {resumen['filas']} tuits: TOKENIZADOR = \"regex\" produce los mismos tokens")
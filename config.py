@@ -12,10 +12,19 @@
 DATA_PATH_INPUT = "./data/input"
 DATA_PATH_PROCESSED = "./data/output"
 MODELOS_PATH = "./data/modelos"
+BENCHMARK_PATH = "./data/benchmark"
 
 #-----  Variables de entorno para MLFlow
 MLFLOW_TRACKING_URI = "http://0.0.0.0:5000"
 MLFLOW_EXPERIMENT_NAME = "Clasificación_Tuits"
+#-----  Registro en MLflow desde un hilo en segundo plano (seguimientoMlflow.py): parámetros, métricas y tags
+#-----  se envían agrupados con log_batch cada INTERVALO_SEGUIMIENTO_S segundos y un envío que falla se
+#-----  reintenta hasta REINTENTOS_SEGUIMIENTO veces sin detener el entrenamiento. Al terminar la ejecución
+#-----  se espera hasta ESPERA_DRENADO_S segundos a que la cola se vacíe. False registra en línea (síncrono)
+SEGUIMIENTO_ASINCRONO = True
+INTERVALO_SEGUIMIENTO_S = 2.0
+REINTENTOS_SEGUIMIENTO = 5
+ESPERA_DRENADO_S = 300
 
 #-----  Versión del desarrollo del modelo
 VERSION = 2
@@ -23,12 +32,148 @@ VERSION = 2
 #-----  Idioma en que están los datos
 IDIOMA = "english"
 
+#-----  Recursos de NLTK: se verifican una sola vez por proceso contra este directorio (y las rutas
+#-----  por defecto de NLTK). Sin recursos el proceso falla de inmediato; solo se descargan si se habilita
+NLTK_DATA_PATH = "./data/nltk_data"
+NLTK_PERMITIR_DESCARGA = False
+
 #-----  Nombre del archivo inicial
 FILE_NAME_DATA_INPUT = "twcs"
 
 #----- Nombre del archivo que tiene la data lista para ser procesada por el modelo
 FILE_NAME_DATA_FEATURE = "feature_twcs"
 
+#-----  Formato de los archivos intermedios entre etapas ("parquet" o "csv")
+FORMATO_INTERMEDIO = "parquet"
+COMPRESION_INTERMEDIA = "zstd"
+
+#-----  Lectura por bloques (streaming) del archivo de entrada
+#-----  Con MODO_STREAMING activo el archivo se procesa en bloques de CHUNK_SIZE filas,
+#-----  manteniendo acotado el consumo de memoria sin importar el tamaño del archivo
+MODO_STREAMING = True
+CHUNK_SIZE = 100_000
+COLUMNAS_ENTRADA = ["inbound", "text"]
+
+#-----  Procesamiento en paralelo del texto (procesos)
+#-----  NUM_WORKERS = None usa todos los núcleos disponibles, 1 desactiva el paralelismo
+NUM_WORKERS = None
+#-----  Por debajo de este número de filas no compensa levantar el pool de procesos
+MIN_FILAS_PARALELO = 10_000
+
+#-----  Flujo particionado: la entrada se divide en NUM_SHARDS particiones y las etapas de texto y de
+#-----  features se ejecutan por partición, con hasta CONCURRENCIA_SHARDS particiones a la vez.
+#-----  TASK_RUNNER_SHARDS elige cómo corren las tareas: "hilos" (ThreadPoolTaskRunner) o "procesos"
+#-----  (ProcessPoolTaskRunner). Con NUM_SHARDS = 1 el flujo procesa el archivo completo sin particionar
+NUM_SHARDS = 4
+CONCURRENCIA_SHARDS = 2
+TASK_RUNNER_SHARDS = "hilos"
+#-----  Presupuesto de procesos del flujo particionado: total de procesos de preprocesamiento que pueden correr
+#-----  a la vez en esta máquina. Cada tarea de texto abre su propio pool con PRESUPUESTO_WORKERS //
+#-----  CONCURRENCIA_SHARDS procesos (NUM_WORKERS, si se fija, lo puede bajar). Con TASK_RUNNER_SHARDS = "procesos"
+#-----  el proceso del task runner solo espera a su pool, así que no cuenta. Si varios workers de Prefect
+#-----  comparten la máquina, a cada uno se le asigna su parte (núcleos / workers). None = núcleos disponibles
+PRESUPUESTO_WORKERS = None
+
+#-----  Deduplicación después de data_transform: el preprocesamiento se ejecuta una vez por texto único
+#-----  y el resultado se replica a todas las filas del grupo. Los grupos se conservan entre los bloques de
+#-----  MODO_STREAMING: un texto repetido en dos bloques se procesa una vez. DEDUP_CERCANOS agrupa además
+#-----  los textos casi idénticos (MinHash + LSH) cuya similitud de Jaccard estimada supere UMBRAL_SIMILITUD
+DEDUPLICACION_ACTIVA = True
+DEDUP_CERCANOS = False
+UMBRAL_SIMILITUD = 0.9
+NUM_PERMUTACIONES_MINHASH = 64
+BANDAS_LSH = 16
+TAMANO_SHINGLE = 5
+#-----  En el entrenamiento queda una fila por grupo; con USAR_PESOS_DUPLICADOS el tamaño del grupo
+#-----  se usa como sample_weight
+USAR_PESOS_DUPLICADOS = False
+
+#-----  Tokenizador del texto limpio: "nltk" (word_tokenize) o "regex" (minúsculas, contracciones de
+#-----  NLTKWordTokenizer y separación por espacios, sin la segmentación en oraciones de Punkt).
+#-----  Sobre el texto ya limpio ambos deben dar los mismos tokens; comparacionTokenizadores.py lo verifica
+TOKENIZADOR = "nltk"
+
+#-----  Caché de tokens (stopwords + lematización)
+TAMANO_CACHE_TOKENS = 200_000
+#-----  Si está activo, la tabla de lemas se guarda al final de cada ejecución y se carga al iniciar la siguiente
+PERSISTIR_CACHE_LEMAS = True
+
+#-----  Umbrales del score compuesto de VADER para asignar la etiqueta de sentimiento
+UMBRAL_POSITIVO = 0.05
+UMBRAL_NEGATIVO = -0.05
+
+#-----  Caché persistente de etiquetas de sentimiento
+CACHE_SENTIMIENTO_ACTIVO = True
+MAX_ENTRADAS_CACHE_SENTIMIENTO = 5_000_000
+
+#-----  Caché de etapas: cada tarea reutiliza su salida si la entrada, la configuración y el código no cambiaron
+CACHE_ETAPAS_ACTIVO = True
+
+#-----  Servicio de inferencia en línea (servicioInferencia.py)
+SERVICIO_HOST = "0.0.0.0"
+SERVICIO_PUERTO = 8000
+#-----  Un micro-lote se cierra al llegar a MAX_BATCH_SIZE textos o al pasar MAX_ESPERA_BATCH_MS milisegundos
+MAX_BATCH_SIZE = 64
+MAX_ESPERA_BATCH_MS = 2
+INTERVALO_REPORTE_SERVICIO_S = 30
+#-----  Límites por solicitud de POST /predict: número de textos y tamaño del cuerpo (bytes)
+MAX_TEXTOS_SOLICITUD = 256
+MAX_CUERPO_BYTES = 1_048_576
+#-----  Si existe paquete_modelo.bin (exportado al entrenar) el servicio predice con él, solo con NumPy,
+#-----  sin cargar los pickles de scikit-learn
+USAR_PAQUETE_INFERENCIA = True
+
+#-----  Predicción por lotes (prediccionLotes.py): cada lote de TAMANO_LOTE_PREDICCION filas se clasifica en
+#-----  un proceso del pool y como máximo MAX_LOTES_EN_VUELO lotes están leídos y sin escribir a la vez
+#-----  (None = el doble de procesos). NUM_WORKERS_PREDICCION = None usa todos los núcleos disponibles
+TAMANO_LOTE_PREDICCION = 20_000
+NUM_WORKERS_PREDICCION = None
+MAX_LOTES_EN_VUELO = None
+
+#-----  Tipo de entrenamiento:
+#-----      un modelo del registro de ModelTrain ("logistic_regression", "linear_svc", "multinomial_nb",
+#-----      "complement_nb", "sgd"), "comparar" (entrena FAMILIAS_MODELOS y elige el ganador)
+#-----      "sgd_hashing" (por bloques, out-of-core) o "sgd_incremental" (incorpora el archivo de features
+#-----      como un lote nuevo sobre el vocabulario, las frecuencias de documentos y el modelo guardados)
+MODEL_TYPE = "logistic_regression"
+
+#-----  Con Parquet la matriz de conteos se construye desde los tokens de TextPreproc (ids de vocabulario)
+#-----  en lugar de re-tokenizar textCls con CountVectorizer; el resultado es idéntico
+MATRIZ_DESDE_TOKENS = True
+
+#-----  Comparación de familias de modelos (MODEL_TYPE = "comparar")
+FAMILIAS_MODELOS = ["logistic_regression", "linear_svc", "multinomial_nb", "complement_nb", "sgd"]
+#-----  Parámetros por familia (se combinan con los valores por defecto del registro)
+PARAMETROS_FAMILIAS = {
+    "linear_svc": {"C": 1.0},
+    "multinomial_nb": {"alpha": 0.1},
+    "complement_nb": {"alpha": 0.3},
+    "sgd": {"alpha": 1e-5},
+}
+#-----  None entrena todas las familias a la vez
+NUM_WORKERS_FAMILIAS = None
+#-----  Peso de la latencia al elegir el ganador: 0 elige solo por fscore, 1 solo por throughput de inferencia
+PESO_LATENCIA = 0.0
+
+#-----  Pasadas de partial_fit sobre cada lote nuevo (MODEL_TYPE = "sgd_incremental")
+EPOCAS_INCREMENTAL = 5
+
+#-----  Parámetros del entrenamiento out-of-core (MODEL_TYPE = "sgd_hashing")
+CHUNK_SIZE_ENTRENAMIENTO = 200_000
+N_FEATURES_HASHING = 2 ** 20
+EPOCAS_OUT_OF_CORE = 1
+PARAMETERS_SGD = {
+    "loss": "log_loss",
+    "alpha": 1e-6,
+    "random_state": 40,
+}
+
+#-----  Instrumentación de rendimiento: perfilador por muestreo opcional (pilas en formato collapsed)
+PERFILADOR_ACTIVO = False
+INTERVALO_MUESTREO_MS = 5
+#-----  Cada cuánto se muestrea la memoria RSS actual mientras hay un sub-paso en medición
+INTERVALO_MEMORIA_MS = 20
+
 #-----  Parámetros del Modelo
 PARAMETERS_MODEL = {
     "C": 1.0,
@@ -41,6 +186,23 @@ PARAMETERS_MODEL = {
     "tol": 0.0001,
 }
 
+#-----  Búsqueda de hiperparámetros de LogisticRegression (training_model la usa si MODO_BUSQUEDA está activo)
+#-----  Cada combinación de penalty_solver y class_weight es una ruta que recorre los valores de C con warm start
+MODO_BUSQUEDA = False
+GRILLA_BUSQUEDA = {
+    "penalty_solver": [("l2", "lbfgs"), ("l2", "saga"), ("l1", "saga")],
+    "class_weight": [None, "balanced"],
+    "C": [0.01, 0.03, 0.1, 0.3, 1.0, 3.0, 10.0, 30.0, 100.0],
+}
+#-----  None evalúa la grilla completa; un entero evalúa una muestra aleatoria de ese tamaño
+MAX_CANDIDATOS_BUSQUEDA = None
+NUM_WORKERS_BUSQUEDA = None
+#-----  Successive halving: cada ronda multiplica las iteraciones y conserva 1/FACTOR_DESCARTE de los candidatos
+FACTOR_DESCARTE = 3
+ITERACIONES_MINIMAS = 10
+ITERACIONES_MAXIMAS = 270
+FRACCION_VALIDACION = 0.2
+
 #-----  Variables generales
 DEVELOPER_NAME = "Ivan Camilo Rosales"
 MODEL_NAME = "LogisticRegression"
\ No newline at end of file
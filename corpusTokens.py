@@ -0,0 +1,108 @@
+"""
+    corpusTokens.py
+    Descripción:
+        Representación del corpus como identificadores de vocabulario: cada documento es un tramo de
+        un arreglo de ids (offsets + ids, sin un objeto str de Python por token). Se construye desde la
+        columna TextPreproc tal como la entrega Arrow (lista de strings), codificando los tokens con un
+        diccionario; la normalización de CountVectorizer (minúsculas y token_pattern) se aplica una sola
+        vez por token distinto y no por aparición.
+
+        La matriz de conteos se arma directamente desde los arreglos, sin volver a unir los tokens en
+        textCls ni re-tokenizar: el resultado es idéntico al de CountVectorizer().fit_transform(textCls)
+        (mismo vocabulario ordenado alfabéticamente, mismos arreglos data/indices/indptr y conteos int64).
+
+    Clases:
+        CorpusTokens:
+            desde_arrow(columna):
+                Construye el corpus desde un arreglo Arrow de listas de tokens.
+            desde_serie(serie):
+                Construye el corpus desde una columna de pandas (respaldada por Arrow o con listas).
+            matriz_conteos():
+                Retorna la matriz CSR de conteos documento x término.
+            count_vectorizer():
+                CountVectorizer con el vocabulario del corpus, para transformar textos nuevos al servir.
+    Autor: Ivan Camilo Rosales
+    Fecha: 2025-05-21
+"""
+
+from librerias import re, logging, np, pd, pa, pc, csr_matrix, List, CountVectorizer
+
+
+#-----  Mismo patrón que CountVectorizer().token_pattern
+PATRON_TOKEN = re.compile(r"(?u)\b\w\w+\b")
+
+
+class CorpusTokens:
+
+    def __init__(self, offsets: np.ndarray, ids: np.ndarray, terminos: List[str]):
+        #-----  El documento i ocupa ids[offsets[i]:offsets[i + 1]]; terminos está ordenado alfabéticamente
+        self.offsets = offsets
+        self.ids = ids
+        self.terminos = terminos
+        self.logger = logging.getLogger(__name__)
+
+    @classmethod
+    def desde_arrow(cls, columna) -> "CorpusTokens":
+        if isinstance(columna, pa.ChunkedArray):
+            columna = columna.combine_chunks()
+        #-----  Un documento nulo se trata como un documento sin tokens
+        longitudes = pc.fill_null(pc.list_value_length(columna), 0).to_numpy()
+        codificado = pc.dictionary_encode(pc.fill_null(pc.list_flatten(columna), ""))
+        apariciones = codificado.indices.to_numpy()
+        tokens = codificado.dictionary.to_pylist()
+
+        #-----  Términos de cada token distinto: CountVectorizer pasa el texto a minúsculas y extrae
+        #-----  token_pattern; como los tokens se unen con espacios, aplicarlo por token da el mismo resultado
+        terminos_token = [PATRON_TOKEN.findall(token.lower()) for token in tokens]
+        terminos = sorted({termino for lista in terminos_token for termino in lista})
+        if not terminos:
+            raise ValueError("empty vocabulary; perhaps the documents only contain stop words")
+        indice = {termino: i for i, termino in enumerate(terminos)}
+        valores = np.fromiter(
+            (indice[termino] for lista in terminos_token for termino in lista), dtype=np.int32
+        )
+        por_token = np.fromiter((len(lista) for lista in terminos_token), dtype=np.int64, count=len(tokens))
+        inicio_token = np.cumsum(por_token) - por_token
+
+        #-----  Cada aparición se expande a sus términos (normalmente 0 o 1) sin recorrer los tokens en Python
+        por_aparicion = por_token[apariciones]
+        inicio_salida = np.cumsum(por_aparicion) - por_aparicion
+        posiciones = np.repeat(inicio_token[apariciones] - inicio_salida, por_aparicion)
+        ids = valores[posiciones + np.arange(len(posiciones))]
+
+        offsets_tokens = np.concatenate([[0], np.cumsum(longitudes)])
+        offsets = np.concatenate([[0], np.cumsum(por_aparicion)])[offsets_tokens]
+        return cls(offsets.astype(np.int64), ids, terminos)
+
+    @classmethod
+    def desde_serie(cls, serie: pd.Series) -> "CorpusTokens":
+        if isinstance(serie.dtype, pd.ArrowDtype):
+            return cls.desde_arrow(pa.array(serie.array))
+        return cls.desde_arrow(pa.array(
+            [None if tokens is None else list(tokens) for tokens in serie], type=pa.list_(pa.string())
+        ))
+
+    def matriz_conteos(self) -> csr_matrix:
+        #-----  CountVectorizer numera los términos por orden de aparición, suma y ordena los índices de cada
+        #-----  fila con esa numeración y al final la traduce al vocabulario alfabético: se replica igual para
+        #-----  que los índices queden en el mismo orden dentro de cada fila
+        vistos, primera = np.unique(self.ids, return_index=True)
+        alfabetico = vistos[np.argsort(primera, kind="stable")].astype(np.int32)
+        aparicion = np.empty(len(self.terminos), dtype=np.int32)
+        aparicion[alfabetico] = np.arange(len(alfabetico), dtype=np.int32)
+
+        X = csr_matrix(
+            (np.ones(len(self.ids), dtype=np.int64), aparicion[self.ids], self.offsets),
+            shape=(len(self.offsets) - 1, len(self.terminos)),
+        )
+        X.sum_duplicates()
+        X.indices = alfabetico[X.indices]
+        X.has_sorted_indices = False
+        self.logger.info(
+            f"Matriz de conteos desde ids de tokens: {X.shape[0]} documentos, "
+            f"{X.shape[1]} términos, {len(self.ids)} apariciones"
+        )
+        return X
+
+    def count_vectorizer(self) -> CountVectorizer:
+        return CountVectorizer(vocabulary={termino: i for i, termino in enumerate(self.terminos)})
@@ -0,0 +1,178 @@
+"""
+    deduplicacion.py
+    Descripción:
+        Agrupa los tuits repetidos para que el preprocesamiento costoso (tokenización, stopwords y
+        lematización) se ejecute una sola vez por texto único y el resultado se replique a todas las
+        filas del grupo.
+
+        El Deduplicador conserva los grupos entre llamadas: en MODO_STREAMING cada bloque se agrupa junto
+        con los anteriores de la misma ejecución, así un texto repetido en dos bloques queda en el mismo
+        grupo (su id es la posición global de la primera fila) y solo se procesa la primera vez.
+        reiniciar() descarta ese estado al empezar otro archivo.
+
+        Duplicados exactos: se comparan los textos ya limpios, en minúsculas y con los espacios
+        normalizados, mediante un hash vectorizado. Dos textos con la misma clave producen exactamente
+        los mismos tokens, así que replicar el resultado no cambia la salida.
+        Duplicados cercanos (opcional): firmas MinHash sobre shingles de caracteres y LSH por bandas
+        para encontrar candidatos; un candidato se une al grupo si la similitud de Jaccard estimada
+        con el primer texto de su cubeta supera el umbral. En este caso todas las filas del grupo
+        reciben el resultado del primer texto (aproximación). Las cubetas y las firmas de sus primeros
+        textos también se conservan entre bloques; dos grupos de bloques anteriores no se unen, porque
+        sus filas ya se escribieron.
+
+    Clases:
+        Deduplicador:
+            reiniciar():
+                Descarta los grupos, cubetas y firmas de los bloques anteriores.
+            normalizar(columna):
+                Clave de comparación de cada texto limpio.
+            firmas_minhash(textos):
+                Calcula la firma MinHash de cada texto.
+            agrupar_cercanos(textos, ids):
+                Une cada texto al grupo (de este bloque o de uno anterior) cuya similitud estimada supera el umbral.
+            agrupar(columna_limpia, inicio):
+                Retorna el grupo de cada fila, las posiciones de las filas que abren un grupo nuevo y las estadísticas.
+
+    Funciones:
+        colapsar_duplicados(df):
+            Deja una sola fila por grupo para el entrenamiento; agrega la columna peso con el tamaño del grupo.
+    Autor: Ivan Camilo Rosales
+    Fecha: 2025-05-21
+"""
+
+from librerias import (
+    re, zlib, logging, np, pd, Dict, List, Tuple
+)
+from config import (
+    DEDUP_CERCANOS, UMBRAL_SIMILITUD, NUM_PERMUTACIONES_MINHASH, BANDAS_LSH, TAMANO_SHINGLE
+)
+
+
+#-----  Primo de Mersenne 2^31 - 1: los productos a * x caben en uint64 sin desbordarse
+PRIMO_MINHASH = (1 << 31) - 1
+PATRON_ESPACIOS = re.compile(r'\s+')
+
+
+class Deduplicador:
+
+    def __init__(
+        self, cercanos: bool = DEDUP_CERCANOS, umbral: float = UMBRAL_SIMILITUD,
+        num_permutaciones: int = NUM_PERMUTACIONES_MINHASH, bandas: int = BANDAS_LSH,
+        tamano_shingle: int = TAMANO_SHINGLE, semilla: int = 40
+    ):
+        if num_permutaciones % bandas != 0:
+            raise ValueError("num_permutaciones debe ser múltiplo de bandas")
+        self.cercanos = cercanos
+        self.umbral = umbral
+        self.num_permutaciones = num_permutaciones
+        self.bandas = bandas
+        self.tamano_shingle = tamano_shingle
+        generador = np.random.default_rng(semilla)
+        self._a = generador.integers(1, PRIMO_MINHASH, num_permutaciones, dtype=np.uint64)
+        self._b = generador.integers(0, PRIMO_MINHASH, num_permutaciones, dtype=np.uint64)
+        #-----  Multiplicadores impares para resumir cada banda de la firma en un solo uint64
+        self._mezcla = generador.integers(1, 1 << 62, num_permutaciones // bandas, dtype=np.uint64) | np.uint64(1)
+        self.logger = logging.getLogger(__name__)
+        self.reiniciar()
+
+    def reiniciar(self) -> None:
+        #-----  Estado entre bloques: clave exacta -> id de grupo; con cercanos, por banda la cubeta -> id del
+        #-----  primer grupo que cayó en ella, y la firma de esos grupos
+        self._grupos = {}
+        self._cubetas = [{} for _ in range(self.bandas)]
+        self._firmas = {}
+
+    def normalizar(self, columna: pd.Series) -> pd.Series:
+        return columna.str.lower().str.replace(PATRON_ESPACIOS, ' ', regex=True).str.strip()
+
+    def _shingles(self, texto: str) -> set:
+        k = self.tamano_shingle
+        if len(texto) <= k:
+            return {texto}
+        return {texto[i:i + k] for i in range(len(texto) - k + 1)}
+
+    def firmas_minhash(self, textos: List[str]) -> np.ndarray:
+        firmas = np.empty((len(textos), self.num_permutaciones), dtype=np.uint64)
+        for i, texto in enumerate(textos):
+            hashes = np.fromiter(
+                (zlib.crc32(shingle.encode("utf-8")) for shingle in self._shingles(texto)), dtype=np.uint64
+            ) % np.uint64(PRIMO_MINHASH)
+            firmas[i] = ((self._a[:, None] * hashes[None, :] + self._b[:, None]) % np.uint64(PRIMO_MINHASH)).min(axis=1)
+        return firmas
+
+    def agrupar_cercanos(self, textos: List[str], ids: np.ndarray) -> np.ndarray:
+        #-----  ids es el grupo propio de cada texto (la posición global de su primera fila). Cada texto se
+        #-----  compara con el primero que cayó en su cubeta, en este bloque o en uno anterior
+        firmas = self.firmas_minhash(textos)
+        ids = ids.tolist()
+        fila = {grupo: i for i, grupo in enumerate(ids)}
+        padre = {}
+        primeros = set()
+
+        def raiz(grupo: int) -> int:
+            while padre.get(grupo, grupo) != grupo:
+                grupo = padre[grupo]
+            return grupo
+
+        filas = self.num_permutaciones // self.bandas
+        for banda, cubetas in enumerate(self._cubetas):
+            #-----  Con overflow intencional: es solo una clave de cubeta, no un hash criptográfico
+            with np.errstate(over="ignore"):
+                claves = (firmas[:, banda * filas:(banda + 1) * filas] * self._mezcla).sum(axis=1)
+            for i, clave in enumerate(claves.tolist()):
+                primero = cubetas.setdefault(clave, ids[i])
+                if primero == ids[i]:
+                    primeros.add(primero)
+                    continue
+                firma = firmas[fila[primero]] if primero in fila else self._firmas[primero]
+                if (firmas[i] == firma).mean() >= self.umbral:
+                    r1, r2 = raiz(primero), raiz(ids[i])
+                    #-----  La raíz es siempre el id menor: el primer texto del grupo. Dos grupos de bloques
+                    #-----  anteriores no se unen (el mayor debe ser de este bloque)
+                    if r1 != r2 and max(r1, r2) in fila:
+                        padre[max(r1, r2)] = min(r1, r2)
+
+        #-----  Solo se guardan las firmas de los textos que quedaron como primeros de alguna cubeta
+        for grupo in primeros:
+            self._firmas[grupo] = firmas[fila[grupo]].copy()
+        return np.array([raiz(grupo) for grupo in ids], dtype=np.int64)
+
+    def agrupar(self, columna_limpia: pd.Series, inicio: int = 0) -> Tuple[np.ndarray, np.ndarray, Dict[str, int]]:
+        #-----  inicio es la posición global de la primera fila del bloque
+        normalizado = self.normalizar(columna_limpia)
+        hashes = pd.util.hash_pandas_object(normalizado, index=False).values
+        #-----  factorize numera las claves en orden de primera aparición
+        inverso, claves = pd.factorize(hashes)
+        _, primeras = np.unique(inverso, return_index=True)
+
+        #-----  Las claves vistas en bloques anteriores conservan su grupo; las demás abren uno nuevo
+        ids = np.fromiter((self._grupos.get(clave, -1) for clave in claves.tolist()), dtype=np.int64, count=len(claves))
+        nuevas = np.flatnonzero(ids < 0)
+        ids[nuevas] = inicio + primeras[nuevas]
+        if self.cercanos and len(nuevas):
+            ids[nuevas] = self.agrupar_cercanos(normalizado.values[primeras[nuevas]].tolist(), ids[nuevas])
+        self._grupos.update(zip(claves[nuevas].tolist(), ids[nuevas].tolist()))
+
+        #-----  Representantes: primeras filas de los grupos nuevos, los únicos textos que hay que procesar
+        representantes = primeras[nuevas][ids[nuevas] == inicio + primeras[nuevas]]
+        estadisticas = {
+            "filas": len(columna_limpia),
+            "unicos_exactos": len(nuevas),
+            "grupos": len(representantes),
+            "duplicados_exactos": len(columna_limpia) - len(nuevas),
+            "duplicados_cercanos": len(nuevas) - len(representantes),
+        }
+        return ids[inverso], representantes, estadisticas
+
+
+def colapsar_duplicados(df: pd.DataFrame) -> pd.DataFrame:
+    if "id_grupo" not in df.columns:
+        return df
+    #-----  El peso se cuenta sobre el archivo completo: un grupo puede tener filas en varios bloques
+    peso = df["id_grupo"].value_counts()
+    colapsado = df.drop_duplicates(subset="id_grupo").reset_index(drop=True)
+    colapsado["peso"] = colapsado["id_grupo"].map(peso).to_numpy()
+    logging.getLogger(__name__).info(
+        f"Deduplicación para entrenamiento: {len(df)} filas -> {len(colapsado)} textos únicos"
+    )
+    return colapsado
@@ -6,37 +6,69 @@
         
     Métodos:
         save_processed_data:
-            Guarda los datos del DataFrame en un archivo .csv.
+            Guarda los datos del DataFrame en el formato intermedio configurado (Parquet o CSV).
         read_csv: 
             Carga el archivo preprocesado y lo convierte en un DataFrame.
+        read_data:
+            Carga el archivo preprocesado en el formato intermedio configurado, solo con las columnas indicadas.
         etiquetar_sentimiento: 
             Recibe un texto y le asigna una categoría según el puntaje (score) obtenido.
+        etiquetar_columna:
+            Etiqueta una columna completa calculando el sentimiento una sola vez por texto distinto
+            y reutilizando las etiquetas guardadas en la caché persistente.
+        abrir_cache:
+            Abre la caché de sentimiento (None si CACHE_SENTIMIENTO_ACTIVO está apagado).
         data_transform: 
             Recibe un DataFrame y convierte todas las columnas según el tipo de dato que contienen.
         run:   
             Integra todos los métodos anteriores para ejecutar el proceso completo de forma secuencial.
+            La caché se abre al inicio y su conexión se cierra al terminar, también si la etapa falla.
     Autor: Ivan Camilo Rosales
     Fecha: 2025-05-21
     
 """
 
-from librerias import (
-    pd, os, logging, 
-    SentimentIntensityAnalyzer,
-    plt
-)
+#-----  NLTK se importa al crear el extractor, no al importar el módulo
+from librerias import pd, os, json, hashlib, logging, setup_nltk
 from config import *
+from cacheSentimiento import CacheSentimiento
+from almacenamiento import nombre_archivo, guardar_datos, leer_datos
+from instrumentacion import Instrumentacion
 
 class FeatureExtraction:
     
     def __init__(self):
         logging.basicConfig(level=logging.INFO)
         self.logger = logging.getLogger(__name__)
+        setup_nltk(NLTK_DATA_PATH, NLTK_PERMITIR_DESCARGA)
+        from librerias import SentimentIntensityAnalyzer
         self.sia = SentimentIntensityAnalyzer()
+        self.instrumentacion = Instrumentacion(etapa="feature_extraction")
+        #-----  La conexión con la caché solo está abierta durante run()
+        self.cache = None
+    
+    def abrir_cache(self):
+        if not CACHE_SENTIMIENTO_ACTIVO:
+            return None
+        return CacheSentimiento(
+            ruta=os.path.join(MODELOS_PATH, "cache_sentimiento.db"),
+            firma=self.firma_etiquetado(),
+            max_entradas=MAX_ENTRADAS_CACHE_SENTIMIENTO,
+        )
+    
+    def firma_etiquetado(self) -> str:
+        #-----  Identifica la versión del léxico de VADER y los umbrales con que se etiqueta
+        from librerias import nltk
+        contenido = json.dumps({
+            "nltk": nltk.__version__,
+            "lexicon": sorted(self.sia.lexicon.items()),
+            "umbrales": [UMBRAL_POSITIVO, UMBRAL_NEGATIVO],
+        })
+        return hashlib.sha1(contenido.encode("utf-8")).hexdigest()
 
     def save_processed_data(self, df: pd.DataFrame, path: str, file_name: str) -> None:
         file_path = os.path.join(path, file_name)
-        df.to_csv(file_path, index=False)
+        guardar_datos(df, file_path)
         self.logger.info(f"Guardado exitoso de datos preprocesados \n\t {file_path}")
         
     def read_csv(self, path: str, filename: str):
@@ -44,15 +76,57 @@ class FeatureExtraction:
         df = pd.read_csv(file_path)
         self.logger.info(f"Ingesta de datos en curso \n\t {file_path}")
         return df
+    
+    def read_data(self, path: str, filename: str, columns: list = None):
+        file_path = os.path.join(path, filename)
+        df = leer_datos(file_path, columnas=columns)
+        self.logger.info(f"Ingesta de datos en curso \n\t {file_path}")
+        return df
 
     def etiquetar_sentimiento(self,texto:str):
         score = self.sia.polarity_scores(texto)['compound']
-        if score >= 0.05:
+        if score >= UMBRAL_POSITIVO:
             return 'positivo'
-        elif score <= -0.05:
+        elif score <= UMBRAL_NEGATIVO:
             return 'negativo'
         else:
             return 'neutral'
+    
+    def normalizar_texto(self, texto: str) -> str:
+        #-----  VADER separa las palabras por espacios, así que unificar espacios no cambia el score
+        return " ".join(texto.split())
+    
+    def etiquetar_columna(self, textos: pd.Series) -> pd.Series:
+        normalizados = textos.map(self.normalizar_texto)
+        unicos = normalizados.unique()
+        
+        encontrados = {}
+        if self.cache is not None:
+            with self.instrumentacion.medir("cache_lectura", len(unicos)) as registro:
+                claves = {texto: self.cache.clave(texto) for texto in unicos}
+                en_cache = self.cache.obtener_muchos(list(claves.values()))
+                encontrados = {
+                    texto: en_cache[clave] for texto, clave in claves.items() if clave in en_cache
+                }
+                registro["filas_salida"] = len(encontrados)
+        
+        etiquetas = dict(encontrados)
+        nuevos = []
+        with self.instrumentacion.medir("vader", len(unicos) - len(encontrados)):
+            for texto in unicos:
+                if texto not in etiquetas:
+                    etiquetas[texto] = self.etiquetar_sentimiento(texto)
+                    nuevos.append(texto)
+        if self.cache is not None and nuevos:
+            with self.instrumentacion.medir("cache_escritura", len(nuevos)):
+                self.cache.guardar_muchos([(claves[texto], etiquetas[texto]) for texto in nuevos])
+        
+        filas_cache = int(normalizados.isin(encontrados.keys()).sum())
+        self.logger.info(
+            f"Etiquetado de sentimiento: {filas_cache} filas desde caché, "
+            f"{len(textos) - filas_cache} filas calculadas ({len(nuevos)} textos distintos con VADER)"
+        )
+        return normalizados.map(etiquetas)
         
     def data_transform(self, df: pd.DataFrame):
         #-----  convertimos la columna inbound a boolean
@@ -66,21 +140,42 @@ class FeatureExtraction:
         return df
     
     def run(self,file_name: str, version: int):
-        name_data_input = f"processing_{file_name}_{version}.csv"
-        data = self.read_csv(
-            DATA_PATH_PROCESSED, name_data_input
-        )
+        #-----  Cada archivo (o partición) guarda su propio reporte de rendimiento
+        self.instrumentacion.etapa = f"feature_extraction_{file_name}"
+        self.instrumentacion.iniciar_perfil()
+        name_data_input = nombre_archivo(f"processing_{file_name}_{version}")
+        columnas = ["inbound", "text", "TextPreproc", "textCls"]
+        if DEDUPLICACION_ACTIVA:
+            columnas += ["id_grupo"]
+        with self.instrumentacion.medir("lectura") as registro:
+            data = self.read_data(
+                DATA_PATH_PROCESSED, name_data_input,
+                columns=columnas,
+            )
+            registro["filas_salida"] = len(data)
         
-        data = self.data_transform(data)
-        data = data.dropna(axis=1)
-        data.dropna(inplace=True)
-        data['sentimiento'] = data['textCls'].apply(self.etiquetar_sentimiento)
+        with self.instrumentacion.medir("transformacion", len(data)) as registro:
+            data = self.data_transform(data)
+            data = data.dropna(axis=1)
+            data.dropna(inplace=True)
+            registro["filas_salida"] = len(data)
+        #-----  Cada ejecución (y cada reintento de Prefect) abre su conexión y la cierra aunque falle
+        self.cache = self.abrir_cache()
+        try:
+            with self.instrumentacion.medir("etiquetado_sentimiento", len(data)):
+                data['sentimiento'] = self.etiquetar_columna(data['textCls'])
+        finally:
+            if self.cache is not None:
+                self.cache.cerrar()
+                self.cache = None
         
-        self.save_processed_data(
-            df=data,
-            path=DATA_PATH_PROCESSED,
-            file_name=f"feature_{file_name}_{version}.csv",
-        )
+        with self.instrumentacion.medir("escritura", len(data)):
+            self.save_processed_data(
+                df=data,
+                path=DATA_PATH_PROCESSED,
+                file_name=nombre_archivo(f"feature_{file_name}_{version}"),
+            )
+        self.instrumentacion.guardar(DATA_PATH_PROCESSED)
 
 """ if __name__ == "__main__":
     text_processing = FeatureExtraction()
@@ -0,0 +1,248 @@
+""" 
+    instrumentacion.py
+    Descripción:
+        Instrumentación liviana de rendimiento para las etapas del flujo (TextProcessing, 
+        FeatureExtraction y ModelTrain). Cada sub-paso se mide con un context manager que registra
+        tiempo de reloj, tiempo de CPU, filas de entrada y salida, filas por segundo y el pico de 
+        memoria RSS del proceso dentro del sub-paso: la RSS actual (/proc/self/statm) se muestrea en
+        un hilo mientras el sub-paso está abierto, en lugar del máximo de toda la vida del proceso
+        (ru_maxrss). También se registra el ru_maxrss de los procesos hijos ya terminados
+        (RUSAGE_CHILDREN). Los sub-pasos medidos en los procesos de un pool se retornan con cada
+        resultado (extraer_registros) y el proceso principal los incorpora a los suyos. Opcionalmente se ejecuta un perfilador por muestreo que guarda las 
+        pilas de llamadas en formato "collapsed" (compatible con flamegraph.pl y speedscope).
+        Los resultados de cada etapa se guardan en rendimiento_{etapa}.json y se registran como 
+        métricas y artefactos en la ejecución de MLflow del entrenamiento.
+
+    Clases:
+        PerfiladorMuestreo:
+            Toma muestras periódicas de la pila de llamadas del hilo que lo inició.
+        MuestreadorMemoria:
+            Muestrea la RSS actual y mantiene el pico de cada ventana de medición abierta.
+        Instrumentacion:
+            Registra las mediciones de cada sub-paso de una etapa y las guarda en JSON.
+            extraer_registros() / incorporar(registros) llevan las mediciones de un proceso hijo al principal.
+
+    Funciones:
+        registrar_en_mlflow(archivos, seguimiento):
+            Registra las métricas y artefactos de rendimiento con la fachada de MLflow indicada
+            (o en línea en la ejecución activa).
+    Autor: Ivan Camilo Rosales
+    Fecha: 2025-05-21
+"""
+
+from librerias import (
+    os, sys, json, time, logging, threading, contextmanager,
+    Counter, Dict, List, Any, Optional
+)
+from config import PERFILADOR_ACTIVO, INTERVALO_MUESTREO_MS, INTERVALO_MEMORIA_MS
+from seguimientoMlflow import SeguimientoMlflow, seguimiento_sincrono
+
+
+#-----  resource solo existe en POSIX; sin él los picos de memoria que se leen de rusage se reportan en 0
+try:
+    import resource
+except ImportError:
+    resource = None
+
+_TAMANO_PAGINA = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+
+def _rss_actual_mb() -> float:
+    #-----  Segundo campo de /proc/self/statm: páginas residentes. Fuera de Linux se usa el máximo
+    #-----  de vida del proceso, que es lo único que ofrece resource
+    try:
+        with open("/proc/self/statm", "rb") as archivo:
+            return int(archivo.read().split()[1]) * _TAMANO_PAGINA / 1024 ** 2
+    except OSError:
+        return _ru_maxrss_mb("RUSAGE_SELF")
+
+
+def _ru_maxrss_mb(quien: str) -> float:
+    #-----  En Linux ru_maxrss se reporta en KB; con RUSAGE_CHILDREN es el del hijo terminado de mayor pico
+    if resource is None:
+        return 0.0
+    return resource.getrusage(getattr(resource, quien)).ru_maxrss / 1024
+
+
+class MuestreadorMemoria:
+    
+    def __init__(self, intervalo_ms: float = INTERVALO_MEMORIA_MS):
+        self.intervalo = intervalo_ms / 1000
+        self._ventanas = {}
+        self._siguiente = 0
+        self._candado = threading.Lock()
+        self._hilo = None
+    
+    def abrir(self) -> int:
+        rss = _rss_actual_mb()
+        with self._candado:
+            ventana = self._siguiente
+            self._siguiente += 1
+            self._ventanas[ventana] = rss
+            if self._hilo is None:
+                self._hilo = threading.Thread(target=self._muestrear, name="memoria", daemon=True)
+                self._hilo.start()
+        return ventana
+    
+    def cerrar(self, ventana: int) -> float:
+        rss = _rss_actual_mb()
+        with self._candado:
+            return max(self._ventanas.pop(ventana), rss)
+    
+    def _muestrear(self):
+        #-----  El hilo termina cuando no queda ninguna ventana abierta
+        while True:
+            time.sleep(self.intervalo)
+            rss = _rss_actual_mb()
+            with self._candado:
+                if not self._ventanas:
+                    self._hilo = None
+                    return
+                for ventana, pico in self._ventanas.items():
+                    if rss > pico:
+                        self._ventanas[ventana] = rss
+
+
+class PerfiladorMuestreo:
+    
+    def __init__(self, intervalo_ms: float = INTERVALO_MUESTREO_MS):
+        self.intervalo = intervalo_ms / 1000
+        self.muestras = Counter()
+        self._hilo_objetivo = threading.get_ident()
+        self._detener = threading.Event()
+        self._hilo = None
+    
+    def _muestrear(self):
+        while not self._detener.wait(self.intervalo):
+            frame = sys._current_frames().get(self._hilo_objetivo)
+            pila = []
+            while frame is not None:
+                codigo = frame.f_code
+                pila.append(f"{os.path.basename(codigo.co_filename)}:{codigo.co_name}")
+                frame = frame.f_back
+            if pila:
+                self.muestras[";".join(reversed(pila))] += 1
+    
+    def iniciar(self):
+        self._hilo = threading.Thread(target=self._muestrear, name="perfilador", daemon=True)
+        self._hilo.start()
+    
+    def detener(self):
+        self._detener.set()
+        if self._hilo is not None:
+            self._hilo.join()
+    
+    def guardar(self, ruta: str):
+        with open(ruta, "w", encoding="utf-8") as archivo:
+            for pila, cantidad in self.muestras.most_common():
+                archivo.write(f"{pila} {cantidad}\n")
+
+
+class Instrumentacion:
+    
+    def __init__(self, etapa: str, perfilar: bool = PERFILADOR_ACTIVO):
+        self.etapa = etapa
+        self.perfilar = perfilar
+        self.registros = []
+        self.perfilador = None
+        self.memoria = MuestreadorMemoria()
+        self.logger = logging.getLogger(__name__)
+    
+    def iniciar_perfil(self):
+        if self.perfilar and self.perfilador is None:
+            self.perfilador = PerfiladorMuestreo()
+            self.perfilador.iniciar()
+    
+    @contextmanager
+    def medir(self, paso: str, filas_entrada: Optional[int] = None):
+        registro = {"paso": paso, "filas_entrada": filas_entrada, "filas_salida": None}
+        ventana = self.memoria.abrir()
+        inicio, inicio_cpu = time.perf_counter(), time.process_time()
+        try:
+            yield registro
+        finally:
+            segundos = time.perf_counter() - inicio
+            if registro["filas_salida"] is None:
+                registro["filas_salida"] = registro["filas_entrada"]
+            #-----  Los pasos de lectura solo conocen las filas que producen
+            filas = registro["filas_entrada"] or registro["filas_salida"]
+            registro.update({
+                "segundos": round(segundos, 4),
+                "segundos_cpu": round(time.process_time() - inicio_cpu, 4),
+                "filas_por_segundo": round(filas / segundos, 1) if filas and segundos > 0 else None,
+                "rss_pico_mb": round(self.memoria.cerrar(ventana), 2),
+                "rss_pico_hijos_mb": round(_ru_maxrss_mb("RUSAGE_CHILDREN"), 2),
+                "pid": os.getpid(),
+            })
+            self.registros.append(registro)
+    
+    def extraer_registros(self) -> List[Dict[str, Any]]:
+        registros, self.registros = self.registros, []
+        return registros
+    
+    def incorporar(self, registros: List[Dict[str, Any]]) -> None:
+        #-----  Mediciones hechas en otro proceso (cada registro conserva su pid)
+        self.registros.extend(registros)
+    
+    def resumen(self) -> Dict[str, Dict[str, Any]]:
+        #-----  Un paso puede medirse varias veces (por ejemplo, una vez por bloque): se agregan
+        pasos = {}
+        for registro in self.registros:
+            paso = pasos.setdefault(registro["paso"], {
+                "llamadas": 0, "segundos": 0.0, "segundos_cpu": 0.0,
+                "filas_entrada": 0, "filas_salida": 0, "rss_pico_mb": 0.0, "rss_pico_hijos_mb": 0.0,
+                "procesos": set(),
+            })
+            paso["llamadas"] += 1
+            paso["segundos"] += registro["segundos"]
+            paso["segundos_cpu"] += registro["segundos_cpu"]
+            paso["filas_entrada"] += registro["filas_entrada"] or 0
+            paso["filas_salida"] += registro["filas_salida"] or 0
+            paso["rss_pico_mb"] = max(paso["rss_pico_mb"], registro["rss_pico_mb"])
+            paso["rss_pico_hijos_mb"] = max(paso["rss_pico_hijos_mb"], registro.get("rss_pico_hijos_mb", 0.0))
+            paso["procesos"].add(registro.get("pid"))
+        for paso in pasos.values():
+            paso["procesos"] = len(paso["procesos"])
+            paso["segundos"] = round(paso["segundos"], 4)
+            paso["segundos_cpu"] = round(paso["segundos_cpu"], 4)
+            filas = paso["filas_entrada"] or paso["filas_salida"]
+            paso["filas_por_segundo"] = (
+                round(filas / paso["segundos"], 1) if filas and paso["segundos"] > 0 else None
+            )
+        return pasos
+    
+    def guardar(self, path: str) -> str:
+        os.makedirs(path, exist_ok=True)
+        ruta = os.path.join(path, f"rendimiento_{self.etapa}.json")
+        contenido = {"etapa": self.etapa, "pasos": self.resumen(), "registros": self.registros}
+        
+        if self.perfilador is not None:
+            self.perfilador.detener()
+            ruta_perfil = os.path.join(path, f"perfil_{self.etapa}.txt")
+            self.perfilador.guardar(ruta_perfil)
+            contenido["perfil"] = ruta_perfil
+            self.perfilador = None
+        
+        with open(ruta, "w", encoding="utf-8") as archivo:
+            json.dump(contenido, archivo, indent=2)
+        self.logger.info(f"Rendimiento de la etapa '{self.etapa}': {contenido['pasos']}")
+        return ruta
+
+
+def registrar_en_mlflow(archivos: List[str], seguimiento: Optional[SeguimientoMlflow] = None) -> None:
+    seguimiento = seguimiento or seguimiento_sincrono()
+    for ruta in archivos:
+        if not os.path.exists(ruta):
+            continue
+        with open(ruta, "r", encoding="utf-8") as archivo:
+            contenido = json.load(archivo)
+        metricas = {}
+        for paso, medidas in contenido["pasos"].items():
+            for medida in ("segundos", "segundos_cpu", "filas_entrada", "filas_salida",
+                           "filas_por_segundo", "rss_pico_mb", "rss_pico_hijos_mb"):
+                if medidas.get(medida) is not None:
+                    metricas[f"perf_{contenido['etapa']}_{paso}_{medida}"] = medidas[medida]
+        seguimiento.log_metrics(metricas)
+        seguimiento.log_artifact(ruta, artifact_path="rendimiento")
+        if contenido.get("perfil") and os.path.exists(contenido["perfil"]):
+            seguimiento.log_artifact(contenido["perfil"], artifact_path="rendimiento")
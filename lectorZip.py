@@ -0,0 +1,300 @@
+"""
+    lectorZip.py
+    Descripción:
+        Lectura en streaming de un archivo ZIP dividido en partes (twcs.z01, twcs.z02, ..., twcs.zip) sin
+        extraerlo a disco. Las partes se concatenan de forma virtual en orden (.z01, .z02, ..., .zip), se
+        recorren los encabezados locales de cada miembro y el contenido se descomprime con zlib a medida
+        que se lee. El CRC-32 y el tamaño de cada miembro se validan al llegar a su final: si no coinciden
+        se lanza un error en lugar de entregar datos corruptos.
+
+        El flujo resultante es un archivo binario que pandas lee directamente (read_csv con chunksize),
+        así que el CSV nunca se materializa en disco.
+
+    Funciones:
+        partes_zip(ruta_zip):
+            Lista las partes del archivo en el orden en que se concatenan.
+        ruta_origen(ruta_csv):
+            El CSV si existe; si no, el .zip del mismo nombre (si existe). Se usa como huella de la entrada.
+        abrir_csv(ruta_csv):
+            Context manager que entrega la ruta del CSV o, si solo existe el ZIP, un flujo descomprimido.
+
+    Clases:
+        LectorZipDividido:
+            miembros():
+                Recorre los encabezados locales y retorna los nombres de los miembros.
+            abrir(nombre):
+                Retorna un flujo binario con el contenido descomprimido del miembro.
+    Autor: Ivan Camilo Rosales
+    Fecha: 2025-05-21
+"""
+
+from librerias import os, io, re, zlib, struct, logging, contextmanager, Dict, List, Any, Optional
+
+
+FIRMA_LOCAL = 0x04034B50
+FIRMA_DESCRIPTOR = 0x08074B50
+#-----  Firmas que indican que terminaron los miembros (directorio central y fin del directorio)
+FIRMAS_FIN = (0x02014B50, 0x06054B50, 0x06064B50)
+ENCABEZADO_LOCAL = struct.Struct("<IHHHHHIIIHH")
+METODO_ALMACENADO = 0
+METODO_DEFLATE = 8
+TAMANO_LECTURA = 1024 * 1024
+
+
+def partes_zip(ruta_zip: str) -> List[str]:
+    base = ruta_zip[:-len(".zip")]
+    partes = []
+    numero = 1
+    while os.path.exists(f"{base}.z{numero:02d}"):
+        partes.append(f"{base}.z{numero:02d}")
+        numero += 1
+    return partes + [ruta_zip]
+
+
+class _PartesConcatenadas(io.RawIOBase):
+    #-----  Archivo de solo lectura que recorre las partes en orden como si fueran un único archivo
+
+    def __init__(self, partes: List[str]):
+        self._partes = list(partes)
+        self._actual = None
+        self.posicion = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, destino) -> int:
+        while True:
+            if self._actual is None:
+                if not self._partes:
+                    return 0
+                self._actual = open(self._partes.pop(0), "rb")
+            leidos = self._actual.readinto(destino)
+            if leidos:
+                self.posicion += leidos
+                return leidos
+            self._actual.close()
+            self._actual = None
+
+    def close(self) -> None:
+        if self._actual is not None:
+            self._actual.close()
+            self._actual = None
+        super().close()
+
+
+class _FlujoMiembro(io.RawIOBase):
+    #-----  Contenido descomprimido de un miembro; al terminar valida el CRC-32 y el tamaño
+
+    def __init__(self, lector: "LectorZipDividido", entrada: Dict[str, Any]):
+        self._lector = lector
+        self._entrada = entrada
+        self._descompresor = zlib.decompressobj(-15) if entrada["metodo"] == METODO_DEFLATE else None
+        self._restante = entrada["tamano_comprimido"]
+        self._pendiente = b""
+        self._crc = 0
+        self._tamano = 0
+        self._terminado = False
+
+    def readable(self) -> bool:
+        return True
+
+    def _siguiente_bloque(self) -> bytes:
+        if self._descompresor is None:
+            datos = self._lector.leer(min(self._restante, TAMANO_LECTURA))
+            self._restante -= len(datos)
+            if not datos and self._restante:
+                raise ValueError(f"ZIP truncado en el miembro {self._entrada['nombre']}")
+            if not self._restante:
+                self._finalizar(b"")
+            return datos
+
+        while not self._descompresor.eof:
+            datos = self._lector.leer(TAMANO_LECTURA)
+            if not datos:
+                raise ValueError(f"ZIP truncado en el miembro {self._entrada['nombre']}")
+            salida = self._descompresor.decompress(datos)
+            if self._descompresor.eof:
+                #-----  Lo que sobra después del final del stream deflate pertenece al siguiente registro
+                self._finalizar(self._descompresor.unused_data)
+            if salida:
+                return salida
+        return b""
+
+    def _finalizar(self, sobrante: bytes) -> None:
+        self._lector.devolver(sobrante)
+        if self._entrada["con_descriptor"]:
+            self._lector.leer_descriptor(self._entrada)
+        self._terminado = True
+
+    def readinto(self, destino) -> int:
+        while not self._pendiente and not self._terminado:
+            datos = self._siguiente_bloque()
+            self._crc = zlib.crc32(datos, self._crc)
+            self._tamano += len(datos)
+            self._pendiente = datos
+            if self._terminado:
+                self._validar()
+        cantidad = min(len(destino), len(self._pendiente))
+        destino[:cantidad] = self._pendiente[:cantidad]
+        self._pendiente = self._pendiente[cantidad:]
+        return cantidad
+
+    def _validar(self) -> None:
+        entrada = self._entrada
+        if self._crc != entrada["crc"]:
+            raise ValueError(
+                f"CRC-32 inválido en {entrada['nombre']}: se esperaba {entrada['crc']:08x} y se obtuvo {self._crc:08x}"
+            )
+        if self._tamano != entrada["tamano"]:
+            raise ValueError(
+                f"Tamaño inválido en {entrada['nombre']}: se esperaban {entrada['tamano']} bytes y se obtuvieron {self._tamano}"
+            )
+
+    def descartar(self) -> None:
+        while self.readinto(bytearray(TAMANO_LECTURA)):
+            pass
+
+
+class LectorZipDividido:
+
+    def __init__(self, ruta_zip: str):
+        self.ruta_zip = ruta_zip
+        self.partes = partes_zip(ruta_zip)
+        self._archivo = None
+        self._devuelto = b""
+        self.logger = logging.getLogger(__name__)
+
+    def _abrir_partes(self) -> None:
+        if self._archivo is not None:
+            self._archivo.close()
+        self._archivo = _PartesConcatenadas(self.partes)
+        self._devuelto = b""
+        #-----  La primera parte de un archivo dividido empieza con la firma de spanning (igual a la del descriptor)
+        inicio = self.leer_exacto(4)
+        if struct.unpack("<I", inicio)[0] != FIRMA_DESCRIPTOR:
+            self.devolver(inicio)
+
+    def leer(self, cantidad: int) -> bytes:
+        if self._devuelto:
+            datos, self._devuelto = self._devuelto[:cantidad], self._devuelto[cantidad:]
+            return datos
+        return self._archivo.read(cantidad) or b""
+
+    def leer_exacto(self, cantidad: int) -> bytes:
+        datos = b""
+        while len(datos) < cantidad:
+            bloque = self.leer(cantidad - len(datos))
+            if not bloque:
+                raise ValueError(f"ZIP truncado: se esperaban {cantidad} bytes en {self.ruta_zip}")
+            datos += bloque
+        return datos
+
+    def devolver(self, datos: bytes) -> None:
+        self._devuelto = datos + self._devuelto
+
+    def leer_descriptor(self, entrada: Dict[str, Any]) -> None:
+        #-----  El descriptor puede tener firma o no, y usa tamaños de 8 bytes en ZIP64
+        firma = struct.unpack("<I", self.leer_exacto(4))[0]
+        if firma != FIRMA_DESCRIPTOR:
+            self.devolver(struct.pack("<I", firma))
+        ancho = 8 if entrada["zip64"] else 4
+        crc = struct.unpack("<I", self.leer_exacto(4))[0]
+        formato = "<QQ" if ancho == 8 else "<II"
+        tamano_comprimido, tamano = struct.unpack(formato, self.leer_exacto(2 * ancho))
+        entrada.update(crc=crc, tamano_comprimido=tamano_comprimido, tamano=tamano)
+
+    def _leer_encabezado(self) -> Optional[Dict[str, Any]]:
+        datos = self.leer(4)
+        if len(datos) < 4:
+            return None
+        firma = struct.unpack("<I", datos)[0]
+        if firma in FIRMAS_FIN:
+            return None
+        if firma != FIRMA_LOCAL:
+            raise ValueError(f"Firma inesperada {firma:08x} en {self.ruta_zip}: no es un ZIP válido")
+
+        (_, _, banderas, metodo, _, _, crc, tamano_comprimido, tamano,
+         largo_nombre, largo_extra) = ENCABEZADO_LOCAL.unpack(datos + self.leer_exacto(ENCABEZADO_LOCAL.size - 4))
+        nombre = self.leer_exacto(largo_nombre).decode("utf-8" if banderas & 0x800 else "cp437")
+        extra = self.leer_exacto(largo_extra)
+
+        if banderas & 0x1:
+            raise ValueError(f"El miembro {nombre} está cifrado: no se puede leer en streaming")
+        if metodo not in (METODO_ALMACENADO, METODO_DEFLATE):
+            raise ValueError(f"Método de compresión {metodo} no soportado en {nombre} (solo almacenado o deflate)")
+
+        #-----  ZIP64: los tamaños reales están en el campo extra 0x0001
+        zip64 = False
+        posicion = 0
+        while posicion + 4 <= len(extra):
+            identificador, largo = struct.unpack_from("<HH", extra, posicion)
+            if identificador == 0x0001:
+                zip64 = True
+                valores = list(struct.unpack_from(f"<{largo // 8}Q", extra, posicion + 4))
+                if tamano == 0xFFFFFFFF and valores:
+                    tamano = valores.pop(0)
+                if tamano_comprimido == 0xFFFFFFFF and valores:
+                    tamano_comprimido = valores.pop(0)
+            posicion += 4 + largo
+
+        con_descriptor = bool(banderas & 0x8)
+        if con_descriptor and metodo == METODO_ALMACENADO:
+            raise ValueError(f"El miembro {nombre} está almacenado sin tamaño conocido: no se puede leer en streaming")
+        return {
+            "nombre": nombre, "metodo": metodo, "crc": crc, "tamano": tamano,
+            "tamano_comprimido": tamano_comprimido, "con_descriptor": con_descriptor, "zip64": zip64,
+        }
+
+    def miembros(self) -> List[str]:
+        self._abrir_partes()
+        nombres = []
+        try:
+            while (entrada := self._leer_encabezado()) is not None:
+                nombres.append(entrada["nombre"])
+                _FlujoMiembro(self, entrada).descartar()
+        finally:
+            self.cerrar()
+        return nombres
+
+    def abrir(self, nombre: Optional[str] = None) -> io.BufferedReader:
+        #-----  nombre se compara con el nombre completo o con el nombre base del miembro; None toma el primer CSV
+        self._abrir_partes()
+        while (entrada := self._leer_encabezado()) is not None:
+            coincide = (
+                entrada["nombre"].lower().endswith(".csv") if nombre is None
+                else nombre in (entrada["nombre"], os.path.basename(entrada["nombre"]))
+            )
+            flujo = _FlujoMiembro(self, entrada)
+            if coincide:
+                self.logger.info(f"Lectura en streaming de {entrada['nombre']} desde {len(self.partes)} partes de {self.ruta_zip}")
+                return io.BufferedReader(flujo, buffer_size=TAMANO_LECTURA)
+            flujo.descartar()
+        self.cerrar()
+        raise FileNotFoundError(f"No se encontró {nombre or 'un archivo CSV'} dentro de {self.ruta_zip}")
+
+    def cerrar(self) -> None:
+        if self._archivo is not None:
+            self._archivo.close()
+            self._archivo = None
+
+
+def ruta_origen(ruta_csv: str) -> str:
+    ruta_zip = f"{os.path.splitext(ruta_csv)[0]}.zip"
+    if not os.path.exists(ruta_csv) and os.path.exists(ruta_zip):
+        return ruta_zip
+    return ruta_csv
+
+
+@contextmanager
+def abrir_csv(ruta_csv: str):
+    origen = ruta_origen(ruta_csv)
+    if origen == ruta_csv:
+        yield ruta_csv
+        return
+    lector = LectorZipDividido(origen)
+    flujo = lector.abrir(os.path.basename(ruta_csv))
+    try:
+        yield flujo
+    finally:
+        flujo.close()
+        lector.cerrar()
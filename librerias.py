@@ -7,76 +7,162 @@
 """
 
 #-----  Librerías básicas de Python
+import io
 import os
 import re
+import sys
+import glob
 import json
+import queue
+import shutil
+import random
+import argparse
+import tempfile
+import tracemalloc
+import time
+import asyncio
+import hashlib
+import importlib
+import sqlite3
+import zlib
+import struct
 import string
 import pickle
 import logging
+import threading
 import warnings
 import datetime
-from typing import Dict, Tuple, Optional, Any, List, Union
+from functools import lru_cache
+from itertools import product
+from contextlib import contextmanager, ExitStack
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Dict, Tuple, Optional, Any, List, Union, Callable, Iterator, Iterable, Sequence
+from collections import OrderedDict, Counter, deque
 from string import punctuation
 
 
-#-----  Librerías para el procesamiento de los datos
-import numpy as np
-import pandas as pd
-import joblib
-
-
-#-----  Librerías para la generación de graficas
-import matplotlib.pyplot as plt
-from wordcloud import WordCloud, STOPWORDS, ImageColorGenerator
-
-
-#----   Librerías de NLP
-import nltk
-from nltk.tokenize import word_tokenize
-from nltk.corpus import stopwords
-from nltk.stem import SnowballStemmer, WordNetLemmatizer
-from nltk.sentiment import SentimentIntensityAnalyzer
-import emoji
-
-
-#-----  Librerías de SCIKIT-LEARN
-from sklearn.feature_extraction.text import CountVectorizer, TfidfVectorizer, TfidfTransformer
-from sklearn.model_selection import train_test_split
-from sklearn.linear_model import LogisticRegression
-from sklearn.metrics import (
-    accuracy_score,
-    classification_report,
-    confusion_matrix,
-    ConfusionMatrixDisplay,
-    precision_recall_fscore_support,
-    roc_auc_score,
-)
-
-
-#-----  Librerías de MLFlow
-import mlflow
-from mlflow.models.signature import infer_signature
-
-
-#-----  Librerías de Perfect
-from prefect import flow, task
+#-----  Librerías de terceros: se importan de forma perezosa (PEP 562) la primera vez que un
+#-----  módulo las pide, así cada etapa solo paga la importación de lo que realmente usa.
+#-----  nombre exportado -> (módulo, atributo); atributo None exporta el módulo completo
+_IMPORTACIONES_PEREZOSAS = {
+    #-----  Librerías para el procesamiento de los datos
+    "np": ("numpy", None),
+    "pd": ("pandas", None),
+    "joblib": ("joblib", None),
+    "csr_matrix": ("scipy.sparse", "csr_matrix"),
+    "pa": ("pyarrow", None),
+    "pq": ("pyarrow.parquet", None),
+    "pc": ("pyarrow.compute", None),
+    
+    #-----  Librerías para la generación de graficas
+    "plt": ("matplotlib.pyplot", None),
+    "WordCloud": ("wordcloud", "WordCloud"),
+    "STOPWORDS": ("wordcloud", "STOPWORDS"),
+    "ImageColorGenerator": ("wordcloud", "ImageColorGenerator"),
+    
+    #----   Librerías de NLP
+    "nltk": ("nltk", None),
+    "word_tokenize": ("nltk.tokenize", "word_tokenize"),
+    "NLTKWordTokenizer": ("nltk.tokenize", "NLTKWordTokenizer"),
+    "stopwords": ("nltk.corpus", "stopwords"),
+    "wordnet": ("nltk.corpus", "wordnet"),
+    "SnowballStemmer": ("nltk.stem", "SnowballStemmer"),
+    "WordNetLemmatizer": ("nltk.stem", "WordNetLemmatizer"),
+    "SentimentIntensityAnalyzer": ("nltk.sentiment", "SentimentIntensityAnalyzer"),
+    "emoji": ("emoji", None),
+    
+    #-----  Librerías de SCIKIT-LEARN
+    "CountVectorizer": ("sklearn.feature_extraction.text", "CountVectorizer"),
+    "TfidfVectorizer": ("sklearn.feature_extraction.text", "TfidfVectorizer"),
+    "TfidfTransformer": ("sklearn.feature_extraction.text", "TfidfTransformer"),
+    "HashingVectorizer": ("sklearn.feature_extraction.text", "HashingVectorizer"),
+    "train_test_split": ("sklearn.model_selection", "train_test_split"),
+    "LogisticRegression": ("sklearn.linear_model", "LogisticRegression"),
+    "SGDClassifier": ("sklearn.linear_model", "SGDClassifier"),
+    "LinearSVC": ("sklearn.svm", "LinearSVC"),
+    "CalibratedClassifierCV": ("sklearn.calibration", "CalibratedClassifierCV"),
+    "MultinomialNB": ("sklearn.naive_bayes", "MultinomialNB"),
+    "ComplementNB": ("sklearn.naive_bayes", "ComplementNB"),
+    "accuracy_score": ("sklearn.metrics", "accuracy_score"),
+    "classification_report": ("sklearn.metrics", "classification_report"),
+    "confusion_matrix": ("sklearn.metrics", "confusion_matrix"),
+    "ConfusionMatrixDisplay": ("sklearn.metrics", "ConfusionMatrixDisplay"),
+    "precision_recall_fscore_support": ("sklearn.metrics", "precision_recall_fscore_support"),
+    "roc_auc_score": ("sklearn.metrics", "roc_auc_score"),
+    
+    #-----  Librerías de MLFlow
+    "mlflow": ("mlflow", None),
+    "infer_signature": ("mlflow.models.signature", "infer_signature"),
+    "MlflowClient": ("mlflow.tracking", "MlflowClient"),
+    "Metric": ("mlflow.entities", "Metric"),
+    "Param": ("mlflow.entities", "Param"),
+    "RunTag": ("mlflow.entities", "RunTag"),
+    
+    #-----  Librerías de Perfect
+    "flow": ("prefect", "flow"),
+    "task": ("prefect", "task"),
+    "unmapped": ("prefect", "unmapped"),
+    "ThreadPoolTaskRunner": ("prefect.task_runners", "ThreadPoolTaskRunner"),
+    "ProcessPoolTaskRunner": ("prefect.task_runners", "ProcessPoolTaskRunner"),
+}
+
+
+def __getattr__(nombre: str):
+    if nombre not in _IMPORTACIONES_PEREZOSAS:
+        raise AttributeError(f"module {__name__!r} has no attribute {nombre!r}")
+    modulo, atributo = _IMPORTACIONES_PEREZOSAS[nombre]
+    valor = importlib.import_module(modulo)
+    if atributo is not None:
+        valor = getattr(valor, atributo)
+    #-----  Se guarda en el módulo para que las siguientes búsquedas no pasen por __getattr__
+    globals()[nombre] = valor
+    return valor
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_IMPORTACIONES_PEREZOSAS))
 
 
 #-----  Funciones de configuración inicial
-def setup_nltk():
-    nltk_packages = [
-        'stopwords',
-        'punkt',
-        'punkt_tab',
-        'wordnet',
-        'omw-1.4',
-        'vader_lexicon'
-    ]
-    for package in nltk_packages:
+#-----  paquete de NLTK -> recurso que se busca en el directorio de datos
+RECURSOS_NLTK = {
+    "stopwords": "corpora/stopwords",
+    "punkt": "tokenizers/punkt",
+    "punkt_tab": "tokenizers/punkt_tab",
+    "wordnet": "corpora/wordnet",
+    "omw-1.4": "corpora/omw-1.4",
+    "vader_lexicon": "sentiment/vader_lexicon.zip",
+}
+
+
+@lru_cache(maxsize=None)
+def setup_nltk(ruta_datos: Optional[str] = None, permitir_descarga: bool = False) -> None:
+    #-----  Se ejecuta una sola vez por proceso: las siguientes llamadas salen de la caché
+    import nltk
+    if ruta_datos:
+        ruta_datos = os.path.abspath(ruta_datos)
+        if ruta_datos not in nltk.data.path:
+            nltk.data.path.insert(0, ruta_datos)
+    
+    faltantes = []
+    for paquete, recurso in RECURSOS_NLTK.items():
         try:
-            nltk.download(package, quiet=True)
-        except Exception as e:
-            logging.warning(f"Error al descargar {package}: {e}")
+            nltk.data.find(recurso)
+        except LookupError:
+            faltantes.append(paquete)
+    if not faltantes:
+        return
+    
+    if not permitir_descarga:
+        raise LookupError(
+            f"Faltan recursos de NLTK: {faltantes}. Descárguelos con "
+            f"'python -m nltk.downloader -d {ruta_datos or '<directorio>'} {' '.join(faltantes)}' "
+            f"o habilite NLTK_PERMITIR_DESCARGA en config.py"
+        )
+    for paquete in faltantes:
+        logging.info(f"Descargando recurso de NLTK: {paquete}")
+        if not nltk.download(paquete, download_dir=ruta_datos, quiet=True):
+            raise LookupError(f"No fue posible descargar el recurso de NLTK: {paquete}")
 
 
 def setup_logging(level=logging.INFO):
@@ -0,0 +1,65 @@
+"""
+    limpiezaTexto.py
+    Descripción:
+        Limpieza en una sola pasada y tokenizador regex del texto, sin dependencias de terceros (solo re).
+        Los usan TextProcessing y el paquete de inferencia: así el servicio preprocesa los tuits con el
+        paquete sin importar NLTK, pandas ni scikit-learn.
+
+    Funciones:
+        limpiar_texto(texto):
+            Elimina URLs y todo carácter fuera de la lista permitida (letras, tildes, ñ y espacios).
+        contracciones_nltk():
+            Patrones de contracciones de NLTKWordTokenizer (CONTRACTIONS2 y CONTRACTIONS3) de la
+            versión instalada de NLTK; es lo único de NLTK que necesita tokenizar_regex.
+        tokenizar_regex(texto, contracciones):
+            Tokens de word_tokenize sobre el texto limpio: minúsculas, separación por espacios y
+            contracciones partidas. Sin contracciones se usan las de contracciones_nltk().
+    Autor: Ivan Camilo Rosales
+    Fecha: 2025-05-21
+"""
+
+from librerias import re, lru_cache, Optional, Sequence, Tuple, List
+
+
+#-----  Patrones de limpieza precompilados
+PATRON_URL = re.compile(r'https?://\S+|www\.\S+')
+PATRON_CARACTER_ESPECIAL = re.compile(r'[^A-Za-záéíóúÁÉÍÓÚñÑ ]+')
+#-----  Tras la lista blanca de caracteres ya no quedan saltos de línea, emojis, dígitos ni
+#-----  puntuación, por lo que toda la cadena de limpieza equivale a eliminar URLs y luego
+#-----  los caracteres no permitidos. Las URLs empiezan por 'h' o 'w' (caracteres permitidos),
+#-----  así que ambas alternativas se pueden evaluar en un único recorrido del texto.
+PATRON_LIMPIEZA = re.compile(f"{PATRON_URL.pattern}|{PATRON_CARACTER_ESPECIAL.pattern}")
+
+
+def limpiar_texto(texto: str) -> str:
+    return PATRON_LIMPIEZA.sub('', texto)
+
+
+@lru_cache(maxsize=None)
+def contracciones_nltk() -> Tuple[str, ...]:
+    #-----  Las mismas reglas de NLTKWordTokenizer, tomadas de la versión instalada de NLTK
+    from librerias import NLTKWordTokenizer
+    return tuple(
+        patron.pattern for patron in NLTKWordTokenizer.CONTRACTIONS2 + NLTKWordTokenizer.CONTRACTIONS3
+    )
+
+
+@lru_cache(maxsize=None)
+def _patrones_contracciones(contracciones: Tuple[str, ...]):
+    #-----  El filtro une todas las alternativas para saber en un solo recorrido si hace falta aplicarlas
+    patrones = tuple(re.compile(patron) for patron in contracciones)
+    filtro = re.compile("|".join(patron.replace("(?i)", "", 1) for patron in contracciones), re.IGNORECASE)
+    return filtro, patrones
+
+
+def tokenizar_regex(texto: str, contracciones: Optional[Sequence[str]] = None) -> List[str]:
+    #-----  Sobre el texto limpio (solo letras y espacios) word_tokenize no encuentra fin de oración ni
+    #-----  puntuación: lo único que hace, además de separar por espacios, es partir las contracciones
+    #-----  ("cannot" -> "can not", "gonna" -> "gon na", ...). Igual que Treebank, el texto se rodea de espacios
+    texto = f" {texto.lower()} "
+    contracciones = contracciones_nltk() if contracciones is None else tuple(contracciones)
+    filtro, patrones = _patrones_contracciones(contracciones)
+    if filtro.search(texto) is not None:
+        for patron in patrones:
+            texto = patron.sub(r" \1 \2 ", texto)
+    return texto.split()
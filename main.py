@@ -4,6 +4,11 @@
         desde la ingesta, limpieza y transformación de los datos, hasta 
         el entrenamiento del modelo encargado de clasificar los tuits. Todo 
         este proceso se realiza mediante tareas (tasks).
+        Con NUM_SHARDS > 1 la entrada se divide en particiones; las tareas de texto y de features
+        se mapean sobre ellas con el task runner configurado y una tarea de unión (reduce) genera
+        el archivo que consume el entrenamiento. Cada partición se reintenta y se cachea por separado.
+        Cada tarea de texto recibe en n_workers su parte del presupuesto de procesos (PRESUPUESTO_WORKERS
+        repartido entre las CONCURRENCIA_SHARDS tareas que el task runner ejecuta a la vez).
         
     Autor: Ivan Camilo Rosales
     Fecha: 2025-05-21
@@ -12,14 +17,25 @@
 
 # Importar las dependencias centralizadas
 from librerias import (
-    os, np, pd, mlflow, flow, task, logging, warnings,
+    os, np, pd, joblib, mlflow, flow, task, unmapped, logging, warnings,
+    List, Optional, ThreadPoolTaskRunner, ProcessPoolTaskRunner,
     setup_logging, setup_warnings
 )
 
 from config import *
 from featureExtraction import FeatureExtraction
-from textProcessing import TextProcessing
+from textProcessing import TextProcessing, PATRON_LIMPIEZA
 from modelo import ModelTrain
+from busquedaHiperparametros import BusquedaHiperparametros
+from almacenamiento import nombre_archivo, leer_datos
+from cacheEtapas import CacheEtapas
+from deduplicacion import colapsar_duplicados
+from particionado import (
+    nombre_particion, ruta_particion, particionar_archivo, unir_particiones, workers_por_particion
+)
+from instrumentacion import registrar_en_mlflow
+from lectorZip import ruta_origen
+from seguimientoMlflow import SeguimientoMlflow
 from config import MLFLOW_TRACKING_URI, MLFLOW_EXPERIMENT_NAME
 
 
@@ -62,12 +78,40 @@ mlflow.set_experiment(MLFLOW_EXPERIMENT_NAME)
 @task(retries=2, retry_delay_seconds=2,
       name="Task preprocesamiento de texto", 
       tags=["limpieza_texto"])
-def text_processing_task(idioma: str, file_name: str, version: int):
+def text_processing_task(
+    idioma: str, file_name: str, version: int,
+    ruta_entrada: Optional[str] = None, n_workers: Optional[int] = NUM_WORKERS
+) -> bool:
+    
+    logger.info(
+        f"Iniciamos la tarea de preprocesamiento de texto - file_name={file_name}, version={version}, "
+        f"n_workers={n_workers}"
+    )
+    cache = CacheEtapas("text_processing_task")
+    #-----  Si la entrada es el ZIP dividido, la huella se toma de la última parte (.zip), que contiene
+    #-----  el directorio central con el CRC-32 de cada miembro
+    entrada = ruta_entrada or ruta_origen(os.path.join(DATA_PATH_INPUT, f"{file_name}.csv"))
+    salida = os.path.join(DATA_PATH_PROCESSED, nombre_archivo(f"processing_{file_name}_{version}"))
+    huella = cache.huella(
+        entrada,
+        configuracion={
+            "idioma": idioma, "columnas": COLUMNAS_ENTRADA, "formato": FORMATO_INTERMEDIO, "tokenizador": TOKENIZADOR,
+            "deduplicacion": [
+                DEDUPLICACION_ACTIVA, DEDUP_CERCANOS, UMBRAL_SIMILITUD,
+                NUM_PERMUTACIONES_MINHASH, BANDAS_LSH, TAMANO_SHINGLE,
+            ],
+        },
+        modulos=["textProcessing", "cacheTokens", "almacenamiento", "deduplicacion", "lectorZip"],
+        archivo_salida=salida,
+    )
+    if CACHE_ETAPAS_ACTIVO and cache.es_valida(salida, huella):
+        return True
     
-    logger.info(f"Iniciamos la tarea de preprocesamiento de texto - file_name={file_name}, version={version}")
-    text_processing = TextProcessing(idioma=idioma)
-    text_processing.run(file_name=file_name, version=version)
+    text_processing = TextProcessing(idioma=idioma, n_workers=n_workers)
+    text_processing.run(file_name=file_name, version=version, ruta_entrada=ruta_entrada)
+    cache.registrar(salida, huella)
     logger.info("Tarea de procesamiento de texto completada")
+    return False
 
 
 #-------------------------------------------------------------------------------
@@ -76,11 +120,113 @@ def text_processing_task(idioma: str, file_name: str, version: int):
 @task(retries=2, retry_delay_seconds=2,
       name="Tarea de extracción de Features", 
       tags=["extraccion_feature", "categorizacion_texto"])
-def feature_extraccion(file_name: str, version: int):
+def feature_extraccion(file_name: str, version: int, texto_en_cache: bool = False) -> bool:
+    #-----  texto_en_cache recibe el resultado de la tarea de texto de la misma partición: así la
+    #-----  extracción de cada partición solo espera a su propio preprocesamiento
     logger.info(f"Iniciamos la tarea de extracción de features - file_name={file_name}, version={version}")
+    cache = CacheEtapas("feature_extraccion")
+    entrada = os.path.join(DATA_PATH_PROCESSED, nombre_archivo(f"processing_{file_name}_{version}"))
+    salida = os.path.join(DATA_PATH_PROCESSED, nombre_archivo(f"feature_{file_name}_{version}"))
+    huella = cache.huella(
+        entrada,
+        configuracion={
+            "umbrales": [UMBRAL_POSITIVO, UMBRAL_NEGATIVO], "formato": FORMATO_INTERMEDIO,
+            "deduplicacion": DEDUPLICACION_ACTIVA,
+        },
+        modulos=["featureExtraction", "almacenamiento"],
+        archivo_salida=salida,
+    )
+    if CACHE_ETAPAS_ACTIVO and cache.es_valida(salida, huella):
+        return True
+    
     feature_extraction = FeatureExtraction()
     feature_extraction.run(file_name=file_name, version=version)
+    #-----  El hash de la salida queda en el manifiesto: la unión de particiones y el entrenamiento lo reutilizan
+    cache.registrar(salida, huella, hash_salida=True)
     logger.info("Tarea de extracción de Features completada")
+    return False
+
+
+#-------------------------------------------------------------------------------
+#-------------------------------------------------------------------------------
+#-----  Tareas del flujo particionado: división de la entrada (map) y unión de las features (reduce)
+@task(retries=1, name="Partición de la entrada", tags=["particionado"])
+def particionar_entrada(file_name: str, num_shards: int) -> List[str]:
+    logger.info(f"Iniciamos la partición de la entrada - file_name={file_name}, particiones={num_shards}")
+    cache = CacheEtapas("particionar_entrada")
+    entrada = os.path.join(DATA_PATH_INPUT, f"{file_name}.csv")
+    nombres = [nombre_particion(file_name, i, num_shards) for i in range(num_shards)]
+    rutas = [ruta_particion(nombre) for nombre in nombres]
+    #-----  El manifiesto se guarda junto a la última partición
+    huella = cache.huella(
+        ruta_origen(entrada),
+        configuracion={
+            "particiones": num_shards, "columnas": COLUMNAS_ENTRADA,
+            "formato": FORMATO_INTERMEDIO, "clave": PATRON_LIMPIEZA.pattern,
+        },
+        modulos=["particionado", "almacenamiento", "deduplicacion", "lectorZip"],
+        archivo_salida=rutas[-1],
+    )
+    if CACHE_ETAPAS_ACTIVO and all(os.path.exists(ruta) for ruta in rutas) and cache.es_valida(rutas[-1], huella):
+        return nombres
+    
+    particionar_archivo(entrada, rutas)
+    cache.registrar(rutas[-1], huella)
+    return nombres
+
+
+@task(retries=1, name="Unión de las particiones", tags=["particionado"])
+def unir_features(nombres: List[str], file_name: str, version: int) -> bool:
+    logger.info(f"Iniciamos la unión de {len(nombres)} particiones - file_name={file_name}, version={version}")
+    cache = CacheEtapas("unir_features")
+    rutas = [os.path.join(DATA_PATH_PROCESSED, nombre_archivo(f"feature_{nombre}_{version}")) for nombre in nombres]
+    salida = os.path.join(DATA_PATH_PROCESSED, nombre_archivo(f"feature_{file_name}_{version}"))
+    #-----  hash_archivo toma el hash de cada partición del manifiesto de su extracción de features, sin releerla
+    huella = cache.huella(
+        rutas[0],
+        configuracion={"particiones": [cache.hash_archivo(ruta) for ruta in rutas[1:]]},
+        modulos=["particionado", "almacenamiento"],
+        archivo_salida=salida,
+    )
+    if CACHE_ETAPAS_ACTIVO and cache.es_valida(salida, huella):
+        return True
+    
+    unir_particiones(rutas, salida)
+    cache.registrar(salida, huella)
+    return False
+
+
+def archivos_rendimiento(file_name: str = FILE_NAME_DATA_INPUT, num_shards: int = NUM_SHARDS) -> List[str]:
+    #-----  Solo los reportes de las particiones de esta ejecución: en DATA_PATH_PROCESSED pueden quedar
+    #-----  los de ejecuciones anteriores con otro número de particiones (otros nombres)
+    nombres = [file_name] if num_shards <= 1 else [nombre_particion(file_name, i, num_shards) for i in range(num_shards)]
+    return [
+        os.path.join(DATA_PATH_PROCESSED, f"rendimiento_{etapa}_{nombre}.json")
+        for nombre in nombres for etapa in ("text_processing", "feature_extraction")
+    ] + [os.path.join(MODELOS_PATH, "rendimiento_model_train.json")]
+
+
+def crear_task_runner():
+    if TASK_RUNNER_SHARDS == "procesos":
+        return ProcessPoolTaskRunner(max_workers=CONCURRENCIA_SHARDS)
+    if TASK_RUNNER_SHARDS == "hilos":
+        return ThreadPoolTaskRunner(max_workers=CONCURRENCIA_SHARDS)
+    raise ValueError(f"TASK_RUNNER_SHARDS debe ser 'hilos' o 'procesos', no '{TASK_RUNNER_SHARDS}'")
+
+
+def cargar_datos_entrenamiento(data_path: str) -> pd.DataFrame:
+    logger.info(f"Loading data from {data_path}")
+    #-----  El entrenamiento solo usa el texto limpio y la etiqueta (y el grupo de duplicados, si existe):
+    #-----  queda una fila por grupo para que los textos repetidos no inflen el conjunto de entrenamiento y
+    #-----  el peso de cada fila es el tamaño de su grupo en todo el archivo
+    columnas = ["textCls", "sentimiento"]
+    if DEDUPLICACION_ACTIVA:
+        columnas += ["id_grupo"]
+    #-----  Los tokens se leen como listas de Arrow para construir la matriz de conteos sin re-tokenizar
+    tokens = MATRIZ_DESDE_TOKENS and data_path.endswith(".parquet")
+    if tokens:
+        columnas += ["TextPreproc"]
+    return colapsar_duplicados(leer_datos(data_path, columnas=columnas, listas_arrow=tokens))
 
 
 #-------------------------------------------------------------------------------    
@@ -93,48 +239,175 @@ def feature_extraccion(file_name: str, version: int):
 )
 def training_model(file_name: str = FILE_NAME_DATA_FEATURE, version: int = VERSION):
     logger.info(f"Iniciamos la tarea de entrenamiento del modelo - file_name={file_name}, version={version}")
-    name_model = "logistic_regression"
+    name_model = MODEL_TYPE
     developer = DEVELOPER_NAME
     
-    with mlflow.start_run(run_name=name_model) as run:
+    #-----  El modelo solo se vuelve a entrenar si cambian los datos, los parámetros o el código
+    cache = CacheEtapas("training_model")
+    data_path = f"{DATA_PATH_PROCESSED}/{nombre_archivo(f'{file_name}_{version}')}"
+    salida = os.path.join(MODELOS_PATH, "modelo.pkl")
+    huella = cache.huella(
+        data_path,
+        configuracion={
+            "modelo": name_model,
+            "parametros": PARAMETERS_MODEL if name_model == "logistic_regression" else PARAMETERS_SGD,
+            "familias": [FAMILIAS_MODELOS, PARAMETROS_FAMILIAS, PESO_LATENCIA],
+            "out_of_core": [CHUNK_SIZE_ENTRENAMIENTO, N_FEATURES_HASHING, EPOCAS_OUT_OF_CORE],
+            "incremental": EPOCAS_INCREMENTAL,
+            "matriz_desde_tokens": MATRIZ_DESDE_TOKENS,
+            "deduplicacion": [DEDUPLICACION_ACTIVA, USAR_PESOS_DUPLICADOS],
+            "busqueda": [
+                MODO_BUSQUEDA, GRILLA_BUSQUEDA, MAX_CANDIDATOS_BUSQUEDA, FACTOR_DESCARTE,
+                ITERACIONES_MINIMAS, ITERACIONES_MAXIMAS, FRACCION_VALIDACION,
+            ],
+        },
+        modulos=[
+            "modelo", "almacenamiento", "busquedaHiperparametros", "vocabularioIncremental",
+            "deduplicacion", "corpusTokens",
+        ],
+        archivo_salida=salida,
+    )
+    if CACHE_ETAPAS_ACTIVO and cache.es_valida(salida, huella):
+        #-----  Se registra la reutilización en MLflow, con el run que entrenó el modelo reutilizado
+        run_origen = ((cache.manifiesto(salida) or {}).get("datos") or {}).get("run_id")
+        with mlflow.start_run(run_name=f"{name_model}_reutilizado") as run:
+            mlflow.set_tags({"cache_hit": "true", "huella": huella, "run_origen": run_origen or "desconocido"})
+            mlflow.log_params({"model": name_model, "developer": developer, "file_name": file_name, "version": version})
+            logger.info(f"Modelo reutilizado del run {run_origen}; reutilización registrada en el run {run.info.run_id}")
+        return joblib.load(salida)
+    
+    #-----  Parámetros, métricas y artefactos se registran en segundo plano y en lotes; al salir del bloque
+    #-----  se espera a que la cola se vacíe antes de cerrar la ejecución de MLflow
+    with mlflow.start_run(run_name=name_model) as run, SeguimientoMlflow(run.info.run_id) as seguimiento:
         run_id = run.info.run_id
         logger.info(f"Se inicio la ejecución de MLFLOW con ID: {run_id}")
         
         #-----  Parámetros básicos del registro
-        mlflow.log_param("model", name_model)
-        mlflow.log_param("developer", developer)
-        mlflow.log_param("file_name", file_name)
-        mlflow.log_param("version", version)
-        
-        #-----  Cargamos los datos
-        data_path = f"{DATA_PATH_PROCESSED}/{file_name}_{version}.csv"
-        logger.info(f"Loading data from {data_path}")
-        datos = pd.read_csv(data_path)
+        seguimiento.log_params({
+            "model": name_model,
+            "developer": developer,
+            "file_name": file_name,
+            "version": version,
+        })
         
-        #-----  Entrenamos el modelo
         model_trainer = ModelTrain()
-        model = model_trainer.run(
-            df=datos,
-            model_type="logistic_regression",
-            developer=developer,
-            C=PARAMETERS_MODEL.get("C", 1.0),
-            max_iter=PARAMETERS_MODEL.get("max_iter", 1000),
-            random_state=PARAMETERS_MODEL.get("random_state", 40),
-            solver=PARAMETERS_MODEL.get("solver", "liblinear")
-        )
+        model_trainer.seguimiento = seguimiento
+        if name_model == "sgd_hashing":
+            #-----  Entrenamiento por bloques: el archivo de features nunca se carga completo
+            model = model_trainer.run_out_of_core(
+                file_path=data_path,
+                developer=developer,
+                chunksize=CHUNK_SIZE_ENTRENAMIENTO,
+                n_features=N_FEATURES_HASHING,
+                epochs=EPOCAS_OUT_OF_CORE,
+                **PARAMETERS_SGD
+            )
+        elif name_model == "sgd_incremental":
+            #-----  El archivo de features se incorpora como un lote nuevo: solo se tokeniza este archivo
+            datos = cargar_datos_entrenamiento(data_path)
+            model = model_trainer.run_incremental(
+                df=datos,
+                huella_lote=cache.hash_archivo(data_path),
+                developer=developer,
+                epochs=EPOCAS_INCREMENTAL,
+                **PARAMETERS_SGD
+            )
+        elif name_model == "comparar":
+            #-----  Varias familias entrenadas en paralelo sobre las mismas features
+            datos = cargar_datos_entrenamiento(data_path)
+            model = model_trainer.run_comparacion(
+                df=datos,
+                familias=FAMILIAS_MODELOS,
+                parametros={
+                    **PARAMETROS_FAMILIAS,
+                    "logistic_regression": {
+                        "C": PARAMETERS_MODEL.get("C", 1.0),
+                        "max_iter": PARAMETERS_MODEL.get("max_iter", 1000),
+                        "random_state": PARAMETERS_MODEL.get("random_state", 40),
+                        "solver": PARAMETERS_MODEL.get("solver", "liblinear"),
+                    },
+                },
+                developer=developer,
+                n_workers=NUM_WORKERS_FAMILIAS,
+                peso_latencia=PESO_LATENCIA,
+                fraccion_validacion=FRACCION_VALIDACION,
+            )
+        elif name_model != "logistic_regression":
+            datos = cargar_datos_entrenamiento(data_path)
+            model = model_trainer.run(
+                df=datos,
+                model_type=name_model,
+                developer=developer,
+                columna_peso="peso" if USAR_PESOS_DUPLICADOS else None,
+                **PARAMETROS_FAMILIAS.get(name_model, {})
+            )
+        elif MODO_BUSQUEDA:
+            #-----  Las features se calculan una vez y la grilla se evalúa en paralelo sobre ellas
+            datos = cargar_datos_entrenamiento(data_path)
+            model = BusquedaHiperparametros(model_trainer).run(df=datos, developer=developer)
+        else:
+            #-----  Cargamos los datos
+            datos = cargar_datos_entrenamiento(data_path)
+            
+            #-----  Entrenamos el modelo
+            model = model_trainer.run(
+                df=datos,
+                model_type="logistic_regression",
+                developer=developer,
+                columna_peso="peso" if USAR_PESOS_DUPLICADOS else None,
+                C=PARAMETERS_MODEL.get("C", 1.0),
+                max_iter=PARAMETERS_MODEL.get("max_iter", 1000),
+                random_state=PARAMETERS_MODEL.get("random_state", 40),
+                solver=PARAMETERS_MODEL.get("solver", "liblinear")
+            )
+        
+        #-----  Rendimiento por sub-paso de todas las etapas que produjeron este modelo
+        #-----  Las etapas de datos dejan un reporte por archivo o partición procesada
+        registrar_en_mlflow(archivos_rendimiento(), seguimiento=seguimiento)
         
+        cache.registrar(salida, huella, datos={"run_id": run_id})
         logger.info(f"Entrenamiento del modelo completado correctamente. ID de ejecución: {run_id}")
         return model
 
 #-------------------------------------------------------------------------------
 #-------------------------------------------------------------------------------
 #-----  Creación del flujo principal
-@flow(name="Pipeline Clasificación de Tuits")
+@flow(name="Pipeline Clasificación de Tuits", task_runner=crear_task_runner())
 def main_flow():
     logger.info("Inicio del flujo principal")
-    text_processing_task(idioma=IDIOMA, file_name=FILE_NAME_DATA_INPUT, version=VERSION)
-    feature_extraccion(file_name=FILE_NAME_DATA_INPUT, version=VERSION)
+    if NUM_SHARDS <= 1:
+        etapas_cache = {
+            "text_processing_task": text_processing_task(
+                idioma=IDIOMA, file_name=FILE_NAME_DATA_INPUT, version=VERSION,
+                n_workers=workers_por_particion(concurrencia=1),
+            ),
+            "feature_extraccion": feature_extraccion(file_name=FILE_NAME_DATA_INPUT, version=VERSION),
+        }
+    else:
+        nombres = particionar_entrada(file_name=FILE_NAME_DATA_INPUT, num_shards=NUM_SHARDS)
+        #-----  Cada tarea abre su propio pool: el presupuesto se reparte entre las que corren a la vez
+        n_workers = workers_por_particion(concurrencia=CONCURRENCIA_SHARDS)
+        logger.info(
+            f"Presupuesto de procesos: {n_workers} por partición, hasta {CONCURRENCIA_SHARDS} particiones "
+            f"a la vez (task runner: {TASK_RUNNER_SHARDS})"
+        )
+        textos = text_processing_task.map(
+            idioma=unmapped(IDIOMA), file_name=nombres, version=unmapped(VERSION),
+            ruta_entrada=[ruta_particion(nombre) for nombre in nombres], n_workers=unmapped(n_workers),
+        )
+        features = feature_extraccion.map(file_name=nombres, version=unmapped(VERSION), texto_en_cache=textos)
+        etapas_cache = {
+            **{f"text_processing_task[{nombre}]": acierto for nombre, acierto in zip(nombres, textos.result())},
+            **{f"feature_extraccion[{nombre}]": acierto for nombre, acierto in zip(nombres, features.result())},
+        }
+        etapas_cache["unir_features"] = unir_features(
+            nombres=nombres, file_name=FILE_NAME_DATA_INPUT, version=VERSION
+        )
     model = training_model(file_name=FILE_NAME_DATA_FEATURE, version=VERSION)
+    logger.info(
+        "Etapas de datos reutilizadas desde caché: "
+        f"{[etapa for etapa, acierto in etapas_cache.items() if acierto] or 'ninguna'}"
+    )
     logger.info("Flujo principal completado exitosamente")
     return model
 
@@ -16,9 +16,25 @@
             donde cada dimensión representa una palabra del vocabulario, y 
             su valor corresponde a la frecuencia de esa palabra en el mensaje.
 
+        vectorizar_tokens(tokens):
+            Igual que fit_transform pero desde las listas de tokens de TextPreproc: arma la matriz de
+            conteos con CorpusTokens (ids de vocabulario) sin re-tokenizar el texto unido.
+
         transform_tfidf(X):
             Aplica la técnica TF-IDF para ponderar las palabras más relevantes 
             en cada mensaje, considerando su frecuencia en el documento y en el corpus.
+            La matriz resultante se guarda una sola vez con save_sparse_arrays.
+
+        save_sparse_arrays(X, name):
+            Guarda una matriz dispersa CSR como los arreglos data/indices/indptr en archivos .npy,
+            que luego se pueden abrir con memory-mapping sin cargarlos completos en memoria.
+
+        load_sparse_arrays(name):
+            Abre una matriz guardada con save_sparse_arrays mediante memory-mapping.
+
+        load_split():
+            Abre la matriz TF-IDF, las etiquetas y los índices de entrenamiento y prueba guardados
+            por split_train_test, sin copiar los datos.
 
         save_pickle(obj, path):
             Guarda objetos generados durante el proceso (como modelos entrenados 
@@ -27,17 +43,71 @@
         split_train_test(X, y):
             Divide los datos en conjuntos de entrenamiento y prueba. Uno se 
             utiliza para entrenar el modelo y el otro para evaluar qué tan bien aprendió.
+            En disco solo se guardan los índices de cada conjunto, no una copia de los datos.
 
         display_classification_report(y_true, y_pred):
             Genera y muestra las métricas de evaluación del modelo (precisión, recall, F1-score, etc.).
+            Cada conjunto se evalúa con una sola llamada a predict_proba y el modelo se registra una vez en MLflow.
+
+        seguimiento_activo():
+            Fachada de registro en MLflow: la asignada por el flujo (asíncrona, en lotes) o una síncrona
+            sobre la ejecución activa.
+
+        predict_from_proba(y_proba, classes):
+            Obtiene las etiquetas predichas a partir de las probabilidades.
+
+        run_incremental(df):
+            Incorpora un lote nuevo sin reentrenar sobre el histórico: actualiza el vocabulario y las
+            frecuencias de documentos persistidas (VocabularioIncremental), recalcula el IDF y continúa
+            el entrenamiento del SGDClassifier con partial_fit, ampliando sus coeficientes con ceros
+            para los términos nuevos.
 
-        train_model(X_train, y_train):
-            Realiza el entrenamiento del modelo de clasificación utilizando los datos de entrenamiento.
+        train_model(model_type):
+            Crea el modelo de clasificación a partir del registro MODELOS (regresión logística, SVM lineal
+            calibrada, Naive Bayes multinomial y complementario, y SGD) con sus parámetros por defecto.
+
+        compute_metrics(y_true, y_proba):
+            Calcula las métricas de evaluación a partir de las etiquetas reales y las probabilidades predichas.
+
+        run_out_of_core(file_path):
+            Entrena sin cargar el corpus completo en memoria: lee el archivo de features por bloques,
+            vectoriza con HashingVectorizer (sin vocabulario) y entrena un SGDClassifier con partial_fit.
+            La partición train/test se decide fila a fila con un hash del texto y la evaluación 
+            también se realiza por bloques, solo sobre el conjunto de prueba y con memoria constante
+            (MetricasIncrementales: matriz de confusión e histogramas de probabilidades para el ROC AUC).
+
+        preparar_features(df):
+            Vectoriza, aplica TF-IDF y divide los datos una sola vez; lo usan tanto el 
+            entrenamiento normal como la búsqueda de hiperparámetros. Si df trae la columna
+            TextPreproc se vectoriza desde los tokens.
 
         run(df):
             Ejecuta los métodos principales de manera secuencial para llevar a 
             cabo todo el flujo de trabajo: desde la transformación de los datos hasta el 
-            entrenamiento del modelo y la evaluación final.
+            entrenamiento del modelo y la evaluación final. El modelo entrenado se guarda en modelo.pkl.
+
+        guardar_modelo(model, name_model, vectorizador):
+            Guarda modelo.pkl junto con manifiesto_modelo.json, que indica con qué vectorizador se entrenó
+            ("conteos": count_vectorizer.pkl + tfidf_transformer.pkl, "hashing": hashing_vectorizer.pkl),
+            y exporta el paquete de inferencia (o elimina el anterior si el modelo no se puede exportar).
+
+        exportar_paquete(model, name_model):
+            Escribe paquete_modelo.bin (paqueteInferencia) con el vocabulario, el IDF, los coeficientes y
+            las etiquetas del modelo, para predecir solo con NumPy. Aplica a los modelos lineales con
+            predict_proba logístico (regresión logística y SGD con log_loss). El paquete guarda la huella de
+            modelo.pkl; si el modelo no se puede exportar se elimina el paquete anterior para no servirlo.
+            Incluye el preprocesamiento de preprocesamiento_paquete para que el servicio no importe NLTK.
+
+        preprocesamiento_paquete(terminos):
+            Patrones de contracciones y tabla de lemas (TextProcessing.tabla_lemas) del vocabulario; None
+            si no están los recursos de NLTK, y el paquete se exporta sin esa sección.
+
+        run_comparacion(df, familias):
+            Entrena varias familias de modelos en paralelo (hilos) sobre las mismas features, mide su
+            calidad, tiempo de entrenamiento, throughput de inferencia y tamaño, y elige el ganador
+            ponderando calidad y latencia con peso_latencia. La selección se hace sobre una fracción de
+            validación separada del conjunto de entrenamiento; el ganador se reentrena con todo el
+            entrenamiento y el conjunto de prueba solo se usa para el reporte final.
 
     Autor: Ivan Camilo Rosales
     Fecha: 2025-05-21
@@ -45,15 +115,95 @@
 """
 
 from librerias import (
-    os, pickle, joblib, logging, np, pd, plt,
-    Dict, Tuple, Optional, Any,
-    CountVectorizer, TfidfTransformer, train_test_split,
-    accuracy_score, classification_report, confusion_matrix, 
-    ConfusionMatrixDisplay, precision_recall_fscore_support, roc_auc_score,
-    LogisticRegression, mlflow, infer_signature
+    os, json, time, pickle, joblib, logging, np, pd, csr_matrix,
+    Dict, Tuple, Optional, Any, List, ThreadPoolExecutor,
+    CountVectorizer, TfidfTransformer, HashingVectorizer, train_test_split,
+    accuracy_score, classification_report,
+    precision_recall_fscore_support, roc_auc_score,
+    LogisticRegression, SGDClassifier, LinearSVC, CalibratedClassifierCV,
+    MultinomialNB, ComplementNB
 )
+from almacenamiento import leer_datos_por_bloques
+from instrumentacion import Instrumentacion
+from vocabularioIncremental import VocabularioIncremental
+from corpusTokens import CorpusTokens
+from paqueteInferencia import exportar_paquete, huella_archivo
+from seguimientoMlflow import seguimiento_sincrono
+
+
+def _linear_svc_calibrado(cv: int = 3, **params) -> CalibratedClassifierCV:
+    #-----  LinearSVC no tiene predict_proba: la calibración la agrega para evaluar y servir igual que el resto
+    return CalibratedClassifierCV(LinearSVC(**params), cv=cv)
+
+
+class MetricasIncrementales:
+    #-----  Las mismas métricas de compute_metrics acumuladas bloque a bloque con memoria constante:
+    #-----  accuracy, precision, recall y fscore (ponderados por soporte) salen de la matriz de confusión y el
+    #-----  ROC AUC one-vs-rest de un histograma por clase de las probabilidades de positivos y negativos
+    #-----  (los empates dentro de un intervalo cuentan la mitad; el error es menor que 1 / intervalos)
+    
+    def __init__(self, classes: np.ndarray, intervalos: int = 10_000):
+        self.classes = np.asarray(classes)
+        self.intervalos = intervalos
+        n = len(self.classes)
+        self.confusion = np.zeros((n, n), dtype=np.int64)
+        self.positivos = np.zeros((n, intervalos), dtype=np.int64)
+        self.negativos = np.zeros((n, intervalos), dtype=np.int64)
+        self.filas = 0
+    
+    def actualizar(self, y_true: np.ndarray, y_proba: np.ndarray) -> None:
+        reales = np.searchsorted(self.classes, y_true)
+        predichas = np.argmax(y_proba, axis=1)
+        np.add.at(self.confusion, (reales, predichas), 1)
+        celdas = np.minimum((np.asarray(y_proba) * self.intervalos).astype(np.int64), self.intervalos - 1)
+        for k in range(len(self.classes)):
+            es_clase = reales == k
+            self.positivos[k] += np.bincount(celdas[es_clase, k], minlength=self.intervalos)
+            self.negativos[k] += np.bincount(celdas[~es_clase, k], minlength=self.intervalos)
+        self.filas += len(reales)
+    
+    def resultado(self) -> Dict[str, float]:
+        soporte = self.confusion.sum(axis=1)
+        predichos = self.confusion.sum(axis=0)
+        aciertos = np.diag(self.confusion)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            precision = np.where(predichos > 0, aciertos / predichos, 0.0)
+            recall = np.where(soporte > 0, aciertos / soporte, 0.0)
+            fscore = np.where(precision + recall > 0, 2 * precision * recall / (precision + recall), 0.0)
+        pesos = soporte / soporte.sum()
+        
+        aucs = []
+        for k in range(len(self.classes)):
+            positivos, negativos = self.positivos[k], self.negativos[k]
+            if positivos.sum() == 0 or negativos.sum() == 0:
+                aucs.append(np.nan)
+                continue
+            negativos_debajo = np.cumsum(negativos) - negativos
+            aucs.append(float(np.sum(positivos * (negativos_debajo + 0.5 * negativos)) / (positivos.sum() * negativos.sum())))
+        aucs = np.array(aucs)
+        validos = ~np.isnan(aucs)
+        return {
+            "roc_auc": round(float(np.sum(aucs[validos] * pesos[validos]) / pesos[validos].sum()), 2),
+            "accuracy": round(float(aciertos.sum() / soporte.sum()), 2),
+            "precision": float(np.sum(precision * pesos)),
+            "recall": float(np.sum(recall * pesos)),
+            "fscore": float(np.sum(fscore * pesos)),
+        }
+
 
 class ModelTrain:
+    
+    #-----  Registro de modelos: nombre -> (constructor, parámetros por defecto)
+    #-----  Todos exponen predict_proba, que usan la evaluación y el servicio de inferencia
+    MODELOS = {
+        "logistic_regression": (
+            LogisticRegression, {'solver': 'saga', 'C': 1.0, 'max_iter': 1000, 'n_jobs': -1}
+        ),
+        "linear_svc": (_linear_svc_calibrado, {'C': 1.0, 'random_state': 40}),
+        "multinomial_nb": (MultinomialNB, {'alpha': 1.0}),
+        "complement_nb": (ComplementNB, {'alpha': 1.0}),
+        "sgd": (SGDClassifier, {'loss': 'log_loss', 'alpha': 1e-5, 'random_state': 40}),
+    }
    
     def __init__(self, data_processed_path: str = "./data/modelos"):
         self.data_processed_path = data_processed_path
@@ -61,6 +211,11 @@ class ModelTrain:
         self.label2idx = {v: k for k, v in self.idx2label.items()}
         self.count_vectorizer = None
         self.tfidf_transformer = None
+        self.train_idx = None
+        self.pesos_train = None
+        #-----  SeguimientoMlflow asignado por training_model; None registra en línea en la ejecución activa
+        self.seguimiento = None
+        self.instrumentacion = Instrumentacion(etapa="model_train")
         self.logger = logging.getLogger(__name__)
         
         # Create data directory if it doesn't exist
@@ -84,16 +239,52 @@ class ModelTrain:
         self.logger.info("Count vectorizer trained successfully stored")
         return X_vectorized
     
+    def vectorizar_tokens(self, tokens: pd.Series) -> csr_matrix:
+        corpus = CorpusTokens.desde_serie(tokens)
+        X_vectorized = corpus.matriz_conteos()
+        #-----  El vectorizador guardado tiene el mismo vocabulario: el servicio transforma textCls como antes
+        self.count_vectorizer = corpus.count_vectorizer()
+        joblib.dump(self.count_vectorizer, 
+                   os.path.join(self.data_processed_path, 'count_vectorizer.pkl'))
+        self.logger.info("Count vectorizer built from token ids and stored")
+        return X_vectorized
+    
     def transform_tfidf(self, X_vectorized: object) -> np.ndarray:
         self.tfidf_transformer = TfidfTransformer()
         X_tfidf = self.tfidf_transformer.fit_transform(X_vectorized)
         joblib.dump(self.tfidf_transformer, 
                    os.path.join(self.data_processed_path, 'tfidf_transformer.pkl'))
-        joblib.dump(X_tfidf, 
-                   os.path.join(self.data_processed_path, 'X_tfidf.pkl'))
+        self.save_sparse_arrays(X_tfidf, 'X_tfidf')
         self.logger.info("TF-IDF transformer and X_tfidf trained successfully stored")
         return X_tfidf
     
+    def save_sparse_arrays(self, X: csr_matrix, name: str) -> None:
+        path = os.path.join(self.data_processed_path, name)
+        os.makedirs(path, exist_ok=True)
+        X = csr_matrix(X)
+        np.save(os.path.join(path, 'data.npy'), X.data)
+        np.save(os.path.join(path, 'indices.npy'), X.indices)
+        np.save(os.path.join(path, 'indptr.npy'), X.indptr)
+        np.save(os.path.join(path, 'shape.npy'), np.array(X.shape, dtype=np.int64))
+    
+    def load_sparse_arrays(self, name: str, mmap_mode: Optional[str] = 'r') -> csr_matrix:
+        path = os.path.join(self.data_processed_path, name)
+        arrays = {
+            part: np.load(os.path.join(path, f'{part}.npy'), mmap_mode=mmap_mode)
+            for part in ('data', 'indices', 'indptr')
+        }
+        shape = tuple(np.load(os.path.join(path, 'shape.npy')))
+        #-----  Con copy=False la matriz queda respaldada por los archivos mapeados en memoria
+        return csr_matrix((arrays['data'], arrays['indices'], arrays['indptr']), shape=shape, copy=False)
+    
+    def load_split(self, mmap_mode: Optional[str] = 'r') -> Tuple[csr_matrix, np.ndarray, np.ndarray, np.ndarray]:
+        path = os.path.join(self.data_processed_path, 'split')
+        X_tfidf = self.load_sparse_arrays('X_tfidf', mmap_mode=mmap_mode)
+        y = np.load(os.path.join(path, 'y.npy'), mmap_mode=mmap_mode)
+        train_idx = np.load(os.path.join(path, 'train_idx.npy'), mmap_mode=mmap_mode)
+        test_idx = np.load(os.path.join(path, 'test_idx.npy'), mmap_mode=mmap_mode)
+        return X_tfidf, y, train_idx, test_idx
+    
     def save_pickle(self, data: Any, filename: str) -> None:
         filepath = os.path.join(self.data_processed_path, f"{filename}.pkl")
         with open(filepath, 'wb') as file:
@@ -104,12 +295,20 @@ class ModelTrain:
         test_size: float = 0.3, random_state: int = 42
     ) -> Tuple[np.ndarray, np.ndarray, pd.Series, pd.Series]:
         
-        X_train, X_test, y_train, y_test = train_test_split(
-            X_tfidf, y, test_size=test_size, random_state=random_state
+        #-----  Se dividen los índices de las filas (misma partición que dividir X_tfidf directamente)
+        train_idx, test_idx = train_test_split(
+            np.arange(X_tfidf.shape[0]), test_size=test_size, random_state=random_state
         )
-        self.save_pickle((X_train, y_train), "train")
-        self.save_pickle((X_test, y_test), "test")
-        self.logger.info("Data saved successfully in pickle files")
+        path = os.path.join(self.data_processed_path, 'split')
+        os.makedirs(path, exist_ok=True)
+        np.save(os.path.join(path, 'train_idx.npy'), train_idx)
+        np.save(os.path.join(path, 'test_idx.npy'), test_idx)
+        np.save(os.path.join(path, 'y.npy'), np.asarray(y))
+        self.train_idx = train_idx
+        self.logger.info("Train/test indices saved successfully")
+        
+        X_train, X_test = X_tfidf[train_idx], X_tfidf[test_idx]
+        y_train, y_test = y.iloc[train_idx], y.iloc[test_idx]
         return X_train, X_test, y_train, y_test
     
     def display_classification_report(
@@ -122,17 +321,21 @@ class ModelTrain:
         y_train: np.ndarray,
         y_test: np.ndarray
     ) -> list:
+        #-----  MLflow solo se importa cuando se registra una ejecución (no al servir el modelo)
+        from librerias import infer_signature
         
+        seguimiento = self.seguimiento_activo()
         metric = []
+        #-----  Cada conjunto se evalúa una sola vez: las etiquetas se derivan de las probabilidades
         y_train_pred_proba = model.predict_proba(X_train)
         y_test_pred_proba = model.predict_proba(X_test)
+        y_train_pred = self.predict_from_proba(y_train_pred_proba, model.classes_)
+        y_test_pred = self.predict_from_proba(y_test_pred_proba, model.classes_)
         
-        roc_auc_score_train = round(
-            roc_auc_score(y_train, y_train_pred_proba, average="weighted", multi_class="ovr"),2,)
-        
-        roc_auc_score_test = round(
-            roc_auc_score(y_test, y_test_pred_proba, average="weighted", multi_class="ovr"),2,)
-
+        metrics_train = self.compute_metrics(y_train, y_train_pred_proba, model.classes_)
+        metrics_test = self.compute_metrics(y_test, y_test_pred_proba, model.classes_)
+        roc_auc_score_train = metrics_train["roc_auc"]
+        roc_auc_score_test = metrics_test["roc_auc"]
 
         self.logger.info(f"ROC AUC Score Train: {roc_auc_score_train}")
         self.logger.info(f"ROC AUC Score Test: {roc_auc_score_test}")
@@ -140,44 +343,28 @@ class ModelTrain:
         # Adding the metrics to the list
         metric.extend([roc_auc_score_train, roc_auc_score_test])
 
-        mlflow.log_metric("roc_auc_train", roc_auc_score_train)
-        mlflow.log_metric("roc_auc_test", roc_auc_score_test)
+        seguimiento.log_metrics({
+            "roc_auc_train": roc_auc_score_train,
+            "roc_auc_test": roc_auc_score_test,
+            "precision_train": metrics_train["precision"],
+            "precision_test": metrics_test["precision"],
+            "recall_train": metrics_train["recall"],
+            "recall_test": metrics_test["recall"],
+        })
 
-        y_train_pred = model.predict(X_train)
-        y_test_pred = model.predict(X_test)
-        
-        (precision_train,recall_train,fscore_train,support_train,) = precision_recall_fscore_support(
-                                                                        y_train, y_train_pred, average="weighted")
-        
-        (precision_test,recall_test,fscore_test,support_test,) = precision_recall_fscore_support(
-                                                                        y_test, y_test_pred, average="weighted")
-
-        mlflow.log_metric("precision_train", precision_train)
-        mlflow.log_metric("precision_test", precision_test)
-        mlflow.log_metric("recall_train", recall_train)
-        mlflow.log_metric("recall_test", recall_test)
-        
-        signature = infer_signature(X_test, y_test_pred)
-        mlflow.sklearn.log_model(
-            sk_model=model,
-            artifact_path=f"model_{name_model}",
-            input_example=X_test[:5],
-            signature=signature
-        )
-
-        acc_score_train = round(accuracy_score(y_train, y_train_pred), 2)
-        acc_score_test = round(accuracy_score(y_test, y_test_pred), 2)
+        acc_score_train = metrics_train["accuracy"]
+        acc_score_test = metrics_test["accuracy"]
 
         metric.extend(
             [
                 acc_score_train,
                 acc_score_test,
-                round(precision_train, 2),
-                round(precision_test, 2),
-                round(recall_train, 2),
-                round(recall_test, 2),
-                round(fscore_train, 2),
-                round(fscore_test, 2),
+                round(metrics_train["precision"], 2),
+                round(metrics_test["precision"], 2),
+                round(metrics_train["recall"], 2),
+                round(metrics_test["recall"], 2),
+                round(metrics_train["fscore"], 2),
+                round(metrics_test["fscore"], 2),
             ]
         )
 
@@ -190,68 +377,420 @@ class ModelTrain:
         print("Classification Report for Train:\n", model_report_train)
         print("Classification Report for Test:\n", model_report_test)
         
-        # Log model to MLflow again with a different path
-        mlflow.sklearn.log_model(
-            sk_model=model,
-            artifact_path=f"models_{name_model}",
+        # Log the model to MLflow once (the upload runs in the background)
+        signature = infer_signature(X_test, y_test_pred)
+        seguimiento.log_model(
+            model,
+            artifact_path=f"model_{name_model}",
             input_example=X_test[:5],
             signature=signature
         )
 
         return metric
     
-    def train_model(self, model_type: str = "logistic_regression", **kwargs) -> object:
+    def seguimiento_activo(self):
+        return self.seguimiento or seguimiento_sincrono()
+    
+    def predict_from_proba(self, y_proba: np.ndarray, classes: np.ndarray) -> np.ndarray:
+        #-----  Para los modelos lineales el argmax de predict_proba coincide con predict
+        return np.asarray(classes)[np.argmax(y_proba, axis=1)]
+    
+    def compute_metrics(self, y_true: np.ndarray, y_proba: np.ndarray, classes: np.ndarray) -> Dict[str, float]:
+        y_pred = self.predict_from_proba(y_proba, classes)
+        precision, recall, fscore, _ = precision_recall_fscore_support(y_true, y_pred, average="weighted")
+        return {
+            "roc_auc": round(roc_auc_score(y_true, y_proba, average="weighted", multi_class="ovr", labels=classes), 2),
+            "accuracy": round(accuracy_score(y_true, y_pred), 2),
+            "precision": precision,
+            "recall": recall,
+            "fscore": fscore,
+        }
+    
+    def _split_mask(self, X: pd.Series, test_size: float, random_state: int) -> np.ndarray:
+        #-----  La partición depende solo del texto, así que es la misma en cada pasada sobre el 
+        #-----  archivo y los textos repetidos siempre caen del mismo lado
+        hash_key = f"{random_state:016d}"[-16:]
+        hashes = pd.util.hash_pandas_object(X, index=False, hash_key=hash_key).values
+        return (hashes % 10_000) < int(test_size * 10_000)
+    
+    def _read_feature_chunks(self, file_path: str, chunksize: int):
+        for chunk in leer_datos_por_bloques(file_path, columnas=['textCls', 'sentimiento'], chunksize=chunksize):
+            X, y = self.data_transform(chunk)
+            yield X.astype(str), self.decode_labels_into_idx(y).values
+    
+    def run_out_of_core(self, file_path: str, developer: str = "Ivan Camilo",
+                        chunksize: int = 200_000, n_features: int = 2 ** 20, epochs: int = 1,
+                        test_size: float = 0.3, random_state: int = 42, **kwargs) -> object:
         
-        if model_type == "logistic_regression":
-            params = {
-                'solver': 'saga',
-                'C': 1.0,
-                'max_iter': 1000,
-                'n_jobs': -1
-            }
-            # Update with any user-provided parameters
-            params.update(kwargs)
-            model = LogisticRegression(**params)
+        seguimiento = self.seguimiento_activo()
+        self.logger.info(f"Starting out-of-core training from {file_path}")
+        self.instrumentacion.iniciar_perfil()
+        #-----  HashingVectorizer no tiene estado: no hay vocabulario que crezca con los datos
+        vectorizer = HashingVectorizer(n_features=n_features, alternate_sign=False, norm='l2')
+        joblib.dump(vectorizer, os.path.join(self.data_processed_path, 'hashing_vectorizer.pkl'))
+        
+        params = {'loss': 'log_loss', 'alpha': 1e-6, 'random_state': 40}
+        params.update(kwargs)
+        model = SGDClassifier(**params)
+        classes = np.array(sorted(self.idx2label.values()))
+        
+        for epoch in range(epochs):
+            rows = 0
+            with self.instrumentacion.medir("fit") as registro:
+                for X, y in self._read_feature_chunks(file_path, chunksize):
+                    train = ~self._split_mask(X, test_size, random_state)
+                    if train.any():
+                        model.partial_fit(vectorizer.transform(X[train]), y[train], classes=classes)
+                    rows += int(train.sum())
+                registro["filas_entrada"] = registro["filas_salida"] = rows
+            self.logger.info(f"Epoch {epoch + 1}/{epochs} completed - {rows} training rows")
+        self.guardar_modelo(model, "sgd_hashing", vectorizador="hashing")
+        
+        #-----  Evaluación por bloques sobre el conjunto de prueba: solo se acumulan la matriz de confusión y
+        #-----  los histogramas de probabilidades, así la memoria no crece con el número de filas
+        metricas = MetricasIncrementales(classes)
+        with self.instrumentacion.medir("evaluate") as registro:
+            for X, y in self._read_feature_chunks(file_path, chunksize):
+                test = self._split_mask(X, test_size, random_state)
+                if test.any():
+                    metricas.actualizar(y[test], model.predict_proba(vectorizer.transform(X[test])))
+            metrics = metricas.resultado()
+            self.logger.info(f"Test metrics: {metrics}")
+            seguimiento.log_metrics({f"{name}_test": value for name, value in metrics.items()})
+            registro["filas_entrada"] = registro["filas_salida"] = metricas.filas
+        
+        seguimiento.log_model(model, artifact_path="model_Sgd_hashing")
+        self.instrumentacion.guardar(self.data_processed_path)
+        return model
+    
+    def _ampliar_coeficientes(self, model: SGDClassifier, n_features: int) -> None:
+        #-----  Los términos nuevos del vocabulario entran con peso cero
+        faltantes = n_features - model.coef_.shape[1]
+        if faltantes > 0:
+            model.coef_ = np.hstack([model.coef_, np.zeros((model.coef_.shape[0], faltantes))])
+            model.n_features_in_ = n_features
+    
+    def run_incremental(self, df: pd.DataFrame, huella_lote: Optional[str] = None,
+                        developer: str = "Ivan Camilo", epochs: int = 1,
+                        test_size: float = 0.3, random_state: int = 42, **kwargs) -> object:
+        
+        self.logger.info("Starting incremental training")
+        self.instrumentacion.iniciar_perfil()
+        path_estado = os.path.join(self.data_processed_path, 'vocabulario_incremental')
+        ruta_modelo = os.path.join(self.data_processed_path, 'modelo_incremental.pkl')
+        vocabulario = VocabularioIncremental.cargar(path_estado)
+        if huella_lote is not None and vocabulario.contiene_lote(huella_lote) and os.path.exists(ruta_modelo):
+            self.logger.warning("The batch was already incorporated; keeping the current model")
+            return joblib.load(ruta_modelo)
+        
+        X, y = self.data_transform(df)
+        Y = self.decode_labels_into_idx(labels=y).values
+        with self.instrumentacion.medir("vectorize", len(X)):
+            X_counts = vocabulario.actualizar(X.tolist(), huella_lote=huella_lote)
+        self.count_vectorizer = vocabulario.count_vectorizer()
+        self.tfidf_transformer = vocabulario.tfidf_transformer()
+        with self.instrumentacion.medir("tfidf", X_counts.shape[0]):
+            X_tfidf = self.tfidf_transformer.transform(X_counts)
+        
+        test = self._split_mask(X, test_size, random_state)
+        X_train, X_test, y_train, y_test = X_tfidf[~test], X_tfidf[test], Y[~test], Y[test]
+        
+        if os.path.exists(ruta_modelo):
+            model = joblib.load(ruta_modelo)
+            self._ampliar_coeficientes(model, X_tfidf.shape[1])
         else:
-            raise ValueError(f"Unsupported model type: {model_type}")
+            params = {'loss': 'log_loss', 'alpha': 1e-6, 'random_state': 40}
+            params.update(kwargs)
+            model = SGDClassifier(**params)
+        classes = np.array(sorted(self.idx2label.values()))
+        with self.instrumentacion.medir("fit", X_train.shape[0] * epochs):
+            for _ in range(epochs):
+                model.partial_fit(X_train, y_train, classes=classes)
+        
+        joblib.dump(model, ruta_modelo)
+        joblib.dump(self.count_vectorizer, os.path.join(self.data_processed_path, 'count_vectorizer.pkl'))
+        joblib.dump(self.tfidf_transformer, os.path.join(self.data_processed_path, 'tfidf_transformer.pkl'))
+        self.guardar_modelo(model, "sgd_incremental")
+        vocabulario.guardar(path_estado)
+        
+        self.seguimiento_activo().log_metrics({
+            "vocabulario_terminos": len(vocabulario.vocabulario),
+            "documentos_acumulados": vocabulario.n_documentos,
+            "lotes_incorporados": len(vocabulario.lotes),
+        })
+        with self.instrumentacion.medir("evaluate", X_tfidf.shape[0]):
+            self.display_classification_report(
+                model=model,
+                name_model="Sgd_incremental",
+                developer=developer,
+                X_train=X_train,
+                X_test=X_test,
+                y_train=y_train,
+                y_test=y_test
+            )
+        self.instrumentacion.guardar(self.data_processed_path)
+        
+        return model
+    
+    def train_model(self, model_type: str = "logistic_regression", **kwargs) -> object:
+        
+        if model_type not in self.MODELOS:
+            raise ValueError(
+                f"Unsupported model type: {model_type}. Supported types: {sorted(self.MODELOS)}"
+            )
+        constructor, params = self.MODELOS[model_type]
+        params = dict(params)
+        # Update with any user-provided parameters
+        params.update(kwargs)
+        model = constructor(**params)
             
         return model
     
-    def run(self, df: pd.DataFrame, model_type: str = "logistic_regression", 
-            developer: str = "Ivan Camilo", **kwargs) -> object:
+    def _entrenar_familia(
+        self, model_type: str, params: Dict[str, Any],
+        X_fit: csr_matrix, X_val: csr_matrix, y_fit: pd.Series, y_val: pd.Series
+    ) -> Dict[str, Any]:
+        model = self.train_model(model_type=model_type, **params)
+        with self.instrumentacion.medir(f"fit_{model_type}", X_fit.shape[0]):
+            inicio = time.perf_counter()
+            model.fit(X_fit, y_fit)
+            fit_segundos = time.perf_counter() - inicio
         
-        self.logger.info(f"Starting model training process with {model_type}")
+        inicio = time.perf_counter()
+        y_proba = model.predict_proba(X_val)
+        inferencia_segundos = time.perf_counter() - inicio
+        
+        metrics = self.compute_metrics(y_val, y_proba, model.classes_)
+        resultado = {
+            "modelo": model_type,
+            "fit_segundos": round(fit_segundos, 4),
+            "tuits_por_segundo": round(X_val.shape[0] / inferencia_segundos, 1),
+            "tamano_kb": round(len(pickle.dumps(model)) / 1024, 1),
+            **{f"{name}_val": value for name, value in metrics.items()},
+        }
+        self.logger.info(f"Familia {model_type}: {resultado}")
+        return {"model": model, "resultado": resultado}
+    
+    def elegir_ganador(self, resultados: pd.DataFrame, peso_latencia: float = 0.0) -> str:
+        #-----  Calidad y throughput se normalizan contra el mejor de cada columna;
+        #-----  peso_latencia = 0 elige solo por fscore y 1 solo por velocidad de inferencia.
+        #-----  Se compara sobre validación: el conjunto de prueba no interviene en la selección
+        calidad = resultados["fscore_val"] / resultados["fscore_val"].max()
+        velocidad = resultados["tuits_por_segundo"] / resultados["tuits_por_segundo"].max()
+        resultados["puntaje"] = (1 - peso_latencia) * calidad + peso_latencia * velocidad
+        return resultados.loc[resultados["puntaje"].idxmax(), "modelo"]
+    
+    def preparar_features(
+        self, df: pd.DataFrame, columna_peso: Optional[str] = None
+    ) -> Tuple[csr_matrix, csr_matrix, pd.Series, pd.Series]:
         self.logger.info(f"DataFrame shape: {df.shape}")                                                                      
         X, y = self.data_transform(df)
         self.logger.info(f"After data transform - X shape: {X.shape}, y shape: {y.shape}")                                                                                    
         Y = self.decode_labels_into_idx(labels=y)
         
         # Feature extraction
-        X_vectorized = self.fit_transform(X.values)
+        with self.instrumentacion.medir("vectorize", len(X)):
+            if "TextPreproc" in df.columns:
+                X_vectorized = self.vectorizar_tokens(df.loc[X.index, "TextPreproc"])
+            else:
+                X_vectorized = self.fit_transform(X.values)
         self.logger.info(f"After vectorization - X shape: {X_vectorized.shape}")                                                                        
-        X_tfidf = self.transform_tfidf(X_vectorized)
+        with self.instrumentacion.medir("tfidf", X_vectorized.shape[0]):
+            X_tfidf = self.transform_tfidf(X_vectorized)
         self.logger.info(f"After TFIDF - X shape: {X_tfidf.shape}")                                                           
         
         # Train-test split
-        X_train, X_test, y_train, y_test = self.split_train_test(X_tfidf, Y)
+        with self.instrumentacion.medir("split", X_tfidf.shape[0]):
+            X_train, X_test, y_train, y_test = self.split_train_test(X_tfidf, Y)
         self.logger.info(f"After train-test split - X_train: {X_train.shape}, X_test: {X_test.shape}")                                                                                              
+        #-----  Pesos por fila (por ejemplo, el tamaño de cada grupo de duplicados) alineados con X_train
+        self.pesos_train = None
+        if columna_peso is not None:
+            self.pesos_train = np.asarray(df.loc[X.index, columna_peso], dtype=np.float64)[self.train_idx]
+        return X_train, X_test, y_train, y_test
+    
+    def exportar_paquete(self, model: object, name_model: str) -> Optional[str]:
+        cv, tfidf = self.count_vectorizer, self.tfidf_transformer
+        if isinstance(model, LogisticRegression):
+            multinomial = model.solver != "liblinear" and getattr(model, "multi_class", "auto") != "ovr"
+        elif isinstance(model, SGDClassifier) and model.loss == "log_loss":
+            multinomial = False
+        else:
+            self.descartar_paquete(f"{type(model).__name__} is not supported")
+            return None
+        #-----  El paquete reproduce el analizador por defecto de CountVectorizer (palabras, minúsculas, token_pattern)
+        if cv is None or tfidf is None or any([
+            cv.analyzer != "word", tuple(cv.ngram_range) != (1, 1), cv.binary, cv.tokenizer is not None,
+            cv.preprocessor is not None, cv.strip_accents is not None, cv.stop_words is not None,
+        ]):
+            self.descartar_paquete("unsupported vectorizer configuration")
+            return None
+        
+        vocabulario = getattr(cv, "vocabulary_", None) or cv.vocabulary
+        #-----  Ordenados por sus bytes UTF-8, que es el orden de np.searchsorted sobre el arreglo de ancho fijo
+        terminos = sorted((termino.encode("utf-8"), indice) for termino, indice in vocabulario.items())
+        arreglos = {
+            "terminos": np.array([termino for termino, _ in terminos], dtype=np.bytes_),
+            "columnas": np.array([indice for _, indice in terminos], dtype=np.int32),
+        }
+        encabezado = {}
+        preprocesamiento = self.preprocesamiento_paquete(vocabulario)
+        if preprocesamiento is not None:
+            contracciones, lemas = preprocesamiento
+            origenes = sorted(lemas, key=lambda token: token.encode("utf-8"))
+            arreglos["lemas_origen"] = np.array([token.encode("utf-8") for token in origenes], dtype=np.bytes_)
+            arreglos["lemas_destino"] = np.array([(lemas[token] or "").encode("utf-8") for token in origenes], dtype=np.bytes_)
+            encabezado["preprocesamiento"] = {"contracciones": list(contracciones)}
+        coef = np.asarray(model.coef_, dtype=np.float64)
+        if coef.shape[0] == 1:
+            modo = "binario"
+        else:
+            modo = "multinomial" if multinomial else "ovr"
+        version = exportar_paquete(
+            os.path.join(self.data_processed_path, 'paquete_modelo.bin'),
+            arreglos={
+                **arreglos,
+                "idf": np.asarray(tfidf.idf_ if tfidf.use_idf else np.ones(len(vocabulario)), dtype=np.float64),
+                "coeficientes": coef.T,
+                "interceptos": np.asarray(model.intercept_, dtype=np.float64),
+            },
+            encabezado={
+                "modelo": name_model,
+                "huella_modelo": huella_archivo(os.path.join(self.data_processed_path, 'modelo.pkl')),
+                "modo": modo,
+                "etiquetas": [self.label2idx[int(clase)] for clase in model.classes_],
+                "token_pattern": cv.token_pattern,
+                "lowercase": cv.lowercase,
+                "norm": tfidf.norm,
+                "sublinear_tf": tfidf.sublinear_tf,
+                **encabezado,
+            },
+        )
+        self.logger.info(f"Inference bundle exported (version {version})")
+        return version
+    
+    def preprocesamiento_paquete(self, terminos) -> Optional[Tuple[Tuple[str, ...], Dict[str, Optional[str]]]]:
+        #-----  El paquete usa tokenizar_regex, que sobre el texto limpio da los mismos tokens que word_tokenize
+        from config import IDIOMA
+        from textProcessing import TextProcessing
+        from limpiezaTexto import contracciones_nltk
+        try:
+            text_processing = TextProcessing(idioma=IDIOMA)
+            return contracciones_nltk(), text_processing.tabla_lemas(terminos)
+        except LookupError as e:
+            self.logger.info(f"Inference bundle exported without preprocessing: {e}")
+            return None
+    
+    def guardar_modelo(self, model: object, name_model: str, vectorizador: str = "conteos") -> None:
+        joblib.dump(model, os.path.join(self.data_processed_path, 'modelo.pkl'))
+        #-----  El manifiesto le indica al servicio y a la predicción por lotes qué vectorizador acompaña a modelo.pkl
+        archivos = {
+            "conteos": {"vectorizador": "count_vectorizer.pkl", "tfidf": "tfidf_transformer.pkl"},
+            "hashing": {"vectorizador": "hashing_vectorizer.pkl", "tfidf": None},
+        }[vectorizador]
+        with open(os.path.join(self.data_processed_path, 'manifiesto_modelo.json'), 'w', encoding='utf-8') as archivo:
+            json.dump({"modelo": name_model, "vectorizador": vectorizador, "archivos": archivos}, archivo, indent=2)
+        if vectorizador == "conteos":
+            self.exportar_paquete(model, name_model)
+        else:
+            self.descartar_paquete(f"the model uses the {vectorizador} vectorizer")
+    
+    def descartar_paquete(self, motivo: str) -> None:
+        #-----  Un paquete de un entrenamiento anterior no corresponde al modelo.pkl nuevo: se elimina
+        ruta = os.path.join(self.data_processed_path, 'paquete_modelo.bin')
+        if os.path.exists(ruta):
+            os.remove(ruta)
+        self.logger.info(f"Inference bundle not exported: {motivo}")
+    
+    def run(self, df: pd.DataFrame, model_type: str = "logistic_regression", 
+            developer: str = "Ivan Camilo", columna_peso: Optional[str] = None, **kwargs) -> object:
+        
+        self.logger.info(f"Starting model training process with {model_type}")
+        self.instrumentacion.iniciar_perfil()
+        X_train, X_test, y_train, y_test = self.preparar_features(df, columna_peso=columna_peso)
         
         # Model training
         model = self.train_model(model_type=model_type, **kwargs)
         self.logger.info("Fitting model...")                                    
-        model.fit(X_train, y_train)
+        with self.instrumentacion.medir("fit", X_train.shape[0]):
+            model.fit(X_train, y_train, sample_weight=self.pesos_train)
         self.logger.info("Model fitting completed")                                           
+        self.guardar_modelo(model, model_type)
         
         # Model evaluation
-        metrics = self.display_classification_report(
-            model=model,
-            name_model=model_type.capitalize(),
-            developer=developer,
-            X_train=X_train,
-            X_test=X_test,
-            y_train=y_train,
-            y_test=y_test
+        with self.instrumentacion.medir("evaluate", X_train.shape[0] + X_test.shape[0]):
+            metrics = self.display_classification_report(
+                model=model,
+                name_model=model_type.capitalize(),
+                developer=developer,
+                X_train=X_train,
+                X_test=X_test,
+                y_train=y_train,
+                y_test=y_test
+            )
+        self.instrumentacion.guardar(self.data_processed_path)
+        
+        return model
+    
+    def run_comparacion(
+        self, df: pd.DataFrame, familias: List[str], parametros: Optional[Dict[str, Dict[str, Any]]] = None,
+        developer: str = "Ivan Camilo", n_workers: Optional[int] = None, peso_latencia: float = 0.0,
+        fraccion_validacion: float = 0.2, random_state: int = 42
+    ) -> object:
+        seguimiento = self.seguimiento_activo()
+        self.logger.info(f"Starting model comparison: {familias}")
+        self.instrumentacion.iniciar_perfil()
+        parametros = parametros or {}
+        X_train, X_test, y_train, y_test = self.preparar_features(df)
+        #-----  Validación separada del entrenamiento (como BusquedaHiperparametros.preparar_datos)
+        fit_idx, val_idx = train_test_split(
+            np.arange(X_train.shape[0]), test_size=fraccion_validacion, random_state=random_state
         )
+        X_fit, X_val = X_train[fit_idx], X_train[val_idx]
+        y_fit, y_val = y_train.iloc[fit_idx], y_train.iloc[val_idx]
+        
+        #-----  Hilos: todas las familias comparten las mismas matrices sin copiarlas y los 
+        #-----  solvers de scikit-learn liberan el GIL durante el entrenamiento
+        with ThreadPoolExecutor(max_workers=n_workers or len(familias)) as pool:
+            futuros = {
+                familia: pool.submit(
+                    self._entrenar_familia, familia, parametros.get(familia, {}),
+                    X_fit, X_val, y_fit, y_val
+                )
+                for familia in familias
+            }
+            entrenados = {familia: futuro.result() for familia, futuro in futuros.items()}
+        
+        resultados = pd.DataFrame([entrenado["resultado"] for entrenado in entrenados.values()])
+        ganador = self.elegir_ganador(resultados, peso_latencia=peso_latencia)
+        self.logger.info(f"Model comparison:\n{resultados.to_string(index=False)}")
+        self.logger.info(f"Selected model: {ganador} (peso_latencia={peso_latencia})")
+        
+        ruta_resultados = os.path.join(self.data_processed_path, 'comparacion_modelos.csv')
+        resultados.to_csv(ruta_resultados, index=False)
+        seguimiento.log_artifact(ruta_resultados)
+        for fila in resultados.to_dict(orient="records"):
+            seguimiento.log_metrics({
+                f"{fila['modelo']}_{name}": value for name, value in fila.items() if name != "modelo"
+            })
+        seguimiento.log_params({"modelo_ganador": ganador, "peso_latencia": peso_latencia})
+        
+        #-----  El ganador se reentrena con todo el conjunto de entrenamiento (ajuste + validación)
+        model = self.train_model(model_type=ganador, **parametros.get(ganador, {}))
+        with self.instrumentacion.medir("fit_ganador", X_train.shape[0]):
+            model.fit(X_train, y_train)
+        self.guardar_modelo(model, ganador)
+        with self.instrumentacion.medir("evaluate", X_train.shape[0] + X_test.shape[0]):
+            self.display_classification_report(
+                model=model,
+                name_model=ganador.capitalize(),
+                developer=developer,
+                X_train=X_train,
+                X_test=X_test,
+                y_train=y_train,
+                y_test=y_test
+            )
+        self.instrumentacion.guardar(self.data_processed_path)
         
         return model
   
@@ -0,0 +1,202 @@
+"""
+    paqueteInferencia.py
+    Descripción:
+        Paquete de inferencia en un solo archivo versionado y un clasificador que solo depende de NumPy.
+        El paquete guarda todo lo que necesita la predicción sobre el texto preprocesado (textCls):
+            - el vocabulario ordenado como un arreglo de bytes de ancho fijo (UTF-8), con la columna de
+              cada término, de modo que la búsqueda es una búsqueda binaria vectorizada (np.searchsorted),
+            - el vector IDF y las opciones de TfidfTransformer (norm, sublinear_tf),
+            - los coeficientes (transpuestos: una fila contigua por término) y los interceptos del modelo,
+            - las etiquetas de las clases y el modo de las probabilidades (multinomial, ovr o binario),
+            - opcionalmente el preprocesamiento (sección "preprocesamiento" del encabezado): los patrones de
+              contracciones del tokenizador y la tabla de lemas del vocabulario (lemas_origen ordenados y
+              lemas_destino; un destino vacío es una stopword), para preprocesar sin NLTK.
+
+        Formato: MAGICO (8 bytes), longitud del encabezado (uint64), encabezado JSON y los arreglos, cada
+        uno alineado a 64 bytes. ClasificadorPaquete abre los arreglos con np.memmap: la carga no copia
+        los datos ni importa scikit-learn, joblib o MLflow. Los paquetes exportados sin preprocesamiento
+        se siguen leyendo; en ese caso el servicio preprocesa con TextProcessing.
+
+    Funciones:
+        exportar_paquete(ruta, arreglos, encabezado):
+            Escribe el paquete (de forma atómica) y retorna su versión (hash del contenido).
+        huella_archivo(ruta):
+            SHA-256 de un archivo; el paquete guarda la de modelo.pkl para saber a qué modelo corresponde.
+
+    Clases:
+        ClasificadorPaquete:
+            preprocesar(texto):
+                Texto preprocesado (textCls) con la limpieza, el tokenizador regex y la tabla de lemas del
+                paquete; requiere que el paquete tenga la sección de preprocesamiento (preprocesa).
+            vectorizar(textos):
+                Matriz TF-IDF dispersa de los textos como (filas, columnas, valores).
+            predecir_probabilidades(textos):
+                Probabilidades por clase, en el orden de etiquetas.
+            predecir(textos):
+                Etiqueta de cada texto.
+    Autor: Ivan Camilo Rosales
+    Fecha: 2025-05-21
+"""
+
+from librerias import os, re, json, hashlib, datetime, np, Dict, List, Any, Tuple
+from limpiezaTexto import limpiar_texto, tokenizar_regex
+
+
+MAGICO = b"PAQTUITS"
+VERSION_FORMATO = 1
+ALINEACION = 64
+
+
+def _alinear(posicion: int) -> int:
+    return -(-posicion // ALINEACION) * ALINEACION
+
+
+def huella_archivo(ruta: str) -> str:
+    huella = hashlib.sha256()
+    with open(ruta, "rb") as archivo:
+        for bloque in iter(lambda: archivo.read(1024 * 1024), b""):
+            huella.update(bloque)
+    return huella.hexdigest()
+
+
+def exportar_paquete(ruta: str, arreglos: Dict[str, np.ndarray], encabezado: Dict[str, Any]) -> str:
+    arreglos = {nombre: np.ascontiguousarray(arreglo) for nombre, arreglo in arreglos.items()}
+    huella = hashlib.sha256()
+    for nombre in sorted(arreglos):
+        huella.update(nombre.encode("utf-8"))
+        huella.update(arreglos[nombre].tobytes())
+    version = huella.hexdigest()[:16]
+
+    #-----  Los desplazamientos dependen del tamaño del encabezado: se calculan con un tamaño reservado
+    encabezado = {
+        **encabezado,
+        "version_formato": VERSION_FORMATO,
+        "version": version,
+        "fecha": datetime.datetime.now().isoformat(timespec="seconds"),
+        "arreglos": {},
+    }
+    reservado = 4096
+    while True:
+        posicion = _alinear(len(MAGICO) + 8 + reservado)
+        for nombre, arreglo in arreglos.items():
+            encabezado["arreglos"][nombre] = {
+                "dtype": arreglo.dtype.str, "shape": list(arreglo.shape), "offset": posicion,
+            }
+            posicion = _alinear(posicion + arreglo.nbytes)
+        contenido = json.dumps(encabezado, ensure_ascii=False).encode("utf-8")
+        if len(contenido) <= reservado:
+            break
+        reservado = _alinear(len(contenido))
+
+    os.makedirs(os.path.dirname(ruta) or ".", exist_ok=True)
+    #-----  Se escribe en un temporal y se reemplaza: los procesos que tienen mapeado el paquete anterior lo conservan
+    temporal = f"{ruta}.{os.getpid()}.tmp"
+    with open(temporal, "wb") as archivo:
+        archivo.write(MAGICO)
+        archivo.write(np.uint64(len(contenido)).tobytes())
+        archivo.write(contenido)
+        for nombre, arreglo in arreglos.items():
+            archivo.seek(encabezado["arreglos"][nombre]["offset"])
+            archivo.write(arreglo.tobytes())
+    os.replace(temporal, ruta)
+    return version
+
+
+class ClasificadorPaquete:
+
+    def __init__(self, ruta: str):
+        with open(ruta, "rb") as archivo:
+            if archivo.read(len(MAGICO)) != MAGICO:
+                raise ValueError(f"{ruta} no es un paquete de inferencia")
+            longitud = int(np.frombuffer(archivo.read(8), dtype=np.uint64)[0])
+            self.encabezado = json.loads(archivo.read(longitud).decode("utf-8"))
+        if self.encabezado["version_formato"] != VERSION_FORMATO:
+            raise ValueError(
+                f"Versión de formato {self.encabezado['version_formato']} no soportada (se espera {VERSION_FORMATO})"
+            )
+
+        self.arreglos = {
+            nombre: np.memmap(ruta, dtype=np.dtype(info["dtype"]), mode="r",
+                              offset=info["offset"], shape=tuple(info["shape"]))
+            for nombre, info in self.encabezado["arreglos"].items()
+        }
+        self.version = self.encabezado["version"]
+        self.etiquetas = self.encabezado["etiquetas"]
+        self.modo = self.encabezado["modo"]
+        self.patron = re.compile(self.encabezado["token_pattern"])
+        self.minusculas = self.encabezado["lowercase"]
+        self.terminos = self.arreglos["terminos"]
+        self.ancho = self.terminos.dtype.itemsize
+
+        preprocesamiento = self.encabezado.get("preprocesamiento")
+        self.preprocesa = preprocesamiento is not None
+        if self.preprocesa:
+            self.contracciones = tuple(preprocesamiento["contracciones"])
+            #-----  La tabla se consulta token a token: un diccionario es más rápido que searchsorted por token
+            self.lemas = {
+                origen.decode("utf-8"): destino.decode("utf-8") or None
+                for origen, destino in zip(self.arreglos["lemas_origen"].tolist(), self.arreglos["lemas_destino"].tolist())
+            }
+
+    def preprocesar(self, texto: str) -> str:
+        #-----  Un token fuera de la tabla se conserva: ni él ni su lema están en el vocabulario
+        lemas = (self.lemas.get(token, token) for token in tokenizar_regex(limpiar_texto(texto), self.contracciones))
+        return " ".join(lema for lema in lemas if lema is not None)
+
+    def vectorizar(self, textos: List[str]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        documentos, terminos = [], []
+        for i, texto in enumerate(textos):
+            encontrados = self.patron.findall(texto.lower() if self.minusculas else texto)
+            documentos.extend([i] * len(encontrados))
+            terminos.extend(termino.encode("utf-8") for termino in encontrados)
+        if not terminos:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64), np.zeros(0)
+
+        #-----  Un término más largo que el ancho del vocabulario no puede estar en él (y se truncaría al convertirlo)
+        largos = np.fromiter((len(termino) for termino in terminos), dtype=np.int64, count=len(terminos))
+        claves = np.array(terminos, dtype=self.terminos.dtype)
+        posiciones = np.minimum(np.searchsorted(self.terminos, claves), len(self.terminos) - 1)
+        validos = (self.terminos[posiciones] == claves) & (largos <= self.ancho)
+
+        n_features = len(self.arreglos["idf"])
+        filas = np.asarray(documentos, dtype=np.int64)[validos]
+        columnas = self.arreglos["columnas"][posiciones[validos]].astype(np.int64)
+        claves_unicas, conteos = np.unique(filas * n_features + columnas, return_counts=True)
+        filas, columnas = claves_unicas // n_features, claves_unicas % n_features
+
+        valores = conteos.astype(np.float64)
+        if self.encabezado["sublinear_tf"]:
+            valores = np.log(valores) + 1
+        valores = valores * self.arreglos["idf"][columnas]
+        if self.encabezado["norm"] == "l2":
+            normas = np.sqrt(np.bincount(filas, weights=valores ** 2, minlength=len(textos)))
+            valores = valores / normas[filas]
+        elif self.encabezado["norm"] == "l1":
+            normas = np.bincount(filas, weights=np.abs(valores), minlength=len(textos))
+            valores = valores / normas[filas]
+        return filas, columnas, valores
+
+    def decision(self, textos: List[str]) -> np.ndarray:
+        filas, columnas, valores = self.vectorizar(textos)
+        coeficientes = self.arreglos["coeficientes"]
+        puntajes = np.zeros((len(textos), coeficientes.shape[1]))
+        np.add.at(puntajes, filas, valores[:, None] * coeficientes[columnas])
+        return puntajes + self.arreglos["interceptos"]
+
+    def predecir_probabilidades(self, textos: List[str]) -> np.ndarray:
+        puntajes = self.decision(textos)
+        if self.modo == "multinomial":
+            puntajes = np.exp(puntajes - puntajes.max(axis=1, keepdims=True))
+            return puntajes / puntajes.sum(axis=1, keepdims=True)
+        probabilidades = 1 / (1 + np.exp(-puntajes))
+        if self.modo == "binario":
+            return np.column_stack([1 - probabilidades[:, 0], probabilidades[:, 0]])
+        #-----  ovr: cada clase es un clasificador binario y las probabilidades se normalizan (como scikit-learn)
+        suma = probabilidades.sum(axis=1, keepdims=True)
+        ceros = suma[:, 0] == 0
+        probabilidades[ceros] = 1
+        suma[ceros] = probabilidades.shape[1]
+        return probabilidades / suma
+
+    def predecir(self, textos: List[str]) -> List[str]:
+        return [self.etiquetas[i] for i in np.argmax(self.predecir_probabilidades(textos), axis=1)]
@@ -0,0 +1,109 @@
+"""
+    particionado.py
+    Descripción:
+        Divide el archivo de entrada en particiones (shards) para que las etapas de texto y de features
+        se ejecuten por partición, en paralelo y con reintentos independientes, y vuelve a unir las
+        salidas de features en el archivo que consume el entrenamiento.
+
+        Cada fila se asigna a una partición con el hash de su texto limpio y normalizado (la misma clave
+        de la deduplicación exacta), de modo que los tuits repetidos caen siempre en la misma partición.
+        Como el Deduplicador conserva los grupos entre los bloques de una partición, la deduplicación
+        exacta por partición encuentra los mismos grupos que sobre el archivo completo. Los duplicados
+        cercanos (DEDUP_CERCANOS) solo se agrupan dentro de cada partición: dos textos casi iguales
+        pueden tener claves distintas y caer en particiones distintas.
+
+        Cada tarea de texto abre su propio pool de procesos. workers_por_particion reparte el presupuesto
+        de la máquina (PRESUPUESTO_WORKERS) entre las particiones que corren a la vez (CONCURRENCIA_SHARDS,
+        el máximo de tareas simultáneas del task runner) para no lanzar más procesos que núcleos.
+
+    Funciones:
+        nombre_particion(file_name, indice, num_shards):
+            Nombre lógico de una partición, usado como file_name por las etapas siguientes.
+        ruta_particion(nombre):
+            Ruta del archivo de entrada de una partición.
+        particionar_archivo(entrada, rutas, chunksize):
+            Lee el CSV (o el ZIP dividido, en streaming) por bloques y escribe cada fila en el archivo de su partición.
+        unir_particiones(rutas, salida, chunksize):
+            Concatena las salidas de las particiones; desplaza id_grupo para que siga siendo único.
+        nucleos_disponibles():
+            Núcleos que puede usar este proceso (respeta la afinidad, por ejemplo el cpuset de un contenedor).
+        workers_por_particion(concurrencia, presupuesto, maximo):
+            Procesos del pool de cada tarea de texto para que las tareas simultáneas no superen el presupuesto.
+    Autor: Ivan Camilo Rosales
+    Fecha: 2025-05-21
+"""
+
+from librerias import os, logging, np, pd, List, Optional, ExitStack
+from config import DATA_PATH_PROCESSED, COLUMNAS_ENTRADA, CHUNK_SIZE, PRESUPUESTO_WORKERS, NUM_WORKERS
+from almacenamiento import nombre_archivo, leer_datos_por_bloques, EscritorIncremental
+from deduplicacion import Deduplicador
+from limpiezaTexto import PATRON_LIMPIEZA
+from lectorZip import abrir_csv
+
+
+logger = logging.getLogger(__name__)
+
+
+def nombre_particion(file_name: str, indice: int, num_shards: int) -> str:
+    return f"{file_name}_shard{indice:02d}de{num_shards:02d}"
+
+
+def ruta_particion(nombre: str) -> str:
+    return os.path.join(DATA_PATH_PROCESSED, "shards", nombre_archivo(f"input_{nombre}"))
+
+
+def nucleos_disponibles() -> int:
+    #-----  os.cpu_count() cuenta todos los núcleos de la máquina aunque el contenedor tenga menos asignados
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def workers_por_particion(
+    concurrencia: int, presupuesto: Optional[int] = PRESUPUESTO_WORKERS, maximo: Optional[int] = NUM_WORKERS
+) -> int:
+    #-----  Hasta `concurrencia` tareas abren su pool a la vez: entre todas no superan el presupuesto
+    presupuesto = presupuesto or nucleos_disponibles()
+    n_workers = max(1, presupuesto // max(1, concurrencia))
+    return min(n_workers, maximo) if maximo else n_workers
+
+
+def particionar_archivo(entrada: str, rutas: List[str], chunksize: int = CHUNK_SIZE) -> List[int]:
+    os.makedirs(os.path.dirname(rutas[0]), exist_ok=True)
+    normalizar = Deduplicador(cercanos=False).normalizar
+    #-----  Las particiones se publican juntas y solo si la entrada se leyó completa (CRC del ZIP válido)
+    with ExitStack() as pila, abrir_csv(entrada) as fuente:
+        escritores = [pila.enter_context(EscritorIncremental(ruta)) for ruta in rutas]
+        for chunk in pd.read_csv(fuente, usecols=COLUMNAS_ENTRADA, chunksize=chunksize):
+            chunk = chunk[chunk['inbound'].astype(bool)]
+            clave = normalizar(chunk['text'].astype(str).str.replace(PATRON_LIMPIEZA, '', regex=True))
+            particion = pd.util.hash_pandas_object(clave, index=False).values % np.uint64(len(rutas))
+            for indice, escritor in enumerate(escritores):
+                seleccion = chunk[particion == indice]
+                if len(seleccion):
+                    escritor.escribir(seleccion)
+        for escritor in escritores:
+            escritor.cerrar(columnas=COLUMNAS_ENTRADA)
+    filas = [escritor.filas for escritor in escritores]
+    logger.info(f"Entrada dividida en {len(rutas)} particiones - filas por partición: {filas}")
+    return filas
+
+
+def unir_particiones(rutas: List[str], salida: str, chunksize: int = CHUNK_SIZE) -> int:
+    columnas = None
+    desplazamiento = 0
+    with EscritorIncremental(salida) as escritor:
+        for ruta in rutas:
+            #-----  id_grupo es la posición de la primera fila del grupo dentro de su partición:
+            #-----  se desplaza con el mayor id de las particiones anteriores para no mezclar grupos
+            siguiente = desplazamiento
+            for bloque in leer_datos_por_bloques(ruta, chunksize=chunksize):
+                columnas = list(bloque.columns)
+                if "id_grupo" in bloque.columns and len(bloque):
+                    bloque["id_grupo"] = bloque["id_grupo"] + desplazamiento
+                    siguiente = max(siguiente, int(bloque["id_grupo"].max()) + 1)
+                escritor.escribir(bloque)
+            desplazamiento = siguiente
+        escritor.cerrar(columnas=columnas)
+    logger.info(f"{len(rutas)} particiones unidas ({escritor.filas} filas) \n\t {salida}")
+    return escritor.filas
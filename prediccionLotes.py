@@ -0,0 +1,172 @@
+"""
+    prediccionLotes.py
+    Descripción:
+        Clasificación por lotes de archivos grandes de tuits con los artefactos del entrenamiento
+        (paquete_modelo.bin, o modelo.pkl con el vectorizador de manifiesto_modelo.json). El archivo de entrada (CSV o Parquet)
+        se lee por bloques; cada bloque se clasifica en un pool de procesos donde cada proceso carga los
+        artefactos una sola vez (ClasificadorTuits, la misma limpieza del servicio de inferencia) y el
+        resultado se escribe bloque a bloque en un archivo Parquet con la etiqueta y la probabilidad de
+        cada clase. Como máximo MAX_LOTES_EN_VUELO bloques están leídos y pendientes de escribir, así la
+        memoria queda acotada sin importar el tamaño del archivo, y el orden de salida es el de la entrada.
+
+    Clases:
+        PrediccionLotes:
+            clasificar_bloque(bloque):
+                Agrega a un bloque la etiqueta y las probabilidades (en el proceso actual).
+            run(entrada, salida, conservar):
+                Clasifica el archivo completo y retorna el resumen (filas, segundos y tuits por segundo).
+
+    Ejemplo:
+        python prediccionLotes.py data/input/nuevos.csv --salida data/output/predicciones.parquet
+        python prediccionLotes.py data/input/twcs.csv --solo-entrantes --conservar tweet_id author_id
+    Autor: Ivan Camilo Rosales
+    Fecha: 2025-05-21
+"""
+
+from librerias import (
+    os, time, logging, argparse, deque, np, pd,
+    ProcessPoolExecutor, Dict, List, Any, Optional, setup_logging, setup_warnings
+)
+from config import *
+from almacenamiento import leer_datos_por_bloques, EscritorIncremental
+from servicioInferencia import ClasificadorTuits
+
+
+#-----  Clasificador propio de cada proceso del pool: los artefactos se cargan una sola vez por proceso
+_clasificador_worker = None
+
+
+def _inicializar_worker(modelos_path: str, idioma: str):
+    global _clasificador_worker
+    _clasificador_worker = ClasificadorTuits(modelos_path=modelos_path, idioma=idioma)
+
+
+def _probabilidades_bloque(textos: List[str]) -> np.ndarray:
+    return _clasificador_worker.predecir_probabilidades(textos)
+
+
+class PrediccionLotes:
+
+    def __init__(
+        self, modelos_path: str = MODELOS_PATH, idioma: str = IDIOMA, columna_texto: str = "text",
+        tamano_lote: int = TAMANO_LOTE_PREDICCION, n_workers: Optional[int] = NUM_WORKERS_PREDICCION,
+        max_en_vuelo: Optional[int] = MAX_LOTES_EN_VUELO, solo_entrantes: bool = False
+    ):
+        self.modelos_path = modelos_path
+        self.idioma = idioma
+        self.columna_texto = columna_texto
+        self.tamano_lote = tamano_lote
+        self.n_workers = n_workers or os.cpu_count() or 1
+        self.max_en_vuelo = max_en_vuelo or 2 * self.n_workers
+        self.solo_entrantes = solo_entrantes
+        self.logger = logging.getLogger(__name__)
+        #-----  Las clases salen del modelo: se leen en el proceso principal para nombrar las columnas
+        self.clasificador = ClasificadorTuits(modelos_path=modelos_path, idioma=idioma)
+        self.clases = self.clasificador.clases
+
+    def _leer_bloques(self, entrada: str, conservar: List[str]):
+        columnas = list(dict.fromkeys([*conservar, self.columna_texto] + (["inbound"] if self.solo_entrantes else [])))
+        for bloque in leer_datos_por_bloques(entrada, columnas=columnas, chunksize=self.tamano_lote):
+            if self.solo_entrantes:
+                bloque = bloque[bloque["inbound"].astype(bool)]
+            bloque = bloque[list(dict.fromkeys([*conservar, self.columna_texto]))].reset_index(drop=True)
+            bloque[self.columna_texto] = bloque[self.columna_texto].fillna("").astype(str)
+            yield bloque
+
+    def _agregar_predicciones(self, bloque: pd.DataFrame, probabilidades: np.ndarray) -> pd.DataFrame:
+        bloque["etiqueta"] = np.asarray(self.clases, dtype=object)[np.argmax(probabilidades, axis=1)]
+        for i, clase in enumerate(self.clases):
+            bloque[f"prob_{clase}"] = probabilidades[:, i].astype(np.float32)
+        return bloque
+
+    def clasificar_bloque(self, bloque: pd.DataFrame) -> pd.DataFrame:
+        probabilidades = self.clasificador.predecir_probabilidades(bloque[self.columna_texto].tolist())
+        return self._agregar_predicciones(bloque, probabilidades)
+
+    def _reportar(self, escritor: EscritorIncremental, num_lote: int, inicio: float) -> None:
+        segundos = time.perf_counter() - inicio
+        self.logger.info(
+            f"Lote {num_lote} escrito - {escritor.filas} filas clasificadas en {segundos:.1f} s "
+            f"({escritor.filas / segundos if segundos > 0 else 0:.0f} tuits/s)"
+        )
+
+    def run(self, entrada: str, salida: str, conservar: Optional[List[str]] = None) -> Dict[str, Any]:
+        conservar = conservar or []
+        os.makedirs(os.path.dirname(salida) or ".", exist_ok=True)
+        #-----  La salida solo se publica si todos los bloques se clasificaron sin errores
+        with EscritorIncremental(salida) as escritor:
+            bloques = self._leer_bloques(entrada, conservar)
+            inicio = time.perf_counter()
+            num_lote = 0
+            self.logger.info(
+                f"Predicción por lotes de {entrada}: lotes de {self.tamano_lote} filas, {self.n_workers} procesos, "
+                f"hasta {self.max_en_vuelo} lotes en vuelo"
+            )
+
+            if self.n_workers <= 1:
+                for bloque in bloques:
+                    escritor.escribir(self.clasificar_bloque(bloque))
+                    self._reportar(escritor, num_lote, inicio)
+                    num_lote += 1
+            else:
+                with ProcessPoolExecutor(
+                    max_workers=self.n_workers,
+                    initializer=_inicializar_worker,
+                    initargs=(self.modelos_path, self.idioma),
+                ) as pool:
+                    #-----  Cola FIFO de lotes enviados: al llenarse se espera el más antiguo, que se escribe
+                    #-----  antes de leer el siguiente bloque (memoria acotada y salida en el orden de entrada)
+                    en_vuelo = deque()
+                    for bloque in bloques:
+                        en_vuelo.append((bloque, pool.submit(_probabilidades_bloque, bloque[self.columna_texto].tolist())))
+                        while len(en_vuelo) >= self.max_en_vuelo:
+                            anterior, futuro = en_vuelo.popleft()
+                            escritor.escribir(self._agregar_predicciones(anterior, futuro.result()))
+                            self._reportar(escritor, num_lote, inicio)
+                            num_lote += 1
+                    while en_vuelo:
+                        anterior, futuro = en_vuelo.popleft()
+                        escritor.escribir(self._agregar_predicciones(anterior, futuro.result()))
+                        self._reportar(escritor, num_lote, inicio)
+                        num_lote += 1
+
+            escritor.cerrar(columnas=[*conservar, self.columna_texto, "etiqueta"] + [f"prob_{c}" for c in self.clases])
+        segundos = time.perf_counter() - inicio
+        resumen = {
+            "entrada": entrada,
+            "salida": salida,
+            "filas": escritor.filas,
+            "lotes": num_lote,
+            "segundos": round(segundos, 3),
+            "tuits_por_segundo": round(escritor.filas / segundos, 1) if segundos > 0 else None,
+        }
+        self.logger.info(f"Predicción por lotes completada: {resumen}")
+        return resumen
+
+
+if __name__ == "__main__":
+    logger = setup_logging()
+    setup_warnings()
+
+    parser = argparse.ArgumentParser(description="Clasificación por lotes de un archivo de tuits")
+    parser.add_argument("entrada", help="Archivo CSV o Parquet con los tuits")
+    parser.add_argument("--salida", default=None, help="Archivo Parquet de salida")
+    parser.add_argument("--modelos", default=MODELOS_PATH, help="Directorio con los artefactos del modelo")
+    parser.add_argument("--columna-texto", default="text")
+    parser.add_argument("--conservar", nargs="*", default=[], help="Columnas de la entrada que se copian a la salida")
+    parser.add_argument("--solo-entrantes", action="store_true", help="Clasifica solo los tuits con inbound verdadero")
+    parser.add_argument("--tamano-lote", type=int, default=TAMANO_LOTE_PREDICCION)
+    parser.add_argument("--workers", type=int, default=NUM_WORKERS_PREDICCION)
+    parser.add_argument("--max-en-vuelo", type=int, default=MAX_LOTES_EN_VUELO)
+    args = parser.parse_args()
+
+    base = os.path.splitext(os.path.basename(args.entrada))[0]
+    salida = args.salida or os.path.join(DATA_PATH_PROCESSED, f"predicciones_{base}.parquet")
+    PrediccionLotes(
+        modelos_path=args.modelos,
+        columna_texto=args.columna_texto,
+        tamano_lote=args.tamano_lote,
+        n_workers=args.workers,
+        max_en_vuelo=args.max_en_vuelo,
+        solo_entrantes=args.solo_entrantes,
+    ).run(args.entrada, salida, conservar=args.conservar)
@@ -0,0 +1,268 @@
+"""
+    seguimientoMlflow.py
+    Descripción:
+        Registro de parámetros, métricas, tags, artefactos y modelos en MLflow sin bloquear el
+        entrenamiento. Cada llamada solo encola el valor (con su marca de tiempo) y un hilo en segundo
+        plano lo envía: parámetros, métricas y tags se agrupan en una sola llamada a log_batch por
+        ronda (respetando los límites de MLflow por lote) y los artefactos se suben después.
+        Un envío que falla se reintenta con espera exponencial; si se agotan los reintentos se deja
+        una advertencia en el log y el entrenamiento sigue. Los rechazos del servidor (errores 4xx como
+        INVALID_PARAMETER_VALUE) no se reintentan: el lote se vuelve a enviar separando parámetros y tags
+        de las métricas y, si sigue rechazado, valor por valor, para que un valor inválido no descarte el
+        resto. Al cerrar la fachada (fin de la ejecución) se espera a que la cola se vacíe.
+
+        Los modelos se registran en segundo plano con mlflow.sklearn.log_model sobre el run_id de la
+        fachada (no depende de la ejecución activa del hilo), así MLflow crea el LoggedModel y lo enlaza
+        con la ejecución y sus métricas. Se encolan después de las métricas: el modelo no se debe
+        modificar una vez encolado.
+
+    Funciones:
+        seguimiento_sincrono():
+            Fachada sin hilo sobre la ejecución activa, para cuando no hay una fachada asignada.
+
+    Clases:
+        SeguimientoMlflow:
+            log_param(s)(...), log_metric(s)(...), set_tag(s)(...):
+                Encolan valores para el siguiente log_batch.
+            log_artifact(ruta, artifact_path):
+                Encola la subida de un archivo.
+            log_model(model, artifact_path, signature, input_example):
+                Encola el registro del modelo (LoggedModel) en la ejecución.
+            cerrar(timeout):
+                Espera a que se envíe lo pendiente y detiene el hilo.
+    Autor: Ivan Camilo Rosales
+    Fecha: 2025-05-21
+"""
+
+from librerias import os, time, queue, logging, threading, Dict, List, Any, Optional
+from config import SEGUIMIENTO_ASINCRONO, INTERVALO_SEGUIMIENTO_S, REINTENTOS_SEGUIMIENTO, ESPERA_DRENADO_S
+
+
+#-----  Límites de MLflow para una llamada a log_batch
+MAX_METRICAS_LOTE = 1000
+MAX_PARAMETROS_LOTE = 100
+MAX_TAGS_LOTE = 100
+ESPERA_REINTENTO_S = 1.0
+#-----  Resultado de un envío: rechazado es un error del cliente (4xx) que no se corrige reintentando
+ENVIADO, RECHAZADO, FALLIDO = "enviado", "rechazado", "fallido"
+_FIN = object()
+
+
+def _es_rechazo(error: Exception) -> bool:
+    #-----  MlflowException traduce su error_code (INVALID_PARAMETER_VALUE, RESOURCE_ALREADY_EXISTS, ...) a un
+    #-----  estado HTTP; 429 (demasiadas solicitudes) sí se reintenta. Otros errores (red, 5xx) son transitorios
+    estado = getattr(error, "get_http_status_code", None)
+    if not callable(estado):
+        return False
+    estado = estado()
+    return 400 <= estado < 500 and estado != 429
+
+
+class SeguimientoMlflow:
+
+    def __init__(
+        self, run_id: str, asincrono: bool = SEGUIMIENTO_ASINCRONO,
+        intervalo: float = INTERVALO_SEGUIMIENTO_S, reintentos: int = REINTENTOS_SEGUIMIENTO,
+        espera_drenado: float = ESPERA_DRENADO_S
+    ):
+        from librerias import MlflowClient
+
+        self.run_id = run_id
+        self.asincrono = asincrono
+        self.intervalo = intervalo
+        self.reintentos = reintentos
+        self.espera_drenado = espera_drenado
+        self.cliente = MlflowClient()
+        self.enviados = 0
+        self.fallidos = 0
+        self.logger = logging.getLogger(__name__)
+        self._cola = queue.Queue()
+        self._hilo = None
+        if asincrono:
+            self._hilo = threading.Thread(target=self._trabajar, name="seguimiento-mlflow", daemon=True)
+            self._hilo.start()
+
+    def __enter__(self) -> "SeguimientoMlflow":
+        return self
+
+    def __exit__(self, *excepcion) -> None:
+        self.cerrar()
+
+    #-------------------------------------------------------------------------------
+    #-----  API: mismos nombres que las funciones de mlflow que reemplaza
+    def _encolar(self, elementos: List[tuple]) -> None:
+        #-----  En modo síncrono los valores de una misma llamada salen juntos en un log_batch
+        if self._hilo is None:
+            self._enviar(elementos)
+        else:
+            for elemento in elementos:
+                self._cola.put(elemento)
+
+    def log_param(self, clave: str, valor: Any) -> None:
+        self.log_params({clave: valor})
+
+    def log_params(self, parametros: Dict[str, Any]) -> None:
+        self._encolar([("parametro", clave, valor) for clave, valor in parametros.items()])
+
+    def log_metric(self, clave: str, valor: float, step: Optional[int] = None) -> None:
+        self.log_metrics({clave: valor}, step=step)
+
+    def log_metrics(self, metricas: Dict[str, float], step: Optional[int] = None) -> None:
+        #-----  La marca de tiempo es la del momento en que se midió, no la del envío
+        marca = int(time.time() * 1000)
+        self._encolar([("metrica", clave, float(valor), marca, step or 0) for clave, valor in metricas.items()])
+
+    def set_tag(self, clave: str, valor: Any) -> None:
+        self.set_tags({clave: valor})
+
+    def set_tags(self, tags: Dict[str, Any]) -> None:
+        self._encolar([("tag", clave, valor) for clave, valor in tags.items()])
+
+    def log_artifact(self, ruta: str, artifact_path: Optional[str] = None) -> None:
+        self._encolar([("artefacto", ruta, artifact_path)])
+
+    def log_model(self, model: object, artifact_path: str, signature=None, input_example=None) -> None:
+        self._encolar([("modelo", model, artifact_path, signature, input_example)])
+
+    #-------------------------------------------------------------------------------
+    #-----  Hilo en segundo plano
+    def _trabajar(self) -> None:
+        terminar = False
+        while not terminar:
+            elementos = []
+            try:
+                elementos.append(self._cola.get(timeout=self.intervalo))
+            except queue.Empty:
+                continue
+            #-----  Todo lo que llegó mientras tanto se envía en la misma ronda
+            while True:
+                try:
+                    elementos.append(self._cola.get_nowait())
+                except queue.Empty:
+                    break
+            if _FIN in elementos:
+                terminar = True
+                elementos = [elemento for elemento in elementos if elemento is not _FIN]
+            self._enviar(elementos)
+
+    def _con_reintentos(self, descripcion: str, funcion, *argumentos) -> str:
+        for intento in range(self.reintentos + 1):
+            try:
+                funcion(*argumentos)
+                return ENVIADO
+            except Exception as error:
+                if _es_rechazo(error):
+                    self.logger.warning(f"MLflow: el servidor rechazó {descripcion}: {error}")
+                    return RECHAZADO
+                if intento == self.reintentos:
+                    self.logger.warning(f"MLflow: no se pudo registrar {descripcion} tras {intento + 1} intentos: {error}")
+                    return FALLIDO
+                espera = ESPERA_REINTENTO_S * 2 ** intento
+                self.logger.info(f"MLflow: falló al registrar {descripcion} ({error}), reintento en {espera:.1f} s")
+                time.sleep(espera)
+
+    def _enviar(self, elementos: List[tuple]) -> None:
+        from librerias import Metric, Param, RunTag
+
+        #-----  Si un valor se repite en la ronda, queda el último (un parámetro solo se puede registrar una vez)
+        parametros, tags, metricas, artefactos, modelos = {}, {}, [], [], []
+        for tipo, *valores in elementos:
+            if tipo == "parametro":
+                parametros[valores[0]] = Param(valores[0], str(valores[1]))
+            elif tipo == "tag":
+                tags[valores[0]] = RunTag(valores[0], str(valores[1]))
+            elif tipo == "metrica":
+                metricas.append(Metric(*valores))
+            elif tipo == "modelo":
+                modelos.append(valores)
+            else:
+                artefactos.append(valores)
+
+        parametros, tags = list(parametros.values()), list(tags.values())
+        while parametros or tags or metricas:
+            lote = {
+                "params": parametros[:MAX_PARAMETROS_LOTE],
+                "tags": tags[:MAX_TAGS_LOTE],
+                "metrics": metricas[:MAX_METRICAS_LOTE - min(len(parametros), MAX_PARAMETROS_LOTE) - min(len(tags), MAX_TAGS_LOTE)],
+            }
+            parametros = parametros[len(lote["params"]):]
+            tags = tags[len(lote["tags"]):]
+            metricas = metricas[len(lote["metrics"]):]
+            self._enviar_lote(lote)
+
+        for ruta, artifact_path in artefactos:
+            if self._con_reintentos(f"el artefacto {ruta}", self._log_artefacto, ruta, artifact_path) == ENVIADO:
+                self.enviados += 1
+            else:
+                self.fallidos += 1
+
+        #-----  Después de las métricas de la ronda, para que MLflow las enlace con el LoggedModel
+        for modelo in modelos:
+            if self._con_reintentos(f"el modelo {modelo[1]}", self._log_modelo, *modelo) == ENVIADO:
+                self.enviados += 1
+            else:
+                self.fallidos += 1
+
+    def _enviar_lote(self, lote: Dict[str, list]) -> None:
+        cantidad = sum(len(valores) for valores in lote.values())
+        resultado = self._con_reintentos(f"un lote de {cantidad} valores", self._log_batch, lote)
+        if resultado == RECHAZADO and cantidad > 1:
+            #-----  Un valor inválido hace que MLflow rechace el lote completo: se aísla dividiéndolo
+            for parte in self._dividir_lote(lote):
+                self._enviar_lote(parte)
+        elif resultado == ENVIADO:
+            self.enviados += cantidad
+        else:
+            self.fallidos += cantidad
+
+    def _dividir_lote(self, lote: Dict[str, list]) -> List[Dict[str, list]]:
+        #-----  Primero parámetros y tags por un lado y métricas por otro; después, valor por valor
+        if lote["metrics"] and (lote["params"] or lote["tags"]):
+            return [
+                {"params": lote["params"], "tags": lote["tags"], "metrics": []},
+                {"params": [], "tags": [], "metrics": lote["metrics"]},
+            ]
+        return [
+            {**{tipo: [] for tipo in lote}, tipo: [valor]}
+            for tipo, valores in lote.items() for valor in valores
+        ]
+
+    def _log_batch(self, lote: Dict[str, list]) -> None:
+        self.cliente.log_batch(self.run_id, metrics=lote["metrics"], params=lote["params"], tags=lote["tags"])
+
+    def _log_artefacto(self, ruta: str, artifact_path: Optional[str]) -> None:
+        if os.path.isdir(ruta):
+            self.cliente.log_artifacts(self.run_id, ruta, artifact_path)
+        else:
+            self.cliente.log_artifact(self.run_id, ruta, artifact_path)
+
+    def _log_modelo(self, model: object, artifact_path: str, signature, input_example) -> None:
+        from librerias import mlflow
+
+        mlflow.sklearn.log_model(
+            model, name=artifact_path, signature=signature, input_example=input_example, run_id=self.run_id
+        )
+
+    def cerrar(self, timeout: Optional[float] = None) -> None:
+        if self._hilo is not None:
+            inicio = time.perf_counter()
+            self._cola.put(_FIN)
+            self._hilo.join(self.espera_drenado if timeout is None else timeout)
+            if self._hilo.is_alive():
+                self.logger.warning(
+                    f"MLflow: la cola no se vació a tiempo; quedan {self._cola.qsize()} elementos sin registrar"
+                )
+            else:
+                self.logger.info(
+                    f"MLflow: cola drenada en {time.perf_counter() - inicio:.2f} s - "
+                    f"{self.enviados} valores registrados, {self.fallidos} fallidos"
+                )
+            self._hilo = None
+
+
+def seguimiento_sincrono() -> SeguimientoMlflow:
+    #-----  Igual que las funciones de mlflow: si no hay una ejecución activa se inicia una
+    from librerias import mlflow
+
+    ejecucion = mlflow.active_run() or mlflow.start_run()
+    return SeguimientoMlflow(ejecucion.info.run_id, asincrono=False)
@@ -0,0 +1,305 @@
+""" 
+    servicioInferencia.py
+    Descripción:
+        Servicio HTTP (asyncio) para clasificar tuits en línea con los artefactos generados en el 
+        entrenamiento (modelo.pkl y el vectorizador que indica manifiesto_modelo.json). Las solicitudes 
+        concurrentes se agrupan en micro-lotes, limitados por un tamaño máximo y un tiempo máximo 
+        de espera, para que la vectorización y predict_proba se ejecuten una sola vez por lote.
+
+    Clases:
+        ClasificadorTuits:
+            Carga los artefactos una sola vez (el paquete de inferencia paquete_modelo.bin si existe y
+            USAR_PAQUETE_INFERENCIA está activo y corresponde a modelo.pkl, o los pickles), aplica el mismo
+            preprocesamiento de TextProcessing (el del paquete si lo incluye, sin importar NLTK ni scikit-learn) y
+            clasifica un lote de textos (predecir_lote) o retorna su matriz de probabilidades
+            (predecir_probabilidades), que también usa la predicción por lotes de prediccionLotes.py.
+        MetricasServicio:
+            Registra la latencia de cada solicitud y el tamaño de los lotes, y calcula p50, p99 y throughput.
+        MicroBatcher:
+            Agrupa las solicitudes que llegan al mismo tiempo en un único lote.
+        ServicioInferencia:
+            Servidor HTTP con las rutas POST /predict, GET /metricas y GET /salud. /predict recibe
+            {"texto": str} o {"textos": [str, ...]} con hasta MAX_TEXTOS_SOLICITUD textos; cualquier otra
+            forma responde 400 y un cuerpo mayor que MAX_CUERPO_BYTES responde 413 sin leerlo.
+
+    Funciones:
+        leer_textos(cuerpo):
+            Valida el JSON de /predict y retorna la lista de textos (ValueError si no es válido).
+
+    Ejemplo:
+        python servicioInferencia.py
+        curl -X POST localhost:8000/predict -d '{"textos": ["my phone is broken again"]}'
+        python benchmark.py --servicio http://localhost:8000 --conexiones 32 --solicitudes 5000
+    Autor: Ivan Camilo Rosales
+    Fecha: 2025-05-21
+"""
+
+from librerias import (
+    os, json, time, asyncio, logging, np, deque,
+    ThreadPoolExecutor, Dict, List, Any, Tuple, setup_logging
+)
+from config import *
+from paqueteInferencia import ClasificadorPaquete, huella_archivo
+
+
+class ClasificadorTuits:
+    
+    def __init__(self, modelos_path: str = MODELOS_PATH, idioma: str = IDIOMA,
+                 usar_paquete: bool = USAR_PAQUETE_INFERENCIA):
+        self.text_processing = None
+        self.paquete = None
+        logger = logging.getLogger(__name__)
+        ruta_paquete = os.path.join(modelos_path, 'paquete_modelo.bin')
+        ruta_modelo = os.path.join(modelos_path, 'modelo.pkl')
+        if usar_paquete and os.path.exists(ruta_paquete):
+            #-----  Los arreglos se mapean en memoria: no se importa scikit-learn ni se deserializan pickles
+            paquete = ClasificadorPaquete(ruta_paquete)
+            #-----  Sin modelo.pkl el paquete se usa solo; si existe, el paquete debe haberse exportado de él
+            if not os.path.exists(ruta_modelo) or paquete.encabezado.get("huella_modelo") == huella_archivo(ruta_modelo):
+                self.paquete = paquete
+                self.clases = paquete.etiquetas
+                logger.info(f"Paquete de inferencia cargado (versión {paquete.version}, modelo {paquete.encabezado['modelo']})")
+            else:
+                logger.warning(
+                    f"El paquete de inferencia (versión {paquete.version}, modelo {paquete.encabezado['modelo']}) "
+                    f"no corresponde a modelo.pkl: se usan los pickles"
+                )
+        if self.paquete is None:
+            self._cargar_pickles(modelos_path, ruta_modelo)
+        #-----  Con el preprocesamiento del paquete no se importa NLTK; los paquetes anteriores no lo incluyen
+        if self.paquete is None or not self.paquete.preprocesa:
+            from textProcessing import TextProcessing
+            self.text_processing = TextProcessing(idioma=idioma)
+    
+    def _cargar_pickles(self, modelos_path: str, ruta_modelo: str):
+        from librerias import joblib
+        from modelo import ModelTrain
+        #-----  El manifiesto indica el vectorizador con el que se entrenó modelo.pkl (sin manifiesto: conteos + TF-IDF)
+        archivos = {"vectorizador": "count_vectorizer.pkl", "tfidf": "tfidf_transformer.pkl"}
+        ruta_manifiesto = os.path.join(modelos_path, 'manifiesto_modelo.json')
+        if os.path.exists(ruta_manifiesto):
+            with open(ruta_manifiesto, 'r', encoding='utf-8') as archivo:
+                archivos = json.load(archivo)["archivos"]
+        self.vectorizador = joblib.load(os.path.join(modelos_path, archivos["vectorizador"]))
+        self.tfidf_transformer = None
+        if archivos["tfidf"] is not None:
+            self.tfidf_transformer = joblib.load(os.path.join(modelos_path, archivos["tfidf"]))
+        self.model = joblib.load(ruta_modelo)
+        self.label2idx = ModelTrain(data_processed_path=modelos_path).label2idx
+        self.clases = [self.label2idx[int(clase)] for clase in self.model.classes_]
+    
+    def preprocesar(self, texto: str) -> str:
+        if self.text_processing is None:
+            return self.paquete.preprocesar(str(texto))
+        tp = self.text_processing
+        tokens = tp.filtrar_y_lematizar(tp.tokenize(tp.limpiar_texto(str(texto))))
+        return tp.clsTexto(tokens)
+    
+    def predecir_probabilidades(self, textos: List[str]) -> np.ndarray:
+        textos_cls = [self.preprocesar(texto) for texto in textos]
+        if self.paquete is not None:
+            return self.paquete.predecir_probabilidades(textos_cls)
+        X = self.vectorizador.transform(textos_cls)
+        if self.tfidf_transformer is not None:
+            X = self.tfidf_transformer.transform(X)
+        #-----  Columnas en el orden de self.clases
+        return self.model.predict_proba(X)
+    
+    def predecir_lote(self, textos: List[str]) -> List[Dict[str, Any]]:
+        probabilidades = self.predecir_probabilidades(textos)
+        resultados = []
+        for fila in probabilidades:
+            resultados.append({
+                "etiqueta": self.clases[int(np.argmax(fila))],
+                "probabilidades": {clase: round(float(p), 6) for clase, p in zip(self.clases, fila)},
+            })
+        return resultados
+
+
+def leer_textos(cuerpo: bytes, max_textos: int = MAX_TEXTOS_SOLICITUD) -> List[str]:
+    try:
+        datos = json.loads(cuerpo or b"{}")
+    except ValueError:
+        raise ValueError("El cuerpo no es un JSON válido")
+    if not isinstance(datos, dict) or ("texto" in datos) == ("textos" in datos):
+        raise ValueError("Se espera un objeto JSON con 'texto' (str) o 'textos' (lista de str)")
+    if "texto" in datos:
+        textos = [datos["texto"]]
+    else:
+        #-----  Una cadena también es iterable: sin esta validación {"textos": "hola"} se clasificaría letra a letra
+        textos = datos["textos"]
+        if not isinstance(textos, list):
+            raise ValueError("'textos' debe ser una lista de str")
+        if len(textos) > max_textos:
+            raise ValueError(f"'textos' admite como máximo {max_textos} elementos (se recibieron {len(textos)})")
+    if not all(isinstance(texto, str) for texto in textos):
+        raise ValueError("Cada texto debe ser un str")
+    return textos
+
+
+class MetricasServicio:
+    
+    def __init__(self, ventana: int = 10_000):
+        self.latencias_ms = deque(maxlen=ventana)
+        self.lotes = deque(maxlen=ventana)
+        self.total = 0
+    
+    def registrar_lote(self, latencias_ms: List[float], fin: float):
+        self.latencias_ms.extend(latencias_ms)
+        self.lotes.append((fin, len(latencias_ms)))
+        self.total += len(latencias_ms)
+    
+    def resumen(self) -> Dict[str, Any]:
+        if not self.latencias_ms:
+            return {"total": self.total}
+        latencias = np.fromiter(self.latencias_ms, dtype=float)
+        #-----  El throughput se calcula sobre la ventana de lotes más recientes
+        duracion = time.perf_counter() - self.lotes[0][0]
+        procesados = sum(n for _, n in self.lotes)
+        return {
+            "total": self.total,
+            "latencia_p50_ms": round(float(np.percentile(latencias, 50)), 3),
+            "latencia_p99_ms": round(float(np.percentile(latencias, 99)), 3),
+            "tamano_lote_medio": round(procesados / len(self.lotes), 2),
+            "tuits_por_segundo": round(procesados / duracion, 1) if duracion > 0 else None,
+        }
+
+
+class MicroBatcher:
+    
+    def __init__(self, funcion_lote, metricas: MetricasServicio,
+                 max_batch_size: int = MAX_BATCH_SIZE, max_espera_ms: float = MAX_ESPERA_BATCH_MS):
+        self.funcion_lote = funcion_lote
+        self.metricas = metricas
+        self.max_batch_size = max_batch_size
+        self.max_espera = max_espera_ms / 1000
+        self.cola = asyncio.Queue()
+        #-----  Un solo hilo para el cómputo: el event loop sigue aceptando solicitudes mientras
+        #-----  se procesa un lote, y esas solicitudes forman el lote siguiente
+        self.executor = ThreadPoolExecutor(max_workers=1)
+        self.logger = logging.getLogger(__name__)
+    
+    async def predecir(self, texto: str) -> Dict[str, Any]:
+        futuro = asyncio.get_running_loop().create_future()
+        await self.cola.put((texto, futuro, time.perf_counter()))
+        return await futuro
+    
+    async def _armar_lote(self) -> List[Tuple[str, asyncio.Future, float]]:
+        loop = asyncio.get_running_loop()
+        lote = [await self.cola.get()]
+        limite = loop.time() + self.max_espera
+        while len(lote) < self.max_batch_size:
+            if not self.cola.empty():
+                lote.append(self.cola.get_nowait())
+                continue
+            restante = limite - loop.time()
+            if restante <= 0:
+                break
+            try:
+                lote.append(await asyncio.wait_for(self.cola.get(), restante))
+            except asyncio.TimeoutError:
+                break
+        return lote
+    
+    async def ejecutar(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            lote = await self._armar_lote()
+            try:
+                resultados = await loop.run_in_executor(
+                    self.executor, self.funcion_lote, [texto for texto, _, _ in lote]
+                )
+            except Exception as e:
+                self.logger.error(f"Error al clasificar un lote de {len(lote)} textos: {e}", exc_info=True)
+                for _, futuro, _ in lote:
+                    if not futuro.done():
+                        futuro.set_exception(e)
+                continue
+            
+            fin = time.perf_counter()
+            for (_, futuro, inicio), resultado in zip(lote, resultados):
+                if not futuro.done():
+                    futuro.set_result(resultado)
+            self.metricas.registrar_lote([(fin - inicio) * 1000 for _, _, inicio in lote], fin)
+
+
+class ServicioInferencia:
+    
+    def __init__(self, host: str = SERVICIO_HOST, puerto: int = SERVICIO_PUERTO):
+        self.host = host
+        self.puerto = puerto
+        self.logger = setup_logging()
+        self.clasificador = ClasificadorTuits()
+        self.metricas = MetricasServicio()
+        self.batcher = None
+    
+    async def _enrutar(self, metodo: str, ruta: str, cuerpo: bytes) -> Tuple[str, Any]:
+        if metodo == "GET" and ruta == "/salud":
+            return "200 OK", {"estado": "ok"}
+        if metodo == "GET" and ruta == "/metricas":
+            return "200 OK", self.metricas.resumen()
+        if metodo == "POST" and ruta == "/predict":
+            try:
+                textos = leer_textos(cuerpo)
+            except ValueError as e:
+                return "400 Bad Request", {"error": str(e)}
+            resultados = await asyncio.gather(*(self.batcher.predecir(texto) for texto in textos))
+            return "200 OK", {"resultados": resultados}
+        return "404 Not Found", {"error": f"Ruta no encontrada: {metodo} {ruta}"}
+    
+    async def _atender(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            #-----  Conexiones persistentes (keep-alive): se atienden solicitudes hasta que el cliente cierre
+            while True:
+                linea = await reader.readline()
+                if not linea:
+                    break
+                metodo, ruta, _ = linea.decode("latin-1").split(" ", 2)
+                headers = {}
+                while True:
+                    header = await reader.readline()
+                    if header in (b"\r\n", b"\n", b""):
+                        break
+                    nombre, valor = header.decode("latin-1").split(":", 1)
+                    headers[nombre.strip().lower()] = valor.strip()
+                #-----  Un cuerpo demasiado grande no se lee: se responde 413 y se cierra la conexión
+                largo = int(headers.get("content-length", 0))
+                if largo < 0 or largo > MAX_CUERPO_BYTES:
+                    estado, respuesta = "413 Payload Too Large", {"error": f"El cuerpo supera {MAX_CUERPO_BYTES} bytes"}
+                    headers["connection"] = "close"
+                else:
+                    cuerpo = await reader.readexactly(largo)
+                    try:
+                        estado, respuesta = await self._enrutar(metodo, ruta, cuerpo)
+                    except Exception as e:
+                        estado, respuesta = "500 Internal Server Error", {"error": str(e)}
+                datos = json.dumps(respuesta, ensure_ascii=False).encode("utf-8")
+                writer.write(
+                    f"HTTP/1.1 {estado}\r\nContent-Type: application/json\r\n"
+                    f"Content-Length: {len(datos)}\r\n\r\n".encode("latin-1") + datos
+                )
+                await writer.drain()
+                if headers.get("connection", "").lower() == "close":
+                    break
+        except (asyncio.IncompleteReadError, ConnectionResetError, ValueError):
+            pass
+        finally:
+            writer.close()
+    
+    async def _reportar_metricas(self):
+        while True:
+            await asyncio.sleep(INTERVALO_REPORTE_SERVICIO_S)
+            self.logger.info(f"Métricas del servicio: {self.metricas.resumen()}")
+    
+    async def iniciar(self):
+        self.batcher = MicroBatcher(self.clasificador.predecir_lote, self.metricas)
+        servidor = await asyncio.start_server(self._atender, self.host, self.puerto)
+        self.logger.info(f"Servicio de inferencia escuchando en http://{self.host}:{self.puerto}")
+        async with servidor:
+            await asyncio.gather(
+                servidor.serve_forever(), self.batcher.ejecutar(), self._reportar_metricas()
+            )
+
+
+if __name__ == "__main__":
+    asyncio.run(ServicioInferencia().iniciar())
@@ -0,0 +1,30 @@
+"""
+    conftest.py
+    Descripción:
+        Configuración común de las pruebas: los módulos del proyecto están en la raíz del repositorio
+        (igual que en la imagen de Docker), así que se agrega al path antes de importarlos.
+        recursos_nltk verifica una vez por sesión los datos de NLTK (NLTK_DATA_PATH y las rutas por
+        defecto de NLTK, como la de la imagen) con setup_nltk; si faltan, las pruebas que los piden
+        fallan con el comando para descargarlos en lugar de omitirse.
+    Autor: Ivan Camilo Rosales
+    Fecha: 2025-05-21
+"""
+
+import os
+import sys
+
+import pytest
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+
+@pytest.fixture(scope="session")
+def recursos_nltk():
+    from config import NLTK_DATA_PATH, NLTK_PERMITIR_DESCARGA
+    from librerias import setup_nltk
+    #-----  NLTK_DATA_PATH es relativa a la raíz del repositorio, no al directorio desde el que se corre pytest
+    try:
+        setup_nltk(os.path.join(RAIZ, NLTK_DATA_PATH), NLTK_PERMITIR_DESCARGA)
+    except LookupError as e:
+        pytest.fail(f"Las pruebas de equivalencia con NLTK necesitan sus datos: {e}", pytrace=False)
@@ -0,0 +1,49 @@
+"""
+    test_almacenamiento.py
+    Descripción:
+        EscritorIncremental publica el archivo solo al cerrar sin errores: si la escritura se interrumpe
+        con una excepción se conserva la salida anterior y no quedan temporales.
+    Autor: Ivan Camilo Rosales
+    Fecha: 2025-05-21
+"""
+
+import os
+
+import pandas as pd
+import pytest
+
+from almacenamiento import EscritorIncremental, leer_datos
+
+
+@pytest.mark.parametrize("extension", ["parquet", "csv"])
+def test_publica_al_cerrar(tmp_path, extension):
+    ruta = str(tmp_path / f"processing_twcs_1.{extension}")
+    with EscritorIncremental(ruta) as escritor:
+        escritor.escribir(pd.DataFrame({"text": ["a", "b"], "inbound": [True, False]}))
+        assert not os.path.exists(ruta)
+        escritor.escribir(pd.DataFrame({"text": ["c"], "inbound": [True]}))
+        escritor.cerrar()
+    assert leer_datos(ruta)["text"].tolist() == ["a", "b", "c"]
+    assert os.listdir(tmp_path) == [os.path.basename(ruta)]
+
+
+@pytest.mark.parametrize("extension", ["parquet", "csv"])
+def test_error_conserva_salida_anterior(tmp_path, extension):
+    ruta = str(tmp_path / f"processing_twcs_1.{extension}")
+    with EscritorIncremental(ruta) as escritor:
+        escritor.escribir(pd.DataFrame({"text": ["anterior"]}))
+        escritor.cerrar()
+
+    with pytest.raises(ValueError, match="CRC-32"):
+        with EscritorIncremental(ruta) as escritor:
+            escritor.escribir(pd.DataFrame({"text": ["parcial"]}))
+            raise ValueError("CRC-32 inválido en twcs.csv")
+    assert leer_datos(ruta)["text"].tolist() == ["anterior"]
+    assert os.listdir(tmp_path) == [os.path.basename(ruta)]
+
+
+def test_sin_bloques_deja_archivo_con_columnas(tmp_path):
+    ruta = str(tmp_path / "vacio.parquet")
+    with EscritorIncremental(ruta) as escritor:
+        escritor.cerrar(columnas=["inbound", "text"])
+    assert list(leer_datos(ruta).columns) == ["inbound", "text"]
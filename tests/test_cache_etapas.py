@@ -0,0 +1,51 @@
+"""
+    test_cache_etapas.py
+    Descripción:
+        Una etapa registrada con hash_salida=True guarda el hash de su salida en el manifiesto: la etapa
+        que la consume (por ejemplo unir_features con cada partición) lo reutiliza sin volver a leer el
+        archivo, y lo vuelve a calcular si el archivo cambió. El manifiesto conserva los datos de la
+        ejecución (el run de MLflow del entrenamiento).
+    Autor: Ivan Camilo Rosales
+    Fecha: 2025-05-21
+"""
+
+import os
+import hashlib
+
+from cacheEtapas import CacheEtapas
+
+
+def _escribir(ruta, contenido: bytes):
+    with open(ruta, "wb") as archivo:
+        archivo.write(contenido)
+
+
+def test_consumidor_reutiliza_el_hash_de_la_salida(tmp_path, monkeypatch):
+    entrada, salida = str(tmp_path / "entrada.csv"), str(tmp_path / "feature.parquet")
+    _escribir(entrada, b"entrada")
+    _escribir(salida, b"particion")
+    productor = CacheEtapas("feature_extraccion")
+    huella = productor.huella(entrada, configuracion={}, modulos=[], archivo_salida=salida)
+    productor.registrar(salida, huella, hash_salida=True)
+
+    def sin_lectura(self, ruta):
+        raise AssertionError(f"{ruta} no debería volver a leerse")
+    monkeypatch.setattr(CacheEtapas, "_sha256", sin_lectura)
+    assert CacheEtapas("unir_features").hash_archivo(salida) == hashlib.sha256(b"particion").hexdigest()
+
+    monkeypatch.undo()
+    _escribir(salida, b"particion modificada")
+    os.utime(salida, ns=(0, 0))
+    assert CacheEtapas("unir_features").hash_archivo(salida) == hashlib.sha256(b"particion modificada").hexdigest()
+
+
+def test_manifiesto_guarda_los_datos_de_la_ejecucion(tmp_path):
+    entrada, salida = str(tmp_path / "feature.parquet"), str(tmp_path / "modelo.pkl")
+    _escribir(entrada, b"features")
+    _escribir(salida, b"modelo")
+    cache = CacheEtapas("training_model")
+    huella = cache.huella(entrada, configuracion={}, modulos=[], archivo_salida=salida)
+    cache.registrar(salida, huella, datos={"run_id": "abc"})
+    assert cache.es_valida(salida, huella)
+    assert cache.manifiesto(salida)["datos"] == {"run_id": "abc"}
+    assert "salida" not in cache.manifiesto(salida)
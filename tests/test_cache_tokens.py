@@ -0,0 +1,84 @@
+"""
+    test_cache_tokens.py
+    Descripción:
+        CacheTokens acotada: el LRU respeta max_size y las entradas nuevas solo se registran (para
+        enviarlas al proceso principal) cuando se pide con registrar_nuevos, igual que los contadores, que el
+        principal suma para reportar una sola línea por todo el pool. Varias particiones que
+        guardan la misma caché a la vez no se pisan: el archivo final tiene los lemas de todas.
+    Autor: Ivan Camilo Rosales
+    Fecha: 2025-05-21
+"""
+
+import json
+from concurrent.futures import ProcessPoolExecutor
+
+from cacheTokens import CacheTokens
+
+
+def test_proceso_principal_no_acumula_nuevos():
+    cache = CacheTokens(max_size=10)
+    for i in range(1000):
+        cache.obtener(f"token{i}", str.upper)
+    assert len(cache) == 10
+    assert cache.extraer_nuevos() == {}
+
+
+def test_worker_extrae_nuevos_por_fragmento():
+    cache = CacheTokens(max_size=10, registrar_nuevos=True)
+    for token in ["a", "b", "a", "c"]:
+        cache.obtener(token, str.upper)
+    assert cache.extraer_nuevos() == {"a": "A", "b": "B", "c": "C"}
+    cache.obtener("a", str.upper)
+    cache.obtener("d", lambda token: None)
+    assert cache.extraer_nuevos() == {"d": None}
+    assert cache.estadisticas()["aciertos"] == 2
+
+
+def test_principal_suma_los_contadores_del_pool():
+    principal = CacheTokens(max_size=10)
+    for tokens in (["a", "b", "a", "a"], ["a", "c"]):
+        worker = CacheTokens(max_size=1, registrar_nuevos=True)
+        for token in tokens:
+            worker.obtener(token, str.upper)
+        principal.actualizar(worker.extraer_nuevos())
+        principal.sumar_contadores(worker.extraer_contadores())
+        assert worker.extraer_contadores() == {"aciertos": 0, "fallos": 0, "expulsiones": 0}
+    estadisticas = principal.estadisticas()
+    assert (estadisticas["aciertos"], estadisticas["fallos"], estadisticas["expulsiones"]) == (1, 5, 3)
+    assert estadisticas["tasa_aciertos"] == round(1 / 6, 4)
+
+
+def _guardar_particion(ruta: str, particion: int) -> None:
+    cache = CacheTokens(max_size=10_000)
+    for i in range(500):
+        cache.obtener(f"p{particion}_{i}", str.upper)
+    cache.obtener("compartido", lambda token: f"lema{particion}")
+    for _ in range(5):
+        cache.guardar(ruta)
+
+
+def test_guardar_une_particiones_concurrentes(tmp_path):
+    ruta = str(tmp_path / "cache_lemas_english.json")
+    with ProcessPoolExecutor(max_workers=4) as pool:
+        list(pool.map(_guardar_particion, [ruta] * 4, range(4)))
+
+    with open(ruta, "r", encoding="utf-8") as archivo:
+        guardado = json.load(archivo)
+    assert len(guardado) == 4 * 500 + 1
+    assert all(guardado[f"p{particion}_499"] == f"P{particion}_499" for particion in range(4))
+
+
+def test_guardar_respeta_max_size(tmp_path):
+    ruta = str(tmp_path / "cache.json")
+    anterior = CacheTokens(max_size=5)
+    for token in "abcde":
+        anterior.obtener(token, str.upper)
+    anterior.guardar(ruta)
+
+    nueva = CacheTokens(max_size=5)
+    for token in "xyz":
+        nueva.obtener(token, str.upper)
+    nueva.guardar(ruta)
+
+    with open(ruta, "r", encoding="utf-8") as archivo:
+        assert list(json.load(archivo)) == ["d", "e", "x", "y", "z"]
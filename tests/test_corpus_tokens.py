@@ -0,0 +1,72 @@
+"""
+    test_corpus_tokens.py
+    Descripción:
+        CorpusTokens.matriz_conteos debe ser idéntica a CountVectorizer().fit_transform sobre los mismos
+        tokens unidos con espacios (textCls): vocabulario, arreglos data/indices/indptr, orden de los
+        índices dentro de cada fila y tipo de los conteos.
+    Autor: Ivan Camilo Rosales
+    Fecha: 2025-05-21
+"""
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pytest
+from sklearn.feature_extraction.text import CountVectorizer
+
+from corpusTokens import CorpusTokens
+
+
+DOCUMENTOS = [
+    ["phone", "broken", "phone", "screen"],
+    ["Thanks", "GREAT", "help", "thanks"],
+    [],
+    ["a", "x", "i"],
+    ["pingüino", "camión", "ñandú", "camión"],
+    ["e-mail", "re-install", "it's", "don't"],
+    ["ab", "ab", "ab", "zz", "ab"],
+    None,
+    ["scr33n", "2fa", "1", "ios13"],
+    ["screen", "phone", "wifi"],
+]
+
+
+def _comparar(corpus: CorpusTokens, documentos: list) -> None:
+    textos = [" ".join(tokens or []) for tokens in documentos]
+    cv = CountVectorizer()
+    esperado = cv.fit_transform(textos)
+    obtenido = corpus.matriz_conteos()
+
+    assert corpus.terminos == list(cv.get_feature_names_out())
+    assert obtenido.shape == esperado.shape
+    assert obtenido.dtype == esperado.dtype
+    np.testing.assert_array_equal(obtenido.indptr, esperado.indptr)
+    np.testing.assert_array_equal(obtenido.indices, esperado.indices)
+    np.testing.assert_array_equal(obtenido.data, esperado.data)
+
+    #-----  El vectorizador para servir transforma igual que el ajustado por CountVectorizer
+    nuevos = ["phone screen broken again", "nada conocido", "Thanks camión"]
+    np.testing.assert_array_equal(
+        corpus.count_vectorizer().transform(nuevos).toarray(), cv.transform(nuevos).toarray()
+    )
+
+
+def test_desde_serie_con_listas():
+    _comparar(CorpusTokens.desde_serie(pd.Series(DOCUMENTOS, dtype=object)), DOCUMENTOS)
+
+
+def test_desde_serie_arrow():
+    serie = pd.Series(pd.arrays.ArrowExtensionArray(pa.array(DOCUMENTOS, type=pa.list_(pa.string()))))
+    _comparar(CorpusTokens.desde_serie(serie), DOCUMENTOS)
+
+
+def test_corpus_aleatorio():
+    rng = np.random.default_rng(7)
+    palabras = [f"w{i}" for i in range(300)] + ["x", "Mayus", "ñu", "a-b"]
+    documentos = [list(rng.choice(palabras, size=rng.integers(0, 40))) for _ in range(500)]
+    _comparar(CorpusTokens.desde_serie(pd.Series(documentos, dtype=object)), documentos)
+
+
+def test_vocabulario_vacio():
+    with pytest.raises(ValueError):
+        CorpusTokens.desde_serie(pd.Series([["a"], [], None], dtype=object))
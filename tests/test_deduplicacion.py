@@ -0,0 +1,78 @@
+"""
+    test_deduplicacion.py
+    Descripción:
+        El Deduplicador conserva los grupos entre bloques: un texto repetido en dos bloques de
+        MODO_STREAMING queda en el mismo grupo (la posición global de su primera fila) y solo se
+        procesa la primera vez, también para los duplicados cercanos. colapsar_duplicados deja una fila
+        por grupo con el peso contado sobre todas las filas del archivo.
+    Autor: Ivan Camilo Rosales
+    Fecha: 2025-05-21
+"""
+
+import numpy as np
+import pandas as pd
+
+from deduplicacion import Deduplicador, colapsar_duplicados
+
+
+def _agrupar_por_bloques(deduplicador, textos, tamano):
+    ids, representantes = [], []
+    for inicio in range(0, len(textos), tamano):
+        bloque = pd.Series(textos[inicio:inicio + tamano])
+        id_grupo, nuevos, _ = deduplicador.agrupar(bloque, inicio=inicio)
+        ids.extend(id_grupo.tolist())
+        representantes.extend((inicio + nuevos).tolist())
+    return ids, representantes
+
+
+def test_grupos_exactos_entre_bloques():
+    textos = ["hola mundo", "otro texto", "Hola  Mundo", "nuevo", "otro texto", "hola mundo"]
+    ids, representantes = _agrupar_por_bloques(Deduplicador(cercanos=False), textos, tamano=2)
+    assert ids == [0, 1, 0, 3, 1, 0]
+    assert representantes == [0, 1, 3]
+
+
+def test_por_bloques_igual_que_archivo_completo():
+    rng = np.random.default_rng(0)
+    textos = [f"texto {i}" for i in rng.integers(0, 50, 1_000)]
+    completo, _ = _agrupar_por_bloques(Deduplicador(cercanos=False), textos, tamano=len(textos))
+    por_bloques, representantes = _agrupar_por_bloques(Deduplicador(cercanos=False), textos, tamano=37)
+    assert por_bloques == completo
+    assert len(representantes) == len(set(textos))
+
+
+def test_estadisticas_se_suman_entre_bloques():
+    deduplicador = Deduplicador(cercanos=False)
+    totales = {}
+    for bloque in (["a", "b", "a"], ["b", "c"], ["c", "a"]):
+        _, _, estadisticas = deduplicador.agrupar(pd.Series(bloque))
+        for clave, valor in estadisticas.items():
+            totales[clave] = totales.get(clave, 0) + valor
+    assert totales["filas"] == 7
+    assert totales["grupos"] == 3
+    assert totales["duplicados_exactos"] == 4
+
+
+def test_cercanos_entre_bloques():
+    base = "my phone keeps restarting after the latest update please help me"
+    textos = [base, "something completely different here", base + "!", "another unrelated complaint"]
+    deduplicador = Deduplicador(cercanos=True, umbral=0.8)
+    ids, representantes = _agrupar_por_bloques(deduplicador, textos, tamano=2)
+    assert ids[2] == ids[0] == 0
+    assert 2 not in representantes
+
+
+def test_reiniciar_descarta_los_grupos():
+    deduplicador = Deduplicador(cercanos=False)
+    deduplicador.agrupar(pd.Series(["a", "b"]))
+    deduplicador.reiniciar()
+    id_grupo, representantes, _ = deduplicador.agrupar(pd.Series(["b"]), inicio=10)
+    assert id_grupo.tolist() == [10]
+    assert representantes.tolist() == [0]
+
+
+def test_colapsar_cuenta_el_peso_en_todo_el_archivo():
+    df = pd.DataFrame({"textCls": ["a", "b", "a", "c", "a", "b"], "id_grupo": [0, 1, 0, 3, 0, 1]})
+    colapsado = colapsar_duplicados(df)
+    assert colapsado["id_grupo"].tolist() == [0, 1, 3]
+    assert colapsado["peso"].tolist() == [3, 2, 1]
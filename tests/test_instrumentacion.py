@@ -0,0 +1,48 @@
+"""
+    test_instrumentacion.py
+    Descripción:
+        El pico de memoria de un sub-paso es el de su propia ventana (RSS actual muestreada) y no el
+        máximo de toda la vida del proceso; los registros de otro proceso se incorporan con su pid.
+    Autor: Ivan Camilo Rosales
+    Fecha: 2025-05-21
+"""
+
+import os
+import time
+
+import numpy as np
+
+from instrumentacion import Instrumentacion
+
+
+def test_pico_de_memoria_por_ventana():
+    instrumentacion = Instrumentacion(etapa="prueba", perfilar=False)
+    with instrumentacion.medir("grande", 1):
+        arreglo = np.ones(200 * 1024 ** 2 // 8)
+        time.sleep(0.1)
+        del arreglo
+    with instrumentacion.medir("pequeno", 1):
+        time.sleep(0.05)
+
+    pasos = instrumentacion.resumen()
+    assert pasos["grande"]["rss_pico_mb"] - pasos["pequeno"]["rss_pico_mb"] > 150
+
+
+def test_incorporar_registros_de_otro_proceso():
+    hijo = Instrumentacion(etapa="text_processing", perfilar=False)
+    with hijo.medir("limpieza", 10):
+        pass
+    registros = hijo.extraer_registros()
+    assert hijo.registros == []
+
+    principal = Instrumentacion(etapa="text_processing", perfilar=False)
+    for registro in registros:
+        registro["pid"] = os.getpid() + 1
+    principal.incorporar(registros)
+    with principal.medir("limpieza", 5):
+        pass
+
+    resumen = principal.resumen()["limpieza"]
+    assert resumen["llamadas"] == 2
+    assert resumen["filas_entrada"] == 15
+    assert resumen["procesos"] == 2
@@ -0,0 +1,124 @@
+"""
+    test_lector_zip.py
+    Descripción:
+        LectorZipDividido debe entregar los mismos bytes que zipfile sobre el archivo completo, con el ZIP
+        cortado en partes (.z01, .z02, ..., .zip) en posiciones arbitrarias, con miembros almacenados o
+        comprimidos con deflate y con o sin descriptor de datos; y fallar con un error (no datos
+        corruptos) si una parte está dañada o truncada. Como el CRC se comprueba al final del miembro, las
+        etapas que escriben mientras leen (particionar_archivo) no deben publicar una salida parcial.
+    Autor: Ivan Camilo Rosales
+    Fecha: 2025-05-21
+"""
+
+import io
+import os
+import zipfile
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from lectorZip import LectorZipDividido, abrir_csv, partes_zip, ruta_origen
+from particionado import particionar_archivo
+
+
+class _SinSeek(io.RawIOBase):
+    #-----  zipfile escribe descriptores de datos (bandera 0x8) cuando la salida no permite seek
+    def __init__(self):
+        self.buffer = io.BytesIO()
+
+    def writable(self):
+        return True
+
+    def write(self, datos):
+        return self.buffer.write(datos)
+
+
+def _csv_tuits(filas: int = 3000) -> bytes:
+    rng = np.random.default_rng(3)
+    textos = [f"tuit {i} con ñ, tildes á y \"comillas\"\r\nsegunda línea 🙏" for i in range(filas)]
+    df = pd.DataFrame({"tweet_id": np.arange(filas), "inbound": rng.integers(0, 2, filas).astype(bool), "text": textos})
+    return df.to_csv(index=False).encode("utf-8")
+
+
+def _zip_bytes(miembros: dict, metodo: int = zipfile.ZIP_DEFLATED, descriptor: bool = False) -> bytes:
+    destino = _SinSeek() if descriptor else io.BytesIO()
+    with zipfile.ZipFile(destino, "w", compression=metodo) as archivo:
+        for nombre, contenido in miembros.items():
+            archivo.writestr(nombre, contenido)
+    return (destino.buffer if descriptor else destino).getvalue()
+
+
+def _dividir(datos: bytes, directorio, nombre: str = "twcs", cortes=(1000, 7777)) -> str:
+    base = os.path.join(directorio, nombre)
+    limites = [0, *cortes, len(datos)]
+    for numero, (inicio, fin) in enumerate(zip(limites[:-2], limites[1:-1]), start=1):
+        with open(f"{base}.z{numero:02d}", "wb") as parte:
+            parte.write(datos[inicio:fin])
+    with open(f"{base}.zip", "wb") as parte:
+        parte.write(datos[limites[-2]:])
+    return f"{base}.zip"
+
+
+@pytest.mark.parametrize("metodo, descriptor", [
+    (zipfile.ZIP_DEFLATED, False),
+    (zipfile.ZIP_DEFLATED, True),
+    (zipfile.ZIP_STORED, False),
+])
+def test_lectura_igual_a_zipfile(tmp_path, metodo, descriptor):
+    contenido = _csv_tuits()
+    ruta_zip = _dividir(_zip_bytes({"LEEME.txt": b"hola", "twcs/twcs.csv": contenido}, metodo, descriptor), tmp_path)
+
+    assert partes_zip(ruta_zip) == [str(tmp_path / "twcs.z01"), str(tmp_path / "twcs.z02"), ruta_zip]
+    assert LectorZipDividido(ruta_zip).miembros() == ["LEEME.txt", "twcs/twcs.csv"]
+    lector = LectorZipDividido(ruta_zip)
+    with lector.abrir("twcs.csv") as flujo:
+        assert flujo.read() == contenido
+    lector.cerrar()
+
+
+def test_abrir_csv_por_bloques_con_pandas(tmp_path):
+    contenido = _csv_tuits()
+    _dividir(_zip_bytes({"twcs.csv": contenido}), tmp_path)
+    ruta_csv = str(tmp_path / "twcs.csv")
+
+    assert ruta_origen(ruta_csv) == str(tmp_path / "twcs.zip")
+    with abrir_csv(ruta_csv) as fuente:
+        leido = pd.concat(pd.read_csv(fuente, chunksize=700))
+    pd.testing.assert_frame_equal(leido.reset_index(drop=True), pd.read_csv(io.BytesIO(contenido)))
+
+
+def test_parte_corrupta_falla(tmp_path):
+    datos = bytearray(_zip_bytes({"twcs.csv": _csv_tuits()}, zipfile.ZIP_STORED))
+    datos[5000] ^= 0xFF
+    ruta_zip = _dividir(bytes(datos), tmp_path)
+
+    lector = LectorZipDividido(ruta_zip)
+    with pytest.raises(ValueError, match="CRC-32"):
+        with lector.abrir("twcs.csv") as flujo:
+            flujo.read()
+    lector.cerrar()
+
+
+def test_zip_truncado_falla(tmp_path):
+    datos = _zip_bytes({"twcs.csv": _csv_tuits()})
+    ruta_zip = _dividir(datos[: len(datos) // 2], tmp_path, cortes=(1000, 2000))
+
+    lector = LectorZipDividido(ruta_zip)
+    with pytest.raises(ValueError, match="truncado"):
+        with lector.abrir("twcs.csv") as flujo:
+            flujo.read()
+    lector.cerrar()
+
+
+def test_particionar_zip_corrupto_no_publica_particiones(tmp_path):
+    #-----  El CRC se comprueba al final del miembro, después de escribir bloques en las particiones
+    datos = bytearray(_zip_bytes({"twcs.csv": _csv_tuits()}, zipfile.ZIP_STORED))
+    datos[-5000] ^= 0xFF
+    _dividir(bytes(datos), tmp_path)
+    salida = tmp_path / "shards"
+    rutas = [str(salida / f"input_twcs_shard{i:02d}de02.parquet") for i in range(2)]
+
+    with pytest.raises(ValueError, match="CRC-32"):
+        particionar_archivo(str(tmp_path / "twcs.csv"), rutas, chunksize=200)
+    assert os.listdir(salida) == []
@@ -0,0 +1,123 @@
+"""
+    test_limpieza.py
+    Descripción:
+        La limpieza en una sola pasada (limpiar_columna / limpiar_texto, PATRON_LIMPIEZA) debe producir
+        exactamente los mismos bytes que la cadena original de limpieza sobre textos diseñados para
+        romper la equivalencia: URLs pegadas a puntuación, emojis, dígitos Unicode, saltos de línea
+        \r\n, letras con tilde y direcciones www. La cadena original se copia aquí tal como estaba
+        (re.sub sin precompilar y los recorridos carácter a carácter), además de compararse con
+        limpieza_encadenada, y se prueba también sobre textos aleatorios con esos mismos ingredientes.
+    Autor: Ivan Camilo Rosales
+    Fecha: 2025-05-21
+"""
+
+import logging
+import random
+import re
+from string import punctuation
+
+import emoji
+import pandas as pd
+import pytest
+
+from textProcessing import TextProcessing
+
+
+CORPUS_ADVERSARIAL = [
+    "(https://t.co/abc123)",
+    "mira esto:https://t.co/x?y=1&z=2, y esto.",
+    "@AppleSupport,https://t.co/aBc!!!",
+    "http://a.b/c.http://d.e/f",
+    "url al final http://t.co/x",
+    "https://",
+    "httpss://no.es.url",
+    "hhttps://t.co/x",
+    "xhttp://t.co/x pegada a una palabra",
+    "visita www.apple.com/help.",
+    "(www.ejemplo.com)",
+    "wwww.ejemplo.com",
+    "ww.w.no.es.url",
+    "áwww.ejemplo.com ñhttps://t.co/x",
+    "WWW.MAYUSCULAS.COM no es url para el patrón",
+    "gracias 🙏🏽 por nada 😡😡",
+    "👨‍👩‍👧 familia 🇨🇴 bandera",
+    "corazón ❤️ y texto",
+    "tengo 3 teléfonos y ٣ problemas ³ veces ½ y ① y 𝟗",
+    "línea uno\r\nlínea dos\rtres\nfin",
+    "\r\n\r\n",
+    "tab\tseparado",
+    "camión, acción; pingüino ñandú ÁÉÍÓÚ",
+    "café con é combinada",
+    "señor—guion largo… y “comillas”",
+    "i can't, won't & shouldn't!!!",
+    "#hashtag @usuario $100 50% 3.14",
+    "",
+    "   ",
+    "solo letras y espacios",
+]
+
+
+#-----  Piezas con las que se arman los textos aleatorios
+PIEZAS = [
+    "https://t.co/", "http://", "www.", "www", "http", "h", "w", ".", ",", "!", "?", "(", ")", "/", ":", "@", "#",
+    "abc", "Texto", "tilde", "á", "É", "ñ", "ü", "ç", "ø", " ", "  ", "\t", "\r\n", "\n", "\r",
+    "0", "7", "٣", "³", "½", "①", "𝟗", "😡", "🙏🏽", "❤️", "👨‍👩‍👧", "🇨🇴", "—", "…", "“", "'", "\u200d", "\ufe0f",
+]
+
+
+def _limpieza_original(texto: str) -> str:
+    #-----  Cadena de limpieza anterior a la pasada única, copiada sin cambios
+    texto = re.sub(r'https?://\S+|www\.\S+', '', texto)
+    texto = re.sub(r'[^A-Za-záéíóúÁÉÍÓÚñÑ ]+', '', texto)
+    texto = emoji.replace_emoji(re.sub(r'[\r\n]+', ' ', texto), replace='')
+    texto = ''.join(c for c in texto if not c.isdigit())
+    return ''.join(c for c in texto if c not in punctuation)
+
+
+def _textos_aleatorios(cantidad: int, semilla: int = 40) -> list:
+    generador = random.Random(semilla)
+    return ["".join(generador.choices(PIEZAS, k=generador.randint(0, 30))) for _ in range(cantidad)]
+
+
+@pytest.fixture
+def procesador():
+    #-----  La limpieza no usa los recursos de NLTK (stopwords, lematizador): se evita cargarlos
+    procesador = TextProcessing.__new__(TextProcessing)
+    procesador.logger = logging.getLogger(__name__)
+    return procesador
+
+
+def test_una_pasada_equivale_a_limpieza_encadenada(procesador):
+    columna = pd.Series(CORPUS_ADVERSARIAL)
+    encadenada = procesador.limpieza_encadenada(columna)
+    una_pasada = procesador.limpiar_columna(columna)
+    pd.testing.assert_series_equal(una_pasada, encadenada)
+
+
+@pytest.mark.parametrize("texto", CORPUS_ADVERSARIAL)
+def test_bytes_identicos_a_la_limpieza_original(procesador, texto):
+    esperado = _limpieza_original(texto).encode("utf-8")
+    assert procesador.limpiar_texto(texto).encode("utf-8") == esperado
+    assert procesador.limpiar_columna(pd.Series([texto]))[0].encode("utf-8") == esperado
+
+
+def test_bytes_identicos_en_textos_aleatorios(procesador):
+    textos = _textos_aleatorios(5_000)
+    limpio = procesador.limpiar_columna(pd.Series(textos))
+    for texto, resultado in zip(textos, limpio):
+        assert resultado.encode("utf-8") == _limpieza_original(texto).encode("utf-8"), repr(texto)
+
+
+@pytest.mark.parametrize("texto", CORPUS_ADVERSARIAL)
+def test_limpiar_texto_equivale_a_limpiar_columna(procesador, texto):
+    assert procesador.limpiar_texto(texto) == procesador.limpiar_columna(pd.Series([texto]))[0]
+
+
+def test_comparar_limpieza_sin_diferencias(procesador):
+    assert procesador.comparar_limpieza(pd.Series(CORPUS_ADVERSARIAL)).empty
+
+
+def test_solo_quedan_caracteres_permitidos(procesador):
+    permitidos = set("abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZáéíóúÁÉÍÓÚñÑ ")
+    for limpio in procesador.limpiar_columna(pd.Series(CORPUS_ADVERSARIAL)):
+        assert set(limpio) <= permitidos
@@ -0,0 +1,176 @@
+"""
+    test_paquete_inferencia.py
+    Descripción:
+        ClasificadorPaquete (solo NumPy) debe reproducir las probabilidades de scikit-learn
+        (CountVectorizer + TfidfTransformer + modelo) para cada modo exportable: regresión logística
+        multinomial y binaria, y SGD con log_loss. Un modelo que no se puede
+        exportar elimina el paquete anterior para que no se sirva con el modelo.pkl nuevo.
+        La tabla de lemas del paquete da el mismo texto vectorizado que lematizar cada token, y con ella
+        ClasificadorTuits clasifica los textos crudos sin importar NLTK ni scikit-learn. Las pruebas usan un
+        lematizador con las mismas reglas de WordNetLemmatizer sobre un diccionario pequeño, para no
+        depender de los datos de WordNet.
+    Autor: Ivan Camilo Rosales
+    Fecha: 2025-05-21
+"""
+
+import os
+import sys
+import json
+import subprocess
+
+import numpy as np
+import pytest
+from sklearn.feature_extraction.text import CountVectorizer, TfidfTransformer
+from sklearn.linear_model import LogisticRegression, SGDClassifier
+from sklearn.naive_bayes import MultinomialNB
+
+from modelo import ModelTrain
+from paqueteInferencia import ClasificadorPaquete, huella_archivo
+from limpiezaTexto import limpiar_texto, tokenizar_regex, contracciones_nltk
+from textProcessing import tabla_lemas
+
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+ENTRENAMIENTO = [
+    "phone broken screen crack", "battery die fast phone", "great help thank", "love new update",
+    "order arrive tomorrow", "flight delay hour", "thank fix quick", "app crash open",
+    "refund still wait", "awesome support team", "package lost again", "check account please",
+    "camión pingüino señal", "ñandú servicio bueno", "wifi drop constantly", "best service ever",
+]
+ETIQUETAS = np.array([1, 1, 0, 0, 2, 1, 0, 1, 1, 0, 1, 2, 2, 0, 1, 0])
+NUEVOS = [
+    "phone screen broken", "thank great support", "", "palabra desconocida", "camión camión ñandú",
+    "PHONE Broken", "x y z", "refund refund refund wait", "ab" * 40,
+]
+
+
+def _entrenar(tmp_path, model, etiquetas=ETIQUETAS, nombre="modelo"):
+    trainer = ModelTrain(data_processed_path=str(tmp_path))
+    trainer.count_vectorizer = CountVectorizer()
+    trainer.tfidf_transformer = TfidfTransformer()
+    X = trainer.tfidf_transformer.fit_transform(trainer.count_vectorizer.fit_transform(ENTRENAMIENTO))
+    model.fit(X, etiquetas)
+    trainer.guardar_modelo(model, nombre)
+    return trainer, model
+
+
+def _probabilidades_sklearn(trainer, model, textos):
+    X = trainer.tfidf_transformer.transform(trainer.count_vectorizer.transform(textos))
+    return model.predict_proba(X)
+
+
+@pytest.mark.parametrize("model, modo", [
+    (LogisticRegression(max_iter=1000), "multinomial"),
+    (SGDClassifier(loss="log_loss", random_state=0), "ovr"),
+])
+def test_paquete_reproduce_sklearn(tmp_path, model, modo):
+    trainer, model = _entrenar(tmp_path, model)
+    paquete = ClasificadorPaquete(os.path.join(tmp_path, "paquete_modelo.bin"))
+
+    assert paquete.modo == modo
+    assert paquete.etiquetas == [trainer.label2idx[int(clase)] for clase in model.classes_]
+    np.testing.assert_allclose(
+        paquete.predecir_probabilidades(NUEVOS), _probabilidades_sklearn(trainer, model, NUEVOS), atol=1e-10
+    )
+
+
+def test_paquete_binario(tmp_path):
+    etiquetas = np.where(ETIQUETAS == 0, 0, 1)
+    trainer, model = _entrenar(tmp_path, LogisticRegression(max_iter=1000), etiquetas=etiquetas)
+    paquete = ClasificadorPaquete(os.path.join(tmp_path, "paquete_modelo.bin"))
+
+    assert paquete.modo == "binario"
+    np.testing.assert_allclose(
+        paquete.predecir_probabilidades(NUEVOS), _probabilidades_sklearn(trainer, model, NUEVOS), atol=1e-10
+    )
+
+
+def test_paquete_corresponde_a_modelo_pkl(tmp_path):
+    _entrenar(tmp_path, LogisticRegression(max_iter=1000))
+    paquete = ClasificadorPaquete(os.path.join(tmp_path, "paquete_modelo.bin"))
+    assert paquete.encabezado["huella_modelo"] == huella_archivo(os.path.join(tmp_path, "modelo.pkl"))
+
+
+def test_modelo_no_exportable_elimina_paquete_anterior(tmp_path):
+    _entrenar(tmp_path, LogisticRegression(max_iter=1000))
+    assert os.path.exists(os.path.join(tmp_path, "paquete_modelo.bin"))
+
+    _entrenar(tmp_path, MultinomialNB(), nombre="multinomial_nb")
+    assert not os.path.exists(os.path.join(tmp_path, "paquete_modelo.bin"))
+
+
+#-----  Reglas de sustantivos de WordNet (MORPHOLOGICAL_SUBSTITUTIONS) y un diccionario pequeño
+SUSTITUCIONES = (
+    ("s", ""), ("ses", "s"), ("ves", "f"), ("xes", "x"), ("zes", "z"),
+    ("ches", "ch"), ("shes", "sh"), ("men", "man"), ("ies", "y"),
+)
+EXCEPCIONES = {"mice": ["mouse"], "geese": ["goose"], "feet": ["foot"], "oxen": ["ox"]}
+LEMAS = {
+    termino for texto in ENTRENAMIENTO for termino in texto.split()
+} | {"box", "church", "mouse", "goose", "leaf", "city", "bus", "man", "wish", "ox", "foot", "is"}
+STOPWORDS = {"the", "is", "my", "again", "are", "in", "i", "a"}
+
+
+def _normalizar(token):
+    #-----  Igual que TextProcessing._normalizar_token: None si es stopword, si no WordNetLemmatizer.lemmatize
+    if token in STOPWORDS:
+        return None
+    if token in EXCEPCIONES:
+        formas = EXCEPCIONES[token]
+    else:
+        formas = [token[:-len(viejo)] + nuevo for viejo, nuevo in SUSTITUCIONES if token.endswith(viejo)]
+    lemas = [forma for forma in [token] + formas if forma in LEMAS]
+    return min(lemas, key=len) if lemas else token
+
+
+def _preprocesar(texto):
+    lemas = (_normalizar(token) for token in tokenizar_regex(limpiar_texto(texto)))
+    return " ".join(lema for lema in lemas if lema is not None)
+
+
+def test_tabla_lemas_equivale_a_lematizar():
+    vocabulario = {lema for lema in map(_normalizar, LEMAS) if lema is not None} | {"crack", "leaves"}
+    tabla = tabla_lemas(vocabulario, _normalizar, SUSTITUCIONES, EXCEPCIONES)
+    raices = sorted(LEMAS | STOPWORDS | {"zzz", "bo", "ch", "ma", "leav"})
+    sufijos = [""] + [viejo for viejo, _ in SUSTITUCIONES] + [nuevo for _, nuevo in SUSTITUCIONES if nuevo]
+    tokens = {raiz + sufijo for raiz in raices for sufijo in sufijos} | set(EXCEPCIONES) | STOPWORDS
+
+    def vectorizado(lema):
+        return lema if lema in vocabulario else None
+    for token in tokens:
+        assert vectorizado(tabla.get(token, token)) == vectorizado(_normalizar(token)), token
+
+
+def test_servicio_con_paquete_no_importa_nltk_ni_sklearn(tmp_path, monkeypatch):
+    def preprocesamiento(self, terminos):
+        return contracciones_nltk(), tabla_lemas(terminos, _normalizar, SUSTITUCIONES, EXCEPCIONES)
+    monkeypatch.setattr(ModelTrain, "preprocesamiento_paquete", preprocesamiento)
+    trainer, model = _entrenar(tmp_path, LogisticRegression(max_iter=1000))
+    crudos = [
+        "My phone screens are cracked again!! http://t.co/x1", "Thanks, the boxes arrived @support 123",
+        "I cannot wait, gonna fix the batteries", "mice in the churches", "", "Señal del camión 😀",
+    ]
+    paquete = ClasificadorPaquete(os.path.join(tmp_path, "paquete_modelo.bin"))
+    #-----  El texto puede conservar stopwords fuera del vocabulario; lo que debe coincidir es la matriz
+    obtenida = paquete.vectorizar([paquete.preprocesar(texto) for texto in crudos])
+    esperada = paquete.vectorizar([_preprocesar(texto) for texto in crudos])
+    for arreglo_obtenido, arreglo_esperado in zip(obtenida, esperada):
+        np.testing.assert_array_equal(arreglo_obtenido, arreglo_esperado)
+
+    codigo = (
+        "import sys, json\n"
+        "from servicioInferencia import ClasificadorTuits\n"
+        f"clasificador = ClasificadorTuits(modelos_path={str(tmp_path)!r}, usar_paquete=True)\n"
+        f"probabilidades = clasificador.predecir_probabilidades({crudos!r}).tolist()\n"
+        "modulos = [m for m in ('nltk', 'sklearn', 'scipy', 'pandas', 'joblib') if m in sys.modules]\n"
+        "print(json.dumps({'modulos': modulos, 'probabilidades': probabilidades}))\n"
+    )
+    salida = subprocess.run([sys.executable, "-c", codigo], cwd=RAIZ, capture_output=True, text=True, check=True)
+    resultado = json.loads(salida.stdout.strip().splitlines()[-1])
+    assert resultado["modulos"] == []
+    np.testing.assert_allclose(
+        resultado["probabilidades"],
+        _probabilidades_sklearn(trainer, model, [_preprocesar(texto) for texto in crudos]), atol=1e-10,
+    )
@@ -0,0 +1,27 @@
+"""
+    test_particionado.py
+    Descripción:
+        workers_por_particion reparte el presupuesto de procesos entre las particiones que corren a la
+        vez: la suma de los pools de las tareas simultáneas no supera el presupuesto (salvo el mínimo de
+        un proceso por tarea) y NUM_WORKERS solo lo puede bajar.
+    Autor: Ivan Camilo Rosales
+    Fecha: 2025-05-21
+"""
+
+import pytest
+
+from particionado import nucleos_disponibles, workers_por_particion
+
+
+@pytest.mark.parametrize("presupuesto,concurrencia,esperado", [(8, 2, 4), (8, 3, 2), (4, 1, 4), (2, 4, 1)])
+def test_reparte_el_presupuesto(presupuesto, concurrencia, esperado):
+    assert workers_por_particion(concurrencia, presupuesto=presupuesto, maximo=None) == esperado
+
+
+def test_maximo_solo_baja_el_pool():
+    assert workers_por_particion(2, presupuesto=16, maximo=3) == 3
+    assert workers_por_particion(2, presupuesto=4, maximo=8) == 2
+
+
+def test_sin_presupuesto_usa_los_nucleos_disponibles():
+    assert workers_por_particion(1, presupuesto=None, maximo=None) == nucleos_disponibles() >= 1
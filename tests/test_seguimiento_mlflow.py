@@ -0,0 +1,87 @@
+"""
+    test_seguimiento_mlflow.py
+    Descripción:
+        SeguimientoMlflow sobre un almacén de MLflow local (SQLite): un valor que el servidor rechaza
+        (INVALID_PARAMETER_VALUE) no se reintenta y no impide registrar el resto del lote, y log_model
+        desde el hilo en segundo plano crea un LoggedModel enlazado con la ejecución.
+    Autor: Ivan Camilo Rosales
+    Fecha: 2025-05-21
+"""
+
+import numpy as np
+import pytest
+from sklearn.linear_model import LogisticRegression
+
+mlflow = pytest.importorskip("mlflow")
+
+from seguimientoMlflow import SeguimientoMlflow
+
+
+@pytest.fixture
+def ejecucion(tmp_path, monkeypatch):
+    #-----  Los artefactos van al directorio de trabajo (./mlruns) por defecto
+    monkeypatch.chdir(tmp_path)
+    mlflow.set_tracking_uri(f"sqlite:///{tmp_path / 'mlflow.db'}")
+    with mlflow.start_run() as ejecucion:
+        yield ejecucion
+    mlflow.set_tracking_uri(None)
+
+
+def _datos(ejecucion):
+    return mlflow.get_run(ejecucion.info.run_id).data
+
+
+def test_valor_rechazado_no_descarta_el_lote(ejecucion):
+    seguimiento = SeguimientoMlflow(ejecucion.info.run_id, asincrono=False, reintentos=3)
+    seguimiento.log_param("C", 1.0)
+    #-----  Cambiar un parámetro ya registrado es INVALID_PARAMETER_VALUE: el lote se divide para aislarlo
+    seguimiento.log_params({"C": 2.0, "solver": "lbfgs"})
+    seguimiento.log_metrics({"fscore_test": 0.9, "accuracy_test": 0.8})
+    seguimiento._encolar([
+        ("parametro", "modelo", "sgd"), ("parametro", "C", 3.0), ("tag", "etapa", "train"),
+        ("metrica", "roc_auc_test", 0.95, 0, 0),
+    ])
+
+    datos = _datos(ejecucion)
+    assert datos.params == {"C": "1.0", "solver": "lbfgs", "modelo": "sgd"}
+    assert datos.metrics == {"fscore_test": 0.9, "accuracy_test": 0.8, "roc_auc_test": 0.95}
+    assert datos.tags["etapa"] == "train"
+    assert seguimiento.fallidos == 2
+    assert seguimiento.enviados == 7
+
+
+def test_rechazo_no_se_reintenta(ejecucion, monkeypatch):
+    esperas = []
+    monkeypatch.setattr("seguimientoMlflow.time.sleep", esperas.append)
+    seguimiento = SeguimientoMlflow(ejecucion.info.run_id, asincrono=False, reintentos=3)
+    seguimiento.log_param("C", 1.0)
+    seguimiento.log_param("C", 2.0)
+    assert esperas == []
+    assert seguimiento.fallidos == 1
+
+
+def test_asincrono_drena_al_cerrar(ejecucion):
+    with SeguimientoMlflow(ejecucion.info.run_id, intervalo=0.05) as seguimiento:
+        seguimiento.log_params({"C": 1.0})
+        for paso in range(5):
+            seguimiento.log_metric("perdida", 1.0 / (paso + 1), step=paso)
+    historia = mlflow.MlflowClient().get_metric_history(ejecucion.info.run_id, "perdida")
+    assert sorted(metrica.step for metrica in historia) == list(range(5))
+    assert _datos(ejecucion).params == {"C": "1.0"}
+
+
+@pytest.mark.parametrize("asincrono", [True, False])
+def test_log_model_crea_logged_model(ejecucion, asincrono):
+    X = np.array([[0.0, 1.0], [1.0, 0.0], [0.5, 0.5], [0.9, 0.1]])
+    model = LogisticRegression().fit(X, [0, 1, 0, 1])
+    with SeguimientoMlflow(ejecucion.info.run_id, asincrono=asincrono, intervalo=0.05) as seguimiento:
+        seguimiento.log_metrics({"fscore_test": 0.75})
+        seguimiento.log_model(model, artifact_path="model_Logistic_regression", input_example=X[:2])
+    assert seguimiento.fallidos == 0
+
+    modelos = mlflow.search_logged_models(
+        filter_string=f"source_run_id = '{ejecucion.info.run_id}'", output_format="list"
+    )
+    assert [modelo.name for modelo in modelos] == ["model_Logistic_regression"]
+    cargado = mlflow.sklearn.load_model(modelos[0].model_uri)
+    np.testing.assert_array_equal(cargado.predict(X), model.predict(X))
@@ -0,0 +1,47 @@
+"""
+    test_servicio_inferencia.py
+    Descripción:
+        Validación del cuerpo de POST /predict (leer_textos): solo {"texto": str} o {"textos": [str, ...]}
+        con hasta MAX_TEXTOS_SOLICITUD textos; el resto es un error de la solicitud (400), no un 500.
+    Autor: Ivan Camilo Rosales
+    Fecha: 2025-05-21
+"""
+
+import json
+
+import pytest
+
+from servicioInferencia import leer_textos
+
+
+@pytest.mark.parametrize("datos, esperado", [
+    ({"texto": "my phone is broken"}, ["my phone is broken"]),
+    ({"textos": ["hola", "thanks great help"]}, ["hola", "thanks great help"]),
+    ({"textos": []}, []),
+])
+def test_solicitudes_validas(datos, esperado):
+    assert leer_textos(json.dumps(datos).encode("utf-8")) == esperado
+
+
+@pytest.mark.parametrize("cuerpo", [
+    b'{"textos": "hola"}',
+    b'{"textos": ["hola", 3]}',
+    b'{"textos": {"a": "b"}}',
+    b'{"texto": ["hola"]}',
+    b'{"texto": null}',
+    b'{"texto": "a", "textos": ["b"]}',
+    b'["textos"]',
+    b'"hola"',
+    b'{}',
+    b'',
+    b'no es json',
+])
+def test_solicitudes_invalidas(cuerpo):
+    with pytest.raises(ValueError):
+        leer_textos(cuerpo)
+
+
+def test_maximo_de_textos():
+    assert len(leer_textos(json.dumps({"textos": ["a"] * 4}).encode("utf-8"), max_textos=4)) == 4
+    with pytest.raises(ValueError, match="máximo 4"):
+        leer_textos(json.dumps({"textos": ["a"] * 5}).encode("utf-8"), max_textos=4)
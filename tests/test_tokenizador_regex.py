@@ -0,0 +1,42 @@
+"""
+    test_tokenizador_regex.py
+    Descripción:
+        tokenizar_regex debe producir los mismos tokens que word_tokenize sobre el texto ya limpio
+        (limpiar_texto), que es lo que recibe en el flujo: contracciones de Treebank, mayúsculas,
+        letras con tilde y espacios repetidos. La comparación con word_tokenize necesita los datos de
+        Punkt (fixture recursos_nltk de conftest.py: falla si no están, no se omite); la comparación con las reglas de NLTKWordTokenizer (lo único que aplica word_tokenize a un
+        texto sin puntuación) no necesita datos descargados.
+    Autor: Ivan Camilo Rosales
+    Fecha: 2025-05-21
+"""
+
+import pytest
+from nltk.tokenize import NLTKWordTokenizer, word_tokenize
+
+from textProcessing import PATRON_LIMPIEZA, tokenizar_regex
+from test_limpieza import CORPUS_ADVERSARIAL
+
+
+TEXTOS = [
+    "I cannot believe it",
+    "we are gonna need a fix and I wanna know when",
+    "you gotta help lemme know gimme a call",
+    "Tis the season Twas broken mordo more",
+    "CANNOT GONNA Wanna",
+    "cannotcannot gonnagonna cannot",
+    "dont cant wont shouldnt",
+    "  espacios   repetidos  ",
+    "camión pingüino ñandú ÁÉÍÓÚ",
+    "",
+    "a",
+] + [PATRON_LIMPIEZA.sub("", texto) for texto in CORPUS_ADVERSARIAL]
+
+
+@pytest.mark.parametrize("texto", TEXTOS)
+def test_igual_a_reglas_treebank(texto):
+    assert tokenizar_regex(texto) == NLTKWordTokenizer().tokenize(texto.lower())
+
+
+@pytest.mark.parametrize("texto", TEXTOS)
+def test_igual_a_word_tokenize(recursos_nltk, texto):
+    assert tokenizar_regex(texto) == word_tokenize(texto.lower())
@@ -14,129 +14,386 @@
             Elimina todos los dígitos numéricos del texto.
         delete_puntuacion(text):
             Elimina los signos de puntuación del texto.
+        limpiar_texto(text):
+            Aplica en una sola pasada toda la limpieza anterior (URLs, saltos de línea, emojis,
+            dígitos, puntuación y caracteres fuera de la lista permitida).
+        limpiar_columna(columna_df):
+            Versión vectorizada de limpiar_texto para una columna completa de pandas.
+        comparar_limpieza(columna_df):
+            Ejecuta la limpieza encadenada y la limpieza en una sola pasada sobre la misma
+            columna y retorna las filas donde los resultados difieren.
         tokenize(text):
             Divide el texto en una lista de palabras o tokens, lo que facilita
-            su análisis y procesamiento posterior.
+            su análisis y procesamiento posterior. Usa word_tokenize o tokenizar_regex según TOKENIZADOR.
+        tokenizar_nltk(text):
+            Tokenización con word_tokenize de NLTK (segmentación en oraciones de Punkt + reglas de Treebank).
         remove_stopwords(tokens):
             Elimina las palabras vacías (stopwords), es decir, palabras comunes que no 
             aportan información útil al análisis (como "y", "de", "el").
         lemmatize(tokens):
             Convierte cada palabra a su forma base o "lema", ayudando a reducir la 
             variabilidad lingüística (por ejemplo, "corriendo" → "correr").
-        procesador_texto(text):
+        filtrar_y_lematizar(tokens):
+            Elimina las stopwords y lematiza en un solo recorrido, consultando la caché de tokens.
+        guardar_cache_lemas():
+            Guarda la tabla de lemas para que la siguiente ejecución inicie con la caché cargada.
+        tabla_lemas(terminos):
+            Tokens cuyo lema (o None si es stopword) difiere del token, restringidos a los que pueden
+            llegar a un término del vocabulario; el paquete de inferencia la guarda para lematizar sin NLTK.
+        deduplicar_y_procesar(data):
+            Limpia el texto una vez, lo agrupa con los textos de este bloque y de los anteriores
+            (Deduplicador), procesa solo el primero de cada grupo nuevo y replica el resultado guardado
+            del grupo; agrega la columna id_grupo. El tamaño de cada grupo (peso) se cuenta al colapsar
+            los duplicados para el entrenamiento, cuando ya se conocen todas sus filas.
+        procesador_texto(text, limpio, reportar_cache):
             Aplica de forma secuencial todos los métodos de limpieza y 
             transformación del texto, como la eliminación de emojis, stopwords, dígitos, etc.
+            Con limpio=True el texto ya viene limpio y se omite la limpieza. Los procesos del pool no
+            reportan la caché de tokens (reportar_cache=False): lo hace el principal por todos.
+        procesador_texto_paralelo(text, n_workers, limpio):
+            Reparte la columna de texto en fragmentos que se procesan con procesador_texto 
+            en un pool de procesos, conservando el orden original de las filas. Suma los contadores
+            de la caché de tokens de los procesos y los reporta en una sola línea.
         save_processed_data(df, ruta):
-            Guarda el DataFrame procesado en un archivo CSV.
+            Guarda el DataFrame procesado en el formato intermedio configurado (Parquet o CSV).
         read_csv(ruta):
             Lee un archivo CSV y carga los datos en un DataFrame de pandas.
+        leer_entrada(ruta_entrada) / leer_entrada_por_bloques(ruta_entrada, chunksize):
+            Leen un archivo intermedio (Parquet o CSV) ya proyectado a las columnas de entrada.
+        read_csv_chunks(ruta, chunksize):
+            Lee el archivo CSV por bloques, cargando solo las columnas necesarias y
+            filtrando los tuits entrantes (inbound) en cada bloque.
         data_transform(df):
             Convierte tipos de datos y elimina columnas que no son relevantes para el análisis.
-        run():
+        transformar_bloque(df):
+            Aplica la limpieza y el preprocesamiento completo sobre un DataFrame ya transformado.
+        run(file_name, version, ruta_entrada):
             Integra y ejecuta todos los métodos de limpieza y transformación para preparar el conjunto de datos final.
+            Con ruta_entrada se procesa ese archivo (por ejemplo una partición) en lugar del CSV de entrada.
+        run_completo():
+            Ejecuta el flujo cargando el archivo completo en memoria.
+        run_streaming():
+            Ejecuta el mismo flujo de run() bloque a bloque, escribiendo cada bloque procesado
+            en el archivo de salida para mantener acotado el uso de memoria.
     Autor: Ivan Camilo Rosales
     Fecha: 2025-05-21
 """
 
 
 
+#-----  Los nombres de NLTK y emoji se resuelven dentro de los métodos que los usan: importar este
+#-----  módulo no carga NLTK (que a su vez importa scipy y scikit-learn)
 from librerias import (
-    pd, os, re, string, logging, datetime,
-    punctuation, word_tokenize, stopwords, SnowballStemmer,
-    nltk, WordNetLemmatizer, SentimentIntensityAnalyzer,
-    TfidfVectorizer, emoji, plt, WordCloud, STOPWORDS, ImageColorGenerator
+    pd, os, re, sys, string, logging, datetime, ProcessPoolExecutor, lru_cache,
+    punctuation, setup_nltk, Optional, Dict, Callable, Iterable, Sequence, Tuple
 )
 
 from config import *
+from cacheTokens import CacheTokens
+from almacenamiento import (
+    nombre_archivo, guardar_datos, leer_datos, leer_datos_por_bloques, EscritorIncremental
+)
+from instrumentacion import Instrumentacion
+from deduplicacion import Deduplicador
+from lectorZip import abrir_csv
+from limpiezaTexto import PATRON_URL, PATRON_CARACTER_ESPECIAL, PATRON_LIMPIEZA, tokenizar_regex
+
+
+#-----  Patrones y tablas de la limpieza encadenada (la de una sola pasada está en limpiezaTexto)
+PATRON_SALTO_LINEA = re.compile(r'[\r\n]+')
+TABLA_PUNTUACION = str.maketrans('', '', punctuation)
+TOKENIZADORES = ("nltk", "regex")
+
+
+@lru_cache(maxsize=None)
+def _tabla_digitos():
+    #-----  Incluye todos los caracteres para los que str.isdigit() es verdadero (no solo 0-9)
+    return {cp: None for cp in range(sys.maxunicode + 1) if chr(cp).isdigit()}
+
+
+def tabla_lemas(
+    terminos: Iterable[str], normalizar: Callable[[str], Optional[str]],
+    sustituciones: Sequence[Tuple[str, str]], excepciones: Dict[str, Sequence[str]]
+) -> Dict[str, Optional[str]]:
+    #-----  WordNetLemmatizer retorna el lema más corto entre el token y las formas que obtiene de él con
+    #-----  las excepciones de WordNet o, si no es una excepción, con las sustituciones de sufijos
+    #-----  (old -> new). Un token cuyo resultado es un término del vocabulario es entonces el término, una
+    #-----  clave de las excepciones o el término con un sufijo new cambiado por old. Basta guardar los
+    #-----  tokens de ese conjunto cuyo resultado difiere del token (None: stopword): para cualquier otro
+    #-----  token, conservarlo sin cambios da el mismo texto vectorizado, porque ni el token ni su lema
+    #-----  están en el vocabulario.
+    terminos = set(terminos)
+    candidatos = terminos | set(excepciones)
+    for termino in terminos:
+        for viejo, nuevo in sustituciones:
+            if termino.endswith(nuevo):
+                candidatos.add(termino[:len(termino) - len(nuevo)] + viejo)
+    tabla = {}
+    for token in candidatos:
+        resultado = normalizar(token)
+        if resultado != token:
+            tabla[token] = resultado
+    return tabla
+
+
+#-----  Instancia de TextProcessing propia de cada proceso del pool; se crea una sola vez
+#-----  por proceso para no recargar los recursos de NLTK en cada fragmento
+_procesador_worker = None
+
+
+def _inicializar_worker(idioma: str, tokenizador: str):
+    global _procesador_worker
+    _procesador_worker = TextProcessing(idioma=idioma, tokenizador=tokenizador, registrar_lemas_nuevos=True)
+
+
+def _procesar_fragmento(columna_df: pd.Series, limpio: bool = False):
+    resultado = _procesador_worker.procesador_texto(columna_df, limpio=limpio, reportar_cache=False)
+    #-----  Se retornan los lemas calculados en el fragmento para que el proceso principal
+    #-----  pueda persistir una tabla de lemas que incluya el trabajo de todos los procesos,
+    #-----  los contadores de la caché del fragmento y las mediciones de sus sub-pasos
+    #-----  (tiempos y memoria del proceso hijo)
+    return (
+        resultado,
+        _procesador_worker.cache_tokens.extraer_nuevos(),
+        _procesador_worker.cache_tokens.extraer_contadores(),
+        _procesador_worker.instrumentacion.extraer_registros(),
+    )
 
 
 class TextProcessing:
     
-    def __init__(self,idioma: str):
-        nltk.download('stopwords')
-        nltk.download('punkt')
-        nltk.download('punkt_tab')
-        nltk.download('wordnet')
-        nltk.download('omw-1.4')
-        nltk.download('vader_lexicon')
+    def __init__(self,idioma: str, n_workers: Optional[int] = NUM_WORKERS, tokenizador: str = TOKENIZADOR,
+                 registrar_lemas_nuevos: bool = False):
+        if tokenizador not in TOKENIZADORES:
+            raise ValueError(f"Unsupported tokenizer: {tokenizador}. Supported tokenizers: {list(TOKENIZADORES)}")
+        setup_nltk(NLTK_DATA_PATH, NLTK_PERMITIR_DESCARGA)
+        from librerias import stopwords, SnowballStemmer, WordNetLemmatizer
 
         self.idioma = idioma
+        self.n_workers = n_workers
+        self.tokenizador = tokenizador
         self.stemmer = SnowballStemmer(self.idioma)
         self.lemmatizer = WordNetLemmatizer()
         self.stop_words = set(stopwords.words(self.idioma))
+        #-----  Solo los procesos del pool registran los lemas nuevos: se extraen y envían al principal por fragmento
+        self.cache_tokens = CacheTokens(max_size=TAMANO_CACHE_TOKENS, registrar_nuevos=registrar_lemas_nuevos)
+        self.ruta_cache_lemas = os.path.join(MODELOS_PATH, f"cache_lemas_{self.idioma}.json")
+        if PERSISTIR_CACHE_LEMAS:
+            self.cache_tokens.cargar(self.ruta_cache_lemas)
+        self._pool = None
+        self.instrumentacion = Instrumentacion(etapa="text_processing")
+        self.deduplicador = Deduplicador() if DEDUPLICACION_ACTIVA else None
+        self.estadisticas_dedup = {}
+        #-----  id de grupo -> resultado del preprocesamiento, compartido por los bloques de una ejecución
+        self.resultados_grupos = {}
+        self.filas_procesadas = 0
         logging.basicConfig(level=logging.INFO)
         self.logger = logging.getLogger(__name__)
 
 
     def eliminar_urls(self,texto:str):
-        patron = r'https?://\S+|www\.\S+'
-        return re.sub(patron, '', texto)
+        return PATRON_URL.sub('', texto)
     
     def delete_caracter_especial(self,texto:str):
-        return re.sub(r'[^A-Za-záéíóúÁÉÍÓÚñÑ ]+', '', texto)
+        return PATRON_CARACTER_ESPECIAL.sub('', texto)
 
     def remove_emoji(self, texto:str)-> str:
-        textobase = re.sub(r'[\r\n]+', ' ', texto)
+        from librerias import emoji
+        textobase = PATRON_SALTO_LINEA.sub(' ', texto)
         return emoji.replace_emoji(textobase, replace='')
 
     def delete_digitos(self, texto:str)-> str:
-        return ''.join(c for c in texto if not c.isdigit())
+        return texto.translate(_tabla_digitos())
 
     def delete_puntuacion(self, texto:str)-> str:
-        return ''.join(c for c in texto if c not in punctuation)
+        return texto.translate(TABLA_PUNTUACION)
+    
+    def limpiar_texto(self, texto: str) -> str:
+        return PATRON_LIMPIEZA.sub('', texto)
+    
+    def limpiar_columna(self, columna_df: pd.Series) -> pd.Series:
+        return columna_df.str.replace(PATRON_LIMPIEZA, '', regex=True)
+    
+    def limpieza_encadenada(self, columna_df: pd.Series) -> pd.Series:
+        deleteUrls = columna_df.apply(self.eliminar_urls)
+        deleteCaracterres = deleteUrls.apply(self.delete_caracter_especial)
+        text_sin_emojin = deleteCaracterres.apply(self.remove_emoji)
+        text_sin_digitos = text_sin_emojin.apply(self.delete_digitos)
+        return text_sin_digitos.apply(self.delete_puntuacion)
+    
+    def comparar_limpieza(self, columna_df: pd.Series) -> pd.DataFrame:
+        encadenada = self.limpieza_encadenada(columna_df)
+        una_pasada = self.limpiar_columna(columna_df)
+        diferencias = encadenada != una_pasada
+        self.logger.info(
+            f"Comparación de limpieza: {int(diferencias.sum())} diferencias en {len(columna_df)} filas"
+        )
+        return pd.DataFrame({
+            'text': columna_df[diferencias],
+            'encadenada': encadenada[diferencias],
+            'una_pasada': una_pasada[diferencias],
+        })
     
     
     def tokenize(self,texto: str)-> str:
+        if self.tokenizador == "regex":
+            return tokenizar_regex(texto)
+        return self.tokenizar_nltk(texto)
+    
+    def tokenizar_nltk(self, texto: str) -> list:
+        from librerias import word_tokenize
         tokens = word_tokenize(texto.lower(), language=self.idioma)
         return tokens
     
     def remove_stopwords(self,tokens: list):
+        #-----  tokenize ya retorna los tokens en minúscula
         filtered_tokens = [
-            word for word in tokens if word.lower() not in self.stop_words
+            word for word in tokens if word not in self.stop_words
         ]
         return filtered_tokens  
     
     
     def lemmatize(self,tokens: list):
-        lemmatized_tokens = [self.lemmatizer.lemmatize(word) for word in tokens]
+        lemmatized_tokens = []
+        for word in tokens:
+            lema = self.cache_tokens.obtener(word, self._normalizar_token)
+            lemmatized_tokens.append(lema if lema is not None else self.lemmatizer.lemmatize(word))
         return lemmatized_tokens
     
+    def _normalizar_token(self, word: str):
+        #-----  Valor guardado en la caché: None si es stopword, en otro caso su lema
+        if word in self.stop_words:
+            return None
+        return self.lemmatizer.lemmatize(word)
     
-    def procesador_texto(self,columna_df :pd.Series):
+    def filtrar_y_lematizar(self, tokens: list):
+        lemmatized_tokens = []
+        for word in tokens:
+            lema = self.cache_tokens.obtener(word, self._normalizar_token)
+            if lema is not None:
+                lemmatized_tokens.append(lema)
+        return lemmatized_tokens
+    
+    def tabla_lemas(self, terminos: Iterable[str]) -> Dict[str, Optional[str]]:
+        #-----  Reglas de sustantivos de WordNet, la categoría por defecto de lemmatize
+        from librerias import wordnet
+        return tabla_lemas(
+            terminos, self._normalizar_token,
+            sustituciones=wordnet.MORPHOLOGICAL_SUBSTITUTIONS[wordnet.NOUN],
+            excepciones=wordnet._exception_map[wordnet.NOUN],
+        )
+    
+    def guardar_cache_lemas(self):
+        if PERSISTIR_CACHE_LEMAS:
+            self.cache_tokens.guardar(self.ruta_cache_lemas)
+    
+    
+    def procesador_texto(self,columna_df :pd.Series, limpio: bool = False, reportar_cache: bool = True):
         inicio_time = datetime.datetime.now()
-        deleteUrls = columna_df.apply(self.eliminar_urls)
-        deleteCaracterres = deleteUrls.apply(self.delete_caracter_especial)
-        text_sin_emojin = deleteCaracterres.apply(self.remove_emoji)
-        text_sin_digitos = text_sin_emojin.apply(self.delete_digitos)
-        text_sin_puntuacion = text_sin_digitos.apply(self.delete_puntuacion)
-        tokenized_text = text_sin_puntuacion.apply(self.tokenize)
-        
-        stopwords_text = tokenized_text.apply(self.remove_stopwords)
-        lemmatize_text = stopwords_text.apply(self.lemmatize)
+        filas = len(columna_df)
+        text_limpio = columna_df
+        if not limpio:
+            with self.instrumentacion.medir("limpieza", filas):
+                text_limpio = self.limpiar_columna(columna_df)
+        with self.instrumentacion.medir("tokenizacion", filas):
+            tokenized_text = text_limpio.apply(self.tokenize)
+        with self.instrumentacion.medir("stopwords_lematizacion", filas):
+            lemmatize_text = tokenized_text.apply(self.filtrar_y_lematizar)
         
         fin_time = datetime.datetime.now()
         self.logger.info(f"Preprocesamiento del texto completado")
         self.logger.info(f"Tiempo de Ejecucion: {fin_time - inicio_time}")
+        if reportar_cache:
+            self.logger.info(f"Caché de tokens: {self.cache_tokens.estadisticas()}")
         return lemmatize_text
     
+    def _obtener_pool(self, n_workers: int):
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(
+                max_workers=n_workers,
+                initializer=_inicializar_worker,
+                initargs=(self.idioma, self.tokenizador),
+            )
+            self.logger.info(f"Pool de procesamiento iniciado con {n_workers} procesos")
+        return self._pool
+    
+    def cerrar_pool(self):
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+    
+    def procesador_texto_paralelo(self, columna_df: pd.Series, n_workers: Optional[int] = None, limpio: bool = False):
+        n_workers = n_workers or self.n_workers or os.cpu_count() or 1
+        if n_workers <= 1 or len(columna_df) < MIN_FILAS_PARALELO:
+            return self.procesador_texto(columna_df, limpio=limpio)
+        
+        inicio_time = datetime.datetime.now()
+        #-----  Se generan más fragmentos que procesos para balancear la carga entre ellos
+        num_fragmentos = n_workers * 4
+        tamano = -(-len(columna_df) // num_fragmentos)
+        fragmentos = [
+            columna_df.iloc[i:i + tamano] for i in range(0, len(columna_df), tamano)
+        ]
+        #-----  map devuelve los resultados en el mismo orden de los fragmentos
+        #-----  Los sub-pasos se ejecutan en los procesos hijos: aquí se mide el paso completo y se
+        #-----  incorporan las mediciones que cada hijo retorna con su fragmento
+        resultados = []
+        with self.instrumentacion.medir("procesamiento_paralelo", len(columna_df)):
+            for resultado, nuevos_lemas, contadores, registros in self._obtener_pool(n_workers).map(
+                _procesar_fragmento, fragmentos, [limpio] * len(fragmentos)
+            ):
+                resultados.append(resultado)
+                self.cache_tokens.actualizar(nuevos_lemas)
+                self.cache_tokens.sumar_contadores(contadores)
+                self.instrumentacion.incorporar(registros)
+        
+        fin_time = datetime.datetime.now()
+        self.logger.info(f"Preprocesamiento paralelo completado con {n_workers} procesos")
+        self.logger.info(f"Tiempo de Ejecucion: {fin_time - inicio_time}")
+        #-----  Contadores de las cachés de todos los procesos (más las expulsiones del principal al incorporar
+        #-----  sus lemas); el tamaño es el de la caché del principal
+        self.logger.info(f"Caché de tokens ({n_workers} procesos): {self.cache_tokens.estadisticas()}")
+        return pd.concat(resultados)
+    
     def save_processed_data(self, df: pd.DataFrame, path: str, file_name: str) -> None:
         file_path = os.path.join(path, file_name)
-        df.to_csv(file_path, index=False)
+        guardar_datos(df, file_path)
         #print(f"Guardado exitoso de datos preprocesados \n\t {file_path}")
         self.logger.info(f"Guardado exitoso de datos preprocesados \n\t {file_path}")
         
     def read_csv(self, path: str, filename: str):
         file_path = os.path.join(path, filename)
-        df = pd.read_csv(file_path)
+        #-----  Si solo está el ZIP (twcs.z01, ..., twcs.zip) el CSV se lee en streaming sin extraerlo
+        with abrir_csv(file_path) as fuente:
+            df = pd.read_csv(fuente)
         self.logger.info(f"Ingesta de datos en curso \n\t {file_path}")
         return df
     
+    def leer_entrada(self, ruta_entrada: str):
+        self.logger.info(f"Ingesta de datos en curso \n\t {ruta_entrada}")
+        return leer_datos(ruta_entrada, columnas=COLUMNAS_ENTRADA)
+    
+    def leer_entrada_por_bloques(self, ruta_entrada: str, chunksize: int = CHUNK_SIZE):
+        self.logger.info(f"Ingesta de datos por bloques de {chunksize} filas \n\t {ruta_entrada}")
+        yield from leer_datos_por_bloques(ruta_entrada, columnas=COLUMNAS_ENTRADA, chunksize=chunksize)
+    
+    def read_csv_chunks(self, path: str, filename: str, chunksize: int = CHUNK_SIZE):
+        file_path = os.path.join(path, filename)
+        self.logger.info(f"Ingesta de datos por bloques de {chunksize} filas \n\t {file_path}")
+        #-----  Solo se cargan las columnas usadas y se filtran los tuits entrantes en cada bloque,
+        #-----  así nunca se materializa el archivo completo en memoria
+        with abrir_csv(file_path) as fuente:
+            for chunk in pd.read_csv(fuente, usecols=COLUMNAS_ENTRADA, chunksize=chunksize):
+                chunk = chunk[chunk['inbound'].astype(bool)]
+                yield chunk
+    
     def data_transform(self, df: pd.DataFrame):
-        df.drop(["tweet_id"], axis=1, inplace=True)
-        df.drop(["author_id"], axis=1, inplace=True)
-        df.drop(["created_at"], axis=1, inplace=True)
-        df.drop(["response_tweet_id"], axis=1, inplace=True)
-        df.drop(["in_response_to_tweet_id"], axis=1, inplace=True)
+        #-----  Eliminamos las columnas que no se usan (si la lectura ya las proyectó, no estarán presentes)
+        columnas_descartadas = [
+            "tweet_id", "author_id", "created_at",
+            "response_tweet_id", "in_response_to_tweet_id",
+        ]
+        df = df.drop(columns=[c for c in columnas_descartadas if c in df.columns])
         
         #-----  convertimos la columna inbound a boolean
         df['inbound'] = df['inbound'].astype(bool)
@@ -151,22 +408,118 @@ class TextProcessing:
     def clsTexto(self,words: list):
         return " ".join(str(word) for word in words)
     
-    def run(self,file_name: str, version: int):
-        name_data_input = f"{file_name}.csv"
-        data = self.read_csv(
-            DATA_PATH_INPUT, name_data_input
+    def deduplicar_y_procesar(self, data: pd.DataFrame):
+        #-----  La clave de la deduplicación es el texto limpio: se limpia una vez y se reutiliza al procesar
+        with self.instrumentacion.medir("limpieza", len(data)):
+            limpio = self.limpiar_columna(data['text'])
+        with self.instrumentacion.medir("deduplicacion", len(data)) as registro:
+            id_grupo, representantes, estadisticas = self.deduplicador.agrupar(limpio, inicio=self.filas_procesadas)
+            registro["filas_salida"] = len(representantes)
+        for clave, valor in estadisticas.items():
+            self.estadisticas_dedup[clave] = self.estadisticas_dedup.get(clave, 0) + valor
+        self.logger.info(f"Deduplicación del bloque: {estadisticas}")
+        
+        #-----  Solo se procesa el primer texto de cada grupo nuevo; las filas de grupos abiertos en bloques
+        #-----  anteriores reciben el resultado guardado. El grupo es la posición global de su primera fila
+        unicos = self.procesador_texto_paralelo(limpio.iloc[representantes], limpio=True)
+        self.resultados_grupos.update(zip(id_grupo[representantes].tolist(), unicos.tolist()))
+        data['TextPreproc'] = pd.Series(
+            [self.resultados_grupos[grupo] for grupo in id_grupo.tolist()], index=data.index, dtype=object
         )
+        data['id_grupo'] = id_grupo
+        return data
+    
+    def transformar_bloque(self, data: pd.DataFrame):
+        if self.deduplicador is not None:
+            data = self.deduplicar_y_procesar(data)
+        else:
+            data['TextPreproc'] = self.procesador_texto_paralelo(data['text'])
+        self.filas_procesadas += len(data)
+        with self.instrumentacion.medir("union_tokens", len(data)):
+            data['textCls'] = data['TextPreproc'].apply(self.clsTexto)
+        return data
+    
+    def run(self,file_name: str, version: int, ruta_entrada: Optional[str] = None):
+        #-----  Cada archivo (o partición) guarda su propio reporte de rendimiento
+        self.instrumentacion.etapa = f"text_processing_{file_name}"
+        self.instrumentacion.iniciar_perfil()
+        #-----  Los grupos de duplicados se comparten entre los bloques de este archivo, no con otro archivo
+        self.filas_procesadas = 0
+        self.estadisticas_dedup = {}
+        if self.deduplicador is not None:
+            self.deduplicador.reiniciar()
+        try:
+            if MODO_STREAMING:
+                self.run_streaming(file_name=file_name, version=version, ruta_entrada=ruta_entrada)
+            else:
+                self.run_completo(file_name=file_name, version=version, ruta_entrada=ruta_entrada)
+            self.guardar_cache_lemas()
+        finally:
+            self.cerrar_pool()
+            self.resultados_grupos = {}
+        if self.estadisticas_dedup:
+            self.logger.info(f"Deduplicación total: {self.estadisticas_dedup}")
+        self.instrumentacion.guardar(DATA_PATH_PROCESSED)
+    
+    def run_completo(self, file_name: str, version: int, ruta_entrada: Optional[str] = None):
+        name_data_input = f"{file_name}.csv"
+        with self.instrumentacion.medir("lectura") as registro:
+            if ruta_entrada is not None:
+                data = self.leer_entrada(ruta_entrada)
+            else:
+                data = self.read_csv(
+                    DATA_PATH_INPUT, name_data_input
+                )
+            registro["filas_salida"] = len(data)
         
-        data = self.data_transform(data)
-        text_cls = self.procesador_texto(data['text'])
-
-        data['TextPreproc'] = text_cls
-        data['textCls'] = data['TextPreproc'].apply(self.clsTexto)
-        self.save_processed_data(
-            df=data,
-            path=DATA_PATH_PROCESSED,
-            file_name=f"processing_{file_name}_{version}.csv",
+        with self.instrumentacion.medir("transformacion", len(data)) as registro:
+            data = self.data_transform(data)
+            registro["filas_salida"] = len(data)
+        data = self.transformar_bloque(data)
+        with self.instrumentacion.medir("escritura", len(data)):
+            self.save_processed_data(
+                df=data,
+                path=DATA_PATH_PROCESSED,
+                file_name=nombre_archivo(f"processing_{file_name}_{version}"),
+            )
+    
+    def run_streaming(
+        self, file_name: str, version: int, chunksize: int = CHUNK_SIZE, ruta_entrada: Optional[str] = None
+    ):
+        name_data_input = f"{file_name}.csv"
+        file_path = os.path.join(
+            DATA_PATH_PROCESSED, nombre_archivo(f"processing_{file_name}_{version}")
         )
+        
+        #-----  La salida solo se publica si la entrada se leyó completa y válida: el CRC del ZIP se
+        #-----  comprueba al final del miembro, cuando los bloques anteriores ya se escribieron
+        with EscritorIncremental(file_path) as escritor:
+            if ruta_entrada is not None:
+                bloques = self.leer_entrada_por_bloques(ruta_entrada, chunksize=chunksize)
+            else:
+                bloques = self.read_csv_chunks(DATA_PATH_INPUT, name_data_input, chunksize=chunksize)
+            num_bloque = 0
+            while True:
+                #-----  La lectura del bloque ocurre dentro de next(), por eso se mide explícitamente
+                with self.instrumentacion.medir("lectura") as registro:
+                    chunk = next(bloques, None)
+                    registro["filas_salida"] = 0 if chunk is None else len(chunk)
+                if chunk is None:
+                    break
+                with self.instrumentacion.medir("transformacion", len(chunk)) as registro:
+                    data = self.data_transform(chunk)
+                    registro["filas_salida"] = len(data)
+                data = self.transformar_bloque(data)
+                with self.instrumentacion.medir("escritura", len(data)):
+                    escritor.escribir(data)
+                self.logger.info(f"Bloque {num_bloque} procesado - filas acumuladas: {escritor.filas}")
+                num_bloque += 1
+        
+            columnas = ["inbound", "text", "TextPreproc", "textCls"]
+            if self.deduplicador is not None:
+                columnas += ["id_grupo"]
+            escritor.cerrar(columnas=columnas)
+        self.logger.info(f"Guardado exitoso de datos preprocesados \n\t {file_path}")
 
 
 """ if __name__ == "__main__":
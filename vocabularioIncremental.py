@@ -0,0 +1,114 @@
+"""
+    vocabularioIncremental.py
+    Descripción:
+        Estado persistente de las features para el entrenamiento incremental. Guarda el vocabulario
+        (que solo crece, los términos nuevos reciben el siguiente índice), la frecuencia de documentos
+        de cada término y el número de documentos vistos, de modo que al llegar un lote nuevo solo se
+        tokeniza ese lote y los pesos IDF se recalculan desde los conteos acumulados.
+        La tokenización es la misma de CountVectorizer y el IDF sigue la fórmula de TfidfTransformer
+        (smooth_idf=True), así los transformadores exportados se pueden usar en el servicio de inferencia.
+
+    Clases:
+        VocabularioIncremental:
+            cargar(path):
+                Abre el estado guardado o crea uno vacío.
+            actualizar(textos):
+                Incorpora un lote: agrega los términos nuevos, suma la frecuencia de documentos y
+                retorna la matriz de conteos del lote con el vocabulario actualizado.
+            idf():
+                Calcula los pesos IDF con los conteos acumulados.
+            count_vectorizer() / tfidf_transformer():
+                Construyen los transformadores de scikit-learn equivalentes al estado actual.
+            guardar(path):
+                Persiste el vocabulario, las frecuencias y los lotes incorporados.
+    Autor: Ivan Camilo Rosales
+    Fecha: 2025-05-21
+"""
+
+from librerias import (
+    os, json, logging, Counter, np, csr_matrix,
+    Dict, List, Any, Optional, CountVectorizer, TfidfTransformer
+)
+
+
+class VocabularioIncremental:
+
+    def __init__(self):
+        self.vocabulario: Dict[str, int] = {}
+        self.frecuencia_documentos = np.zeros(0, dtype=np.int64)
+        self.n_documentos = 0
+        self.lotes: List[str] = []
+        self._analizador = CountVectorizer().build_analyzer()
+        self.logger = logging.getLogger(__name__)
+
+    @classmethod
+    def cargar(cls, path: str) -> "VocabularioIncremental":
+        estado = cls()
+        ruta_estado = os.path.join(path, "estado.json")
+        if not os.path.exists(ruta_estado):
+            return estado
+        with open(ruta_estado, "r", encoding="utf-8") as archivo:
+            contenido = json.load(archivo)
+        with open(os.path.join(path, "vocabulario.json"), "r", encoding="utf-8") as archivo:
+            estado.vocabulario = json.load(archivo)
+        estado.frecuencia_documentos = np.load(os.path.join(path, "frecuencia_documentos.npy"))
+        estado.n_documentos = contenido["n_documentos"]
+        estado.lotes = contenido["lotes"]
+        return estado
+
+    def guardar(self, path: str) -> None:
+        os.makedirs(path, exist_ok=True)
+        with open(os.path.join(path, "vocabulario.json"), "w", encoding="utf-8") as archivo:
+            json.dump(self.vocabulario, archivo, ensure_ascii=False)
+        np.save(os.path.join(path, "frecuencia_documentos.npy"), self.frecuencia_documentos)
+        #-----  estado.json se escribe al final: marca que el resto de archivos está completo
+        with open(os.path.join(path, "estado.json"), "w", encoding="utf-8") as archivo:
+            json.dump({"n_documentos": self.n_documentos, "lotes": self.lotes}, archivo, indent=2)
+
+    def contiene_lote(self, huella_lote: str) -> bool:
+        return huella_lote in self.lotes
+
+    def actualizar(self, textos: List[str], huella_lote: Optional[str] = None) -> csr_matrix:
+        indices, conteos, indptr = [], [], [0]
+        for texto in textos:
+            for termino, conteo in Counter(self._analizador(texto)).items():
+                idx = self.vocabulario.get(termino)
+                if idx is None:
+                    idx = self.vocabulario[termino] = len(self.vocabulario)
+                indices.append(idx)
+                conteos.append(conteo)
+            indptr.append(len(indices))
+
+        n_terminos = len(self.vocabulario)
+        nuevos = n_terminos - len(self.frecuencia_documentos)
+        #-----  Cada término aparece una sola vez por documento en indices: bincount da la frecuencia de documentos
+        self.frecuencia_documentos = np.concatenate([
+            self.frecuencia_documentos, np.zeros(nuevos, dtype=np.int64)
+        ]) + np.bincount(np.asarray(indices, dtype=np.int64), minlength=n_terminos)
+        self.n_documentos += len(textos)
+        if huella_lote is not None:
+            self.lotes.append(huella_lote)
+        self.logger.info(
+            f"Vocabulario incremental: {len(textos)} documentos nuevos, {nuevos} términos nuevos, "
+            f"{n_terminos} términos y {self.n_documentos} documentos en total"
+        )
+
+        X = csr_matrix(
+            (np.asarray(conteos, dtype=np.int64), np.asarray(indices, dtype=np.int32), np.asarray(indptr)),
+            shape=(len(textos), n_terminos),
+        )
+        X.sort_indices()
+        return X
+
+    def idf(self) -> np.ndarray:
+        #-----  Misma fórmula que TfidfTransformer(smooth_idf=True)
+        return np.log((1 + self.n_documentos) / (1 + self.frecuencia_documentos)) + 1
+
+    def count_vectorizer(self) -> CountVectorizer:
+        return CountVectorizer(vocabulary=self.vocabulario)
+
+    def tfidf_transformer(self) -> TfidfTransformer:
+        transformer = TfidfTransformer()
+        transformer.idf_ = self.idf()
+        transformer.n_features_in_ = len(self.vocabulario)
+        return transformer